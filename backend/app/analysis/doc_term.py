@@ -0,0 +1,130 @@
+"""
+Rzadka macierz dokument-term (format CSR w NumPy) do szybkiego zliczania słów.
+Macierz jest budowana raz i uzupełniana przyrostowo; zliczenia dla dowolnego
+podzbioru opinii (np. tylko pozytywne, dana ocena) to sumy kolumn po masce
+wierszy - bez ponownego preprocessingu tekstu.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+
+class DocTermMatrix:
+    """
+    Macierz liczności termów w dokumentach w formacie CSR (indptr, indices, data).
+    Wiersz = dokument (pozycja opinii w DataFrame), kolumna = term ze słownika.
+    """
+
+    def __init__(self):
+        """Inicjalizuje pustą macierz."""
+        self.vocabulary: Dict[str, int] = {}
+        self.terms: List[str] = []
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.empty(0, dtype=np.int32)
+        self.data = np.empty(0, dtype=np.int32)
+        # Wiersze dodane od ostatniego scalenia (scalane leniwie przy odczycie)
+        self._pending: List[Tuple[np.ndarray, np.ndarray]] = []
+
+    def copy(self) -> "DocTermMatrix":
+        """
+        Zwraca niezależną kopię macierzy. Tablice CSR są współdzielone -
+        nigdy nie są modyfikowane w miejscu, scalanie tworzy nowe tablice.
+        """
+        clone = DocTermMatrix()
+        clone.vocabulary = dict(self.vocabulary)
+        clone.terms = list(self.terms)
+        clone.indptr = self.indptr
+        clone.indices = self.indices
+        clone.data = self.data
+        clone._pending = list(self._pending)
+        return clone
+
+    @property
+    def n_rows(self) -> int:
+        """Liczba dokumentów (wierszy) w macierzy."""
+        return len(self.indptr) - 1 + len(self._pending)
+
+    def add_document(self, tokens: Iterable[str]) -> None:
+        """
+        Dodaje dokument jako nowy wiersz macierzy.
+
+        Args:
+            tokens: Tokeny dokumentu
+        """
+        counts = Counter(tokens)
+        columns = np.empty(len(counts), dtype=np.int32)
+        values = np.empty(len(counts), dtype=np.int32)
+        for position, (term, count) in enumerate(counts.items()):
+            column = self.vocabulary.get(term)
+            if column is None:
+                column = len(self.terms)
+                self.vocabulary[term] = column
+                self.terms.append(term)
+            columns[position] = column
+            values[position] = count
+        self._pending.append((columns, values))
+
+    def _flush(self) -> None:
+        """Scala oczekujące wiersze z tablicami CSR."""
+        if not self._pending:
+            return
+        lengths = np.fromiter((len(cols) for cols, _ in self._pending),
+                              dtype=np.int64, count=len(self._pending))
+        self.indptr = np.concatenate([self.indptr, self.indptr[-1] + np.cumsum(lengths)])
+        self.indices = np.concatenate([self.indices] + [cols for cols, _ in self._pending])
+        self.data = np.concatenate([self.data] + [vals for _, vals in self._pending])
+        self._pending = []
+
+    def column_sums(self, row_mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Zwraca sumy kolumn (liczności termów) dla wierszy wybranych maską.
+
+        Args:
+            row_mask: Maska logiczna wierszy; może być krótsza niż liczba
+                wierszy (brakujące wiersze są pomijane). None = wszystkie wiersze.
+
+        Returns:
+            Tablica liczności o długości równej rozmiarowi słownika
+        """
+        self._flush()
+        n_terms = len(self.terms)
+        if row_mask is None:
+            return np.bincount(self.indices, weights=self.data, minlength=n_terms).astype(np.int64)
+
+        mask = np.zeros(self.n_rows, dtype=bool)
+        limit = min(len(row_mask), self.n_rows)
+        mask[:limit] = np.asarray(row_mask, dtype=bool)[:limit]
+        entry_mask = np.repeat(mask, np.diff(self.indptr))
+        return np.bincount(self.indices[entry_mask], weights=self.data[entry_mask],
+                           minlength=n_terms).astype(np.int64)
+
+    def top_terms(
+        self,
+        limit: int,
+        row_mask: Optional[np.ndarray] = None,
+        exclude: Optional[Set[str]] = None,
+    ) -> List[Tuple[str, int]]:
+        """
+        Zwraca najczęstsze termy w wybranych wierszach.
+
+        Args:
+            limit: Liczba termów do zwrócenia
+            row_mask: Maska logiczna wierszy (patrz column_sums)
+            exclude: Termy pomijane w wyniku (np. stopwords)
+
+        Returns:
+            Lista krotek (term, liczba wystąpień) w kolejności malejącej
+        """
+        sums = self.column_sums(row_mask)
+        if exclude:
+            for term in exclude:
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    sums[column] = 0
+        candidates = np.flatnonzero(sums)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-sums[candidates], limit - 1)[:limit]]
+        order = candidates[np.argsort(-sums[candidates], kind="stable")]
+        return [(self.terms[column], int(sums[column])) for column in order]
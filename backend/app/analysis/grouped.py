@@ -0,0 +1,136 @@
+"""
+Statystyki grupowane opinii oraz zgodność przewidzianych etykiet
+(sentiment_label) z etykietami referencyjnymi z datasetu (sentiment).
+Obliczenia są wektorowe (groupby / crosstab) na kolumnach snapshotu.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Etykiety sentymentu w kolejności wierszy/kolumn macierzy pomyłek
+LABELS = ["negative", "positive"]
+
+# Parametr by -> kolumna DataFrame
+GROUP_COLUMNS = {
+    "rating": "rating",
+    "sentiment": "sentiment",
+    "label": "sentiment_label",
+}
+
+
+def _normalized_labels(series: pd.Series) -> pd.Series:
+    """Zwraca etykiety małymi literami; wartości spoza LABELS jako brak (NaN)."""
+    labels = series.astype("string").str.strip().str.lower()
+    return labels.where(labels.isin(LABELS))
+
+
+def _agreement(df: pd.DataFrame) -> pd.Series:
+    """
+    Zgodność etykiety przewidzianej z referencyjną per opinia:
+    1.0 / 0.0, NaN dla opinii bez etykiety referencyjnej.
+    """
+    if "sentiment" not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    reference = _normalized_labels(df["sentiment"])
+    predicted = df["sentiment_label"].astype("string")
+    agree = (reference == predicted).astype("float64")
+    return agree.where(reference.notna())
+
+
+def grouped_statistics(df: pd.DataFrame, by: str) -> List[Dict]:
+    """
+    Liczy statystyki opinii w grupach wyznaczonych przez kolumnę.
+
+    Args:
+        df: DataFrame z opiniami po analizie sentymentu
+        by: Klucz grupowania: 'rating', 'sentiment' (etykieta referencyjna)
+            lub 'label' (etykieta przewidziana)
+
+    Returns:
+        Lista słowników (key, count, percentage, average_polarity,
+        positive_count, negative_count, agreement_rate) posortowana po kluczu
+
+    Raises:
+        KeyError: Brak kolumny grupowania w danych
+    """
+    column = GROUP_COLUMNS[by]
+    if column not in df.columns:
+        raise KeyError(column)
+
+    keys = df[column]
+    if by == "sentiment":
+        keys = _normalized_labels(keys)
+    frame = pd.DataFrame({
+        "key": keys.astype("string").fillna("brak"),
+        "polarity": df["polarity"].astype("float64"),
+        "positive": (df["sentiment_label"] == "positive").astype("int64"),
+        "agree": _agreement(df),
+    })
+    grouped = frame.groupby("key", sort=True).agg(
+        count=("polarity", "size"),
+        average_polarity=("polarity", "mean"),
+        positive_count=("positive", "sum"),
+        agreement_rate=("agree", "mean"),
+    )
+
+    total = len(frame)
+    groups = []
+    for key, row in grouped.iterrows():
+        count = int(row["count"])
+        agreement = row["agreement_rate"]
+        groups.append({
+            "key": str(key),
+            "count": count,
+            "percentage": round(count / total * 100, 2) if total else 0.0,
+            "average_polarity": round(float(row["average_polarity"]), 4),
+            "positive_count": int(row["positive_count"]),
+            "negative_count": count - int(row["positive_count"]),
+            "agreement_rate": round(float(agreement) * 100, 2) if pd.notna(agreement) else None,
+        })
+    return groups
+
+
+def confusion_matrix(df: pd.DataFrame) -> Optional[Dict]:
+    """
+    Buduje macierz pomyłek: wiersze - etykieta referencyjna (sentiment),
+    kolumny - etykieta przewidziana (sentiment_label).
+
+    Args:
+        df: DataFrame z opiniami po analizie sentymentu
+
+    Returns:
+        Słownik z etykietami, macierzą, liczbą opinii z etykietą referencyjną,
+        zgodnością oraz precision/recall per etykieta; None bez kolumny sentiment
+    """
+    if "sentiment" not in df.columns:
+        return None
+
+    reference = _normalized_labels(df["sentiment"])
+    labelled = reference.notna()
+    matrix = pd.crosstab(
+        reference[labelled].astype(str),
+        df.loc[labelled, "sentiment_label"].astype(str),
+    ).reindex(index=LABELS, columns=LABELS, fill_value=0)
+
+    counts = matrix.to_numpy()
+    total = int(counts.sum())
+    correct = int(np.trace(counts))
+    precision = {}
+    recall = {}
+    for i, label in enumerate(LABELS):
+        predicted = int(counts[:, i].sum())
+        actual = int(counts[i, :].sum())
+        precision[label] = round(counts[i, i] / predicted * 100, 2) if predicted else None
+        recall[label] = round(counts[i, i] / actual * 100, 2) if actual else None
+
+    return {
+        "labels": LABELS,
+        "matrix": counts.astype(int).tolist(),
+        "labelled": total,
+        "unlabelled": int(len(df) - total),
+        "agreement_rate": round(correct / total * 100, 2) if total else None,
+        "precision": precision,
+        "recall": recall,
+    }
@@ -0,0 +1,114 @@
+"""
+Struktury pochodne zbioru opinii (indeks wyszukiwania, macierz dokument-term,
+szkice, statystyki fraz, agregaty trendów), budowane razem z danych
+i aktualizowane przyrostowo przy dopisywaniu opinii.
+"""
+
+import copy
+
+import pandas as pd
+
+from ..config import POLARITY_HISTOGRAM_BINS, WORDS_SKETCH_CAPACITY
+from ..utils.sketches import FixedHistogram, KLLSketch, SpaceSaving
+from .doc_term import DocTermMatrix
+from .phrases import PhraseStatistics
+from .preprocessing import get_stopwords
+from .search_index import InvertedIndex, tokenize_for_index
+from .trends import TrendAggregator
+
+
+class DatasetIndexes:
+    """
+    Komplet struktur pochodnych dla jednego zbioru opinii.
+    Komplet opublikowany w snapshocie nie jest już modyfikowany: dopisanie
+    opinii tworzy kopię (extended), więc każda wersja snapshotu widzi
+    wyłącznie własne wiersze.
+    """
+
+    def __init__(self):
+        """Inicjalizuje puste struktury."""
+        self.search_index = InvertedIndex()
+        self.doc_term_matrix = DocTermMatrix()
+        self.word_sketch = SpaceSaving(capacity=WORDS_SKETCH_CAPACITY)
+        self.phrase_stats = PhraseStatistics(stop_words=get_stopwords())
+        self.trend_aggregator = TrendAggregator()
+        self.polarity_sketch = KLLSketch()
+        self.polarity_histogram = FixedHistogram(bins=POLARITY_HISTOGRAM_BINS)
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "DatasetIndexes":
+        """
+        Buduje od zera struktury pomocnicze dla danych.
+
+        Args:
+            df: DataFrame z opiniami po analizie sentymentu
+
+        Returns:
+            Nowy komplet struktur
+        """
+        indexes = cls()
+        indexes.update(df, 0)
+        return indexes
+
+    def copy(self) -> "DatasetIndexes":
+        """
+        Zwraca niezależną kopię struktur. Duże struktury (indeks, macierz,
+        nieograniczone liczniki fraz) kopiują tylko to, co zmieni się przy
+        dopisywaniu; szkice mają ograniczony rozmiar i są kopiowane w całości.
+        """
+        clone = DatasetIndexes.__new__(DatasetIndexes)
+        clone.search_index = self.search_index.copy()
+        clone.doc_term_matrix = self.doc_term_matrix.copy()
+        clone.word_sketch = copy.deepcopy(self.word_sketch)
+        clone.phrase_stats = self.phrase_stats.copy()
+        clone.trend_aggregator = copy.deepcopy(self.trend_aggregator)
+        clone.polarity_sketch = copy.deepcopy(self.polarity_sketch)
+        clone.polarity_histogram = copy.deepcopy(self.polarity_histogram)
+        return clone
+
+    def extended(self, df: pd.DataFrame, start: int) -> "DatasetIndexes":
+        """
+        Zwraca nowy komplet struktur rozszerzony o wiersze df od pozycji start;
+        bieżący komplet pozostaje nietknięty (także gdy dopisywanie się nie powiedzie).
+
+        Args:
+            df: DataFrame z opiniami (pozycja wiersza = id dokumentu)
+            start: Pozycja pierwszego nowego wiersza
+
+        Returns:
+            Nowy komplet struktur
+        """
+        indexes = self.copy()
+        indexes.update(df, start)
+        return indexes
+
+    def update(self, df: pd.DataFrame, start: int) -> None:
+        """
+        Dopisuje do struktur wiersze df od pozycji start (w miejscu - tylko
+        dla kompletu, który nie został jeszcze opublikowany).
+
+        Args:
+            df: DataFrame z opiniami (pozycja wiersza = id dokumentu)
+            start: Pozycja pierwszego nowego wiersza
+        """
+        new_rows = df.iloc[start:]
+        self._index_rows(df, start)
+        self.trend_aggregator.add_frame(new_rows)
+        self.polarity_sketch.update_many(new_rows["polarity"].tolist())
+        self.polarity_histogram.update_many(new_rows["polarity"].tolist())
+
+    def _index_rows(self, df: pd.DataFrame, start: int) -> None:
+        """
+        Tokenizuje raz wiersze df od pozycji start i dopisuje je do struktur
+        opartych na tokenach (indeks wyszukiwania, macierz dokument-term,
+        szkic TOP słów, statystyki fraz).
+        """
+        stop_words = get_stopwords()
+        texts = df["review_text"].iloc[start:].astype(str).tolist()
+        labels = df["sentiment_label"].iloc[start:].astype(str).tolist()
+        for offset, (text, label) in enumerate(zip(texts, labels)):
+            tokens = tokenize_for_index(text)
+            self.search_index.add_document(start + offset, tokens)
+            self.doc_term_matrix.add_document(tokens)
+            self.word_sketch.update_many(t for t in tokens if t not in stop_words)
+            self.phrase_stats.add(tokens, label)
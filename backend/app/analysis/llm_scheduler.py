@@ -0,0 +1,155 @@
+"""
+Harmonogram wywołań LLM z klasami priorytetu.
+Interaktywne analizy (/api/analyze) nie czekają za tysiącami wywołań
+z przeliczania datasetu: część miejsc jest dla nich zarezerwowana, a wolne
+miejsca są przydzielane klasom według ważonego sprawiedliwego kolejkowania (WFQ).
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from ..config import (BATCH_CONCURRENT_LIMIT, LLM_INTERACTIVE_RESERVED,
+                      LLM_WEIGHT_BACKGROUND, LLM_WEIGHT_BULK,
+                      LLM_WEIGHT_INTERACTIVE)
+from ..utils.sketches import KLLSketch
+
+# Klasy priorytetu wywołań LLM
+PRIORITY_INTERACTIVE = "interactive"  # pojedyncze analizy użytkownika
+PRIORITY_BULK = "bulk"  # /api/analyze/batch i zadania analizy w tle
+PRIORITY_BACKGROUND = "background"  # ocena datasetu przy starcie i przeładowaniu
+
+
+class LLMScheduler:
+    """
+    Ogranicza liczbę równoległych wywołań LLM i przydziela zwalniane miejsca
+    klasom priorytetu. Klasa z najmniejszym czasem wirtualnym dostaje miejsce
+    pierwsza; każde przydzielone miejsce przesuwa jej czas o 1/waga.
+    Klasy inne niż interaktywna mogą zająć co najwyżej capacity - reserved miejsc.
+    """
+
+    def __init__(
+        self,
+        capacity: int = BATCH_CONCURRENT_LIMIT,
+        reserved_interactive: int = LLM_INTERACTIVE_RESERVED,
+        weights: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Inicjalizuje harmonogram.
+
+        Args:
+            capacity: Maksymalna liczba równoległych wywołań LLM
+            reserved_interactive: Miejsca dostępne wyłącznie dla klasy interaktywnej
+                (co najmniej jedno miejsce zostaje dla pozostałych klas)
+            weights: Wagi klas priorytetu (domyślnie z konfiguracji)
+        """
+        self.capacity = capacity
+        self.reserved = max(0, min(reserved_interactive, capacity - 1))
+        self.weights = weights or {
+            PRIORITY_INTERACTIVE: LLM_WEIGHT_INTERACTIVE,
+            PRIORITY_BULK: LLM_WEIGHT_BULK,
+            PRIORITY_BACKGROUND: LLM_WEIGHT_BACKGROUND,
+        }
+        self.in_use = 0
+        self.in_use_by = {priority: 0 for priority in self.weights}
+        self.queues = {priority: deque() for priority in self.weights}
+        self.vtime = {priority: 0.0 for priority in self.weights}
+        self.global_vtime = 0.0
+        self.granted = {priority: 0 for priority in self.weights}
+        self.wait_sketches = {priority: KLLSketch() for priority in self.weights}
+
+    def _eligible(self, priority: str) -> bool:
+        """Sprawdza, czy klasa może teraz dostać miejsce."""
+        if self.in_use >= self.capacity:
+            return False
+        if priority == PRIORITY_INTERACTIVE:
+            return True
+        others = self.in_use - self.in_use_by.get(PRIORITY_INTERACTIVE, 0)
+        return others < self.capacity - self.reserved
+
+    def _dispatch(self) -> None:
+        """Przydziela wolne miejsca oczekującym według czasu wirtualnego klas."""
+        while self.in_use < self.capacity:
+            candidates = [
+                priority for priority, queue in self.queues.items()
+                if queue and self._eligible(priority)
+            ]
+            if not candidates:
+                return
+            priority = min(candidates, key=lambda p: self.vtime[p])
+            future = self.queues[priority].popleft()
+            if future.done():
+                # Oczekujący został anulowany
+                continue
+            self.global_vtime = self.vtime[priority]
+            self.vtime[priority] += 1.0 / self.weights[priority]
+            self.in_use += 1
+            self.in_use_by[priority] += 1
+            future.set_result(None)
+
+    def _release(self, priority: str) -> None:
+        """Zwalnia miejsce i przydziela je kolejnemu oczekującemu."""
+        self.in_use -= 1
+        self.in_use_by[priority] -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: str = PRIORITY_INTERACTIVE) -> AsyncIterator[None]:
+        """
+        Zajmuje miejsce na wywołanie LLM w danej klasie priorytetu.
+
+        Args:
+            priority: Klasa priorytetu (interactive, bulk lub background)
+
+        Raises:
+            ValueError: Nieznana klasa priorytetu
+        """
+        if priority not in self.weights:
+            raise ValueError(f"Nieznana klasa priorytetu: {priority}")
+
+        queue = self.queues[priority]
+        if not queue:
+            # Klasa wraca do kolejki - nie może odrobić czasu bezczynności
+            self.vtime[priority] = max(self.vtime[priority], self.global_vtime)
+        future = asyncio.get_running_loop().create_future()
+        queue.append(future)
+        started = time.monotonic()
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Miejsce przydzielono tuż przed anulowaniem
+                self._release(priority)
+            else:
+                future.cancel()
+            raise
+
+        self.granted[priority] += 1
+        self.wait_sketches[priority].update(time.monotonic() - started)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    def get_stats(self) -> Dict:
+        """Zwraca statystyki harmonogramu (czasy oczekiwania w sekundach)."""
+        classes = {}
+        for priority, sketch in self.wait_sketches.items():
+            p50, p99 = sketch.quantiles([0.5, 0.99])
+            classes[priority] = {
+                "weight": self.weights[priority],
+                "in_use": self.in_use_by[priority],
+                "waiting": sum(1 for future in self.queues[priority] if not future.done()),
+                "granted": self.granted[priority],
+                "wait_p50": round(p50, 4) if p50 is not None else None,
+                "wait_p99": round(p99, 4) if p99 is not None else None,
+            }
+        return {
+            "capacity": self.capacity,
+            "reserved_interactive": self.reserved,
+            "in_use": self.in_use,
+            "classes": classes,
+        }
@@ -0,0 +1,123 @@
+"""
+Micro-batching pojedynczych analiz sentymentu.
+Żądania tej samej klasy priorytetu, które trafią do klienta Ollama w krótkim
+oknie czasowym, są łączone w jeden prompt z wieloma opiniami; każdy wywołujący dostaje
+własny wynik, a opinie bez poprawnego wyniku są oceniane osobno.
+"""
+
+import asyncio
+from typing import TYPE_CHECKING, Dict, List, Set, Tuple
+
+from ..config import MICRO_BATCH_MAX_SIZE, MICRO_BATCH_WINDOW_MS
+
+if TYPE_CHECKING:
+    from .ollama_client import OllamaClient
+
+
+class MicroBatcher:
+    """
+    Agregator żądań przed klientem Ollama: zbiera opinie przez window_ms
+    milisekund albo do max_size opinii i wysyła je jednym wywołaniem LLM.
+    """
+
+    def __init__(
+        self,
+        client: "OllamaClient",
+        window_ms: float = MICRO_BATCH_WINDOW_MS,
+        max_size: int = MICRO_BATCH_MAX_SIZE,
+    ):
+        """
+        Inicjalizuje agregator.
+
+        Args:
+            client: Klient Ollama wykonujący wywołania
+            window_ms: Maksymalny czas zbierania partii (milisekundy)
+            max_size: Maksymalna liczba opinii w jednym prompcie
+        """
+        self.client = client
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        # Oczekujące opinie i timery okna osobno dla każdej klasy priorytetu
+        self.pending: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {"requests": 0, "llm_calls": 0, "batched_items": 0, "fallbacks": 0}
+
+    async def submit(self, text: str, priority: str) -> Dict:
+        """
+        Dodaje opinię do bieżącej partii swojej klasy priorytetu i czeka na wynik.
+
+        Args:
+            text: Tekst opinii (po sprawdzeniu cache)
+            priority: Klasa priorytetu wywołania LLM
+
+        Returns:
+            Słownik z polarity, subjectivity i label
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self.pending.setdefault(priority, [])
+        pending.append((text, future))
+        self.stats["requests"] += 1
+        if len(pending) >= self.max_size:
+            self._flush(priority)
+        elif priority not in self._timers:
+            self._timers[priority] = loop.call_later(self.window, self._flush, priority)
+        return await future
+
+    def _flush(self, priority: str) -> None:
+        """Zamyka bieżącą partię klasy priorytetu i uruchamia jej analizę."""
+        timer = self._timers.pop(priority, None)
+        if timer is not None:
+            timer.cancel()
+        items = self.pending.pop(priority, [])
+        if not items:
+            return
+        task = asyncio.ensure_future(self._run_batch(items, priority))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, items: List[Tuple[str, asyncio.Future]], priority: str) -> None:
+        """Analizuje partię i przekazuje wyniki do oczekujących."""
+        # Te same teksty w partii oceniane są raz
+        texts = list(dict.fromkeys(text for text, _ in items))
+        try:
+            if len(texts) == 1:
+                results = {texts[0]: await self._analyze_single(texts[0], priority)}
+            else:
+                async with self.client.scheduler.slot(priority):
+                    batch_results = await self.client._analyze_batch_with_ollama(texts)
+                self.stats["llm_calls"] += 1
+                self.stats["batched_items"] += len(texts)
+
+                results = dict(zip(texts, batch_results))
+                missing = [text for text, result in results.items() if result is None]
+                self.stats["fallbacks"] += len(missing)
+                for text, result in zip(missing, await asyncio.gather(
+                        *(self._analyze_single(text, priority) for text in missing))):
+                    results[text] = result
+
+            for text, future in items:
+                if not future.done():
+                    future.set_result(results[text])
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _analyze_single(self, text: str, priority: str) -> Dict:
+        """Ocenia jedną opinię osobnym wywołaniem (z retry i fallbackiem TextBlob)."""
+        async with self.client.scheduler.slot(priority):
+            result = await self.client._analyze_with_ollama(text, use_cache=True)
+        self.stats["llm_calls"] += 1
+        return result
+
+    def get_stats(self) -> Dict:
+        """Zwraca statystyki agregatora."""
+        calls = self.stats["llm_calls"]
+        return {
+            **self.stats,
+            "requests_per_call": round(self.stats["requests"] / calls, 2) if calls else 0.0,
+            "window_ms": self.window * 1000,
+            "max_size": self.max_size,
+        }
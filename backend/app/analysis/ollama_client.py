@@ -6,7 +6,7 @@ Zawiera prompt engineering i parsing odpowiedzi JSON.
 import json
 import re
 import asyncio
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import ollama
 from textblob import TextBlob
 
@@ -16,9 +16,15 @@ from ..config import (
     OLLAMA_TIMEOUT,
     OLLAMA_MAX_RETRIES,
     OLLAMA_RETRY_DELAY,
-    USE_OLLAMA
+    BATCH_CONCURRENT_LIMIT,
+    USE_OLLAMA,
+    NEAR_DUP_ENABLED,
+    MICRO_BATCH_MAX_SIZE
 )
 from ..utils.cache import sentiment_cache
+from ..utils.near_duplicates import near_duplicate_index
+from .llm_scheduler import PRIORITY_INTERACTIVE, LLMScheduler
+from .micro_batch import MicroBatcher
 
 
 class OllamaClient:
@@ -30,7 +36,8 @@ class OllamaClient:
         self,
         base_url: str = OLLAMA_BASE_URL,
         model: str = OLLAMA_MODEL,
-        timeout: int = OLLAMA_TIMEOUT
+        timeout: int = OLLAMA_TIMEOUT,
+        concurrent_limit: int = BATCH_CONCURRENT_LIMIT
     ):
         """
         Inicjalizuje klienta Ollama.
@@ -39,11 +46,18 @@ class OllamaClient:
             base_url: URL serwera Ollama
             model: Nazwa modelu do użycia
             timeout: Timeout dla zapytań w sekundach
+            concurrent_limit: Maksymalna liczba równoległych wywołań LLM
+                (wspólna dla wszystkich endpointów i batchy, przydzielana według priorytetu)
         """
         self.base_url = base_url
         self.model = model
         self.timeout = timeout
         self.client = ollama.Client(host=base_url)
+        self.scheduler = LLMScheduler(concurrent_limit)
+        # Łączenie równoczesnych pojedynczych analiz w jeden prompt
+        self.batcher = MicroBatcher(self)
+        # Wyniki ocen modelem: poprawne odpowiedzi i fallbacki do TextBlob
+        self.stats = {"model_results": 0, "fallbacks": 0}
     
     def _create_prompt(self, review_text: str) -> str:
         """
@@ -69,6 +83,75 @@ JSON:"""
         
         return prompt
     
+    def _create_batch_prompt(self, review_texts: List[str]) -> str:
+        """
+        Tworzy prompt dla analizy sentymentu wielu opinii naraz.
+        
+        Args:
+            review_texts: Teksty opinii do analizy (numerowane od 1)
+        
+        Returns:
+            Sformatowany prompt
+        """
+        reviews = "\n".join(
+            f"{number}. {' '.join(text.split())}"
+            for number, text in enumerate(review_texts, start=1)
+        )
+        prompt = f"""You are a sentiment analysis assistant. Analyze the sentiment of each of the following customer reviews and return ONLY a valid JSON array with exactly one object per review, in this format:
+[{{"id": <review number>, "polarity": <number between -1.0 and 1.0>, "label": "<positive or negative>"}}]
+
+Rules:
+- id: the number of the review in the list below
+- polarity: -1.0 (very negative) to 1.0 (very positive), where 0.0 is neutral
+- label: "positive" if polarity > 0, "negative" if polarity <= 0
+- Return ONLY the JSON array, no additional text, no explanations
+
+Reviews:
+{reviews}
+
+JSON:"""
+        
+        return prompt
+    
+    def _parse_batch_response(self, response_text: str, count: int) -> List[Optional[Dict]]:
+        """
+        Parsuje odpowiedź modelu na prompt z wieloma opiniami.
+        
+        Args:
+            response_text: Tekst odpowiedzi z modelu
+            count: Liczba opinii w prompcie
+        
+        Returns:
+            Lista wyników w kolejności opinii (None dla opinii bez poprawnego wyniku)
+        """
+        results: List[Optional[Dict]] = [None] * count
+        if not response_text:
+            return results
+        
+        # Tablica JSON może być otoczona dodatkowym tekstem
+        start_idx = response_text.find('[')
+        end_idx = response_text.rfind(']')
+        if start_idx == -1 or end_idx < start_idx:
+            return results
+        try:
+            items = json.loads(response_text[start_idx:end_idx + 1])
+        except json.JSONDecodeError as e:
+            print(f"Błąd parsowania JSON z odpowiedzi (batch): {e}")
+            return results
+        if not isinstance(items, list):
+            return results
+        
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            try:
+                number = int(item.get('id', position + 1))
+            except (ValueError, TypeError):
+                continue
+            if 1 <= number <= count and results[number - 1] is None:
+                results[number - 1] = self._validate_and_normalize(item)
+        return results
+    
     def _parse_response(self, response_text: str) -> Optional[Dict]:
         """
         Parsuje odpowiedź z modelu i wyodrębnia JSON.
@@ -185,13 +268,31 @@ JSON:"""
             'label': label
         }
     
-    async def analyze_sentiment(self, text: str, use_cache: bool = True) -> Dict:
+    def analyze_local(self, text: str) -> Dict:
+        """
+        Ocenia tekst bez wywołania Ollama: wynik z cache, a przy jego braku TextBlob.
+        Wynik TextBlob nie trafia do cache, aby późniejsza ocena modelem go zastąpiła.
+        
+        Args:
+            text: Tekst opinii do analizy
+        
+        Returns:
+            Słownik z polarity (-1 do 1), subjectivity (0 do 1) i label
+        """
+        cached_result = sentiment_cache.get(text)
+        if cached_result:
+            return cached_result
+        return self._analyze_with_textblob_fallback(text)
+    
+    async def analyze_sentiment(self, text: str, use_cache: bool = True,
+                                priority: str = PRIORITY_INTERACTIVE) -> Dict:
         """
         Analizuje sentyment tekstu przy użyciu Ollama (lub TextBlob jako fallback).
         
         Args:
             text: Tekst opinii do analizy
             use_cache: Czy używać cache
+            priority: Klasa priorytetu wywołania LLM (zob. LLMScheduler)
         
         Returns:
             Słownik z polarity (-1 do 1), subjectivity (0 do 1) i label
@@ -212,39 +313,112 @@ JSON:"""
                 sentiment_cache.set(text, result)
             return result
         
-        # Wywołanie Ollama z retry logic
+        # Sprawdź niemal identyczne, już ocenione opinie (MinHash/LSH)
+        if use_cache and NEAR_DUP_ENABLED:
+            match = near_duplicate_index.find(text)
+            if match:
+                matched_result, similarity = match
+                result = {
+                    **matched_result,
+                    'near_duplicate': True,
+                    'similarity': round(similarity, 4)
+                }
+                sentiment_cache.set(text, result)
+                return result
+        
+        # Równoczesne analizy są łączone w jeden prompt (micro-batching)
+        if use_cache and MICRO_BATCH_MAX_SIZE > 1:
+            return await self.batcher.submit(text, priority)
+        
+        # Wywołanie Ollama - wspólny limit równoległości dla całej aplikacji
+        async with self.scheduler.slot(priority):
+            return await self._analyze_with_ollama(text, use_cache)
+    
+    async def _chat(self, prompt: str) -> str:
+        """
+        Wysyła prompt do Ollama i zwraca tekst odpowiedzi.
+        
+        Args:
+            prompt: Treść promptu
+        
+        Returns:
+            Tekst odpowiedzi modelu
+        """
+        # Synchronous call do Ollama (ollama library nie jest async)
+        # Użyj asyncio.to_thread dla async wrapper
+        loop = asyncio.get_event_loop()
+        response = await loop.run_in_executor(
+            None,
+            lambda: self.client.chat(
+                model=self.model,
+                messages=[
+                    {
+                        'role': 'user',
+                        'content': prompt
+                    }
+                ],
+                stream=False,  # Wyłącz streaming dla kompletnej odpowiedzi
+                options={'temperature': 0.1}  # Niskie temperature dla konsystencji
+            )
+        )
+        
+        # Wyodrębnij tekst odpowiedzi z chat response
+        return response.get('message', {}).get('content', '')
+    
+    async def _analyze_batch_with_ollama(self, texts: List[str]) -> List[Optional[Dict]]:
+        """
+        Ocenia wiele opinii jednym wywołaniem Ollama (bez retry - opinie bez
+        wyniku wywołujący ocenia osobno przez _analyze_with_ollama).
+        Poprawne wyniki trafiają do cache i indeksu niemal identycznych opinii.
+        
+        Args:
+            texts: Teksty opinii do analizy
+        
+        Returns:
+            Lista wyników w kolejności tekstów (None dla opinii bez wyniku)
+        """
+        try:
+            response_text = await self._chat(self._create_batch_prompt(texts))
+        except Exception as e:
+            print(f"Błąd podczas wywoływania Ollama (batch {len(texts)} opinii): {e}")
+            return [None] * len(texts)
+        
+        results = self._parse_batch_response(response_text, len(texts))
+        for text, result in zip(texts, results):
+            if result:
+                self.stats["model_results"] += 1
+                sentiment_cache.set(text, result)
+                if NEAR_DUP_ENABLED:
+                    near_duplicate_index.add(text, result)
+        return results
+    
+    async def _analyze_with_ollama(self, text: str, use_cache: bool) -> Dict:
+        """
+        Wywołuje Ollama z retry logic (TextBlob jako fallback po nieudanych próbach).
+        
+        Args:
+            text: Tekst opinii do analizy
+            use_cache: Czy zapisywać wynik w cache
+        
+        Returns:
+            Słownik z polarity, subjectivity i label
+        """
         prompt = self._create_prompt(text)
         
         for attempt in range(OLLAMA_MAX_RETRIES):
             try:
-                # Synchronous call do Ollama (ollama library nie jest async)
-                # Użyj asyncio.to_thread dla async wrapper
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(
-                    None,
-                    lambda: self.client.chat(
-                        model=self.model,
-                        messages=[
-                            {
-                                'role': 'user',
-                                'content': prompt
-                            }
-                        ],
-                        stream=False,  # Wyłącz streaming dla kompletnej odpowiedzi
-                        options={'temperature': 0.1}  # Niskie temperature dla konsystencji
-                    )
-                )
-                
-                # Wyodrębnij tekst odpowiedzi z chat response
-                response_text = response.get('message', {}).get('content', '')
+                response_text = await self._chat(prompt)
                 
                 # Parsuj odpowiedź
                 result = self._parse_response(response_text)
                 
                 if result:
+                    self.stats["model_results"] += 1
                     # Walidacja i normalizacja
                     if use_cache:
                         sentiment_cache.set(text, result)
+                        if NEAR_DUP_ENABLED:
+                            near_duplicate_index.add(text, result)
                     return result
                 else:
                     print(f"Nie udało się sparsować odpowiedzi z Ollama (próba {attempt + 1}/{OLLAMA_MAX_RETRIES})")
@@ -258,17 +432,34 @@ JSON:"""
                 else:
                     # Ostatnia próba nie powiodła się, użyj fallback
                     print("Używam TextBlob jako fallback")
+                    self.stats["fallbacks"] += 1
                     result = self._analyze_with_textblob_fallback(text)
                     if use_cache:
                         sentiment_cache.set(text, result)
                     return result
         
         # Jeśli wszystkie próby nie powiodły się, użyj fallback
+        self.stats["fallbacks"] += 1
         result = self._analyze_with_textblob_fallback(text)
         if use_cache:
             sentiment_cache.set(text, result)
         return result
     
+    def get_stats(self) -> Dict:
+        """
+        Zwraca statystyki ocen modelem.
+        
+        Returns:
+            Słownik z liczbą wyników modelu, fallbacków do TextBlob
+            i odsetkiem fallbacków (fallback_rate, %)
+        """
+        total = self.stats["model_results"] + self.stats["fallbacks"]
+        fallback_rate = (self.stats["fallbacks"] / total * 100) if total > 0 else 0.0
+        return {
+            **self.stats,
+            "fallback_rate": round(fallback_rate, 2)
+        }
+    
     async def health_check(self) -> bool:
         """
         Sprawdza czy Ollama jest dostępny.
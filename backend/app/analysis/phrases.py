@@ -0,0 +1,193 @@
+"""
+Statystyki fraz (bigramy i trigramy) z miarą kolokacji PMI.
+Liczniki są utrzymywane przyrostowo, osobno dla każdej etykiety sentymentu,
+więc zapytanie o TOP frazy nie wymaga ponownego skanowania opinii.
+"""
+
+import heapq
+import math
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Klucz liczników obejmujących wszystkie opinie
+ALL_LABELS = "all"
+
+# Obsługiwane długości n-gramów
+NGRAM_SIZES = (2, 3)
+
+
+class LayeredCounter:
+    """
+    Licznik złożony z zamrożonych warstw współdzielonych z poprzednimi
+    wersjami i własnej warstwy zapisu. Kopia nie kopiuje liczników -
+    dotychczasowa warstwa zapisu staje się kolejną zamrożoną warstwą.
+    Sąsiednie warstwy są scalane, gdy młodsza urośnie do połowy starszej,
+    więc rozmiary warstw maleją geometrycznie (O(log n) warstw).
+    """
+
+    def __init__(self, layers: Tuple[Counter, ...] = ()):
+        self._layers = layers
+        self._top: Counter = Counter()
+
+    def copy(self) -> "LayeredCounter":
+        """
+        Zwraca kopię licznika. Po wywołaniu oryginał nie może być już
+        modyfikowany - jego warstwa zapisu jest współdzielona z kopią.
+        """
+        layers = self._layers + ((self._top,) if self._top else ())
+        while len(layers) >= 2 and 2 * len(layers[-1]) >= len(layers[-2]):
+            merged = Counter(layers[-2])
+            merged.update(layers[-1])
+            layers = layers[:-2] + (merged,)
+        return LayeredCounter(layers)
+
+    def update(self, items: Iterable) -> None:
+        """Zwiększa liczniki elementów (w warstwie zapisu)."""
+        self._top.update(items)
+
+    def get(self, key, default: int = 0) -> int:
+        """Zwraca sumę licznika klucza ze wszystkich warstw."""
+        total = self._top.get(key, 0)
+        for layer in self._layers:
+            total += layer.get(key, 0)
+        return total or default
+
+    def __getitem__(self, key) -> int:
+        return self.get(key)
+
+    def items(self):
+        """Zwraca pary (klucz, licznik) po scaleniu warstw."""
+        if not self._layers:
+            return self._top.items()
+        merged = Counter(self._layers[0])
+        for layer in self._layers[1:] + (self._top,):
+            merged.update(layer)
+        return merged.items()
+
+
+class PhraseStatistics:
+    """
+    Przyrostowe liczniki unigramów, bigramów i trigramów per etykieta sentymentu.
+    N-gramy zaczynające się lub kończące stopwordem są pomijane
+    ("waste of money" jest frazą, "of money" nie).
+    """
+
+    def __init__(self, stop_words: Optional[Set[str]] = None):
+        """
+        Inicjalizuje puste liczniki.
+
+        Args:
+            stop_words: Zbiór stopwords (dozwolone tylko wewnątrz frazy)
+        """
+        self.stop_words = stop_words or set()
+        # etykieta -> licznik (liczniki nie są ograniczone - rosną ze słownikiem)
+        self.unigrams: Dict[str, LayeredCounter] = {ALL_LABELS: LayeredCounter()}
+        self.token_totals: Counter = Counter()
+        # n -> etykieta -> licznik krotek tokenów
+        self.ngrams: Dict[int, Dict[str, LayeredCounter]] = {
+            n: {ALL_LABELS: LayeredCounter()} for n in NGRAM_SIZES
+        }
+
+    def copy(self) -> "PhraseStatistics":
+        """
+        Zwraca kopię liczników (warstwowo, bez kopiowania zawartości).
+        Po wywołaniu oryginał traktujemy jako zamrożony - opublikowane
+        wersje indeksów nigdy nie są modyfikowane.
+        """
+        clone = PhraseStatistics(stop_words=self.stop_words)
+        clone.unigrams = {key: counts.copy() for key, counts in self.unigrams.items()}
+        clone.token_totals = Counter(self.token_totals)
+        clone.ngrams = {
+            n: {key: counts.copy() for key, counts in by_label.items()}
+            for n, by_label in self.ngrams.items()
+        }
+        return clone
+
+    def add(self, tokens: List[str], label: str) -> None:
+        """
+        Dodaje tokeny opinii do liczników.
+
+        Args:
+            tokens: Tokeny opinii (z zachowanymi stopwords)
+            label: Etykieta sentymentu opinii
+        """
+        for key in (ALL_LABELS, label):
+            self.unigrams.setdefault(key, LayeredCounter()).update(tokens)
+            self.token_totals[key] += len(tokens)
+
+        for n in NGRAM_SIZES:
+            phrases = [
+                tuple(tokens[i:i + n])
+                for i in range(len(tokens) - n + 1)
+                if tokens[i] not in self.stop_words and tokens[i + n - 1] not in self.stop_words
+            ]
+            if not phrases:
+                continue
+            for key in (ALL_LABELS, label):
+                self.ngrams[n].setdefault(key, LayeredCounter()).update(phrases)
+
+    def add_many(self, documents: Iterable[List[str]], labels: Iterable[str]) -> None:
+        """Dodaje wiele opinii (tokeny i etykiety w tej samej kolejności)."""
+        for tokens, label in zip(documents, labels):
+            self.add(tokens, label)
+
+    def pmi(self, phrase: tuple, label: str = ALL_LABELS) -> float:
+        """
+        Oblicza PMI frazy: log2(P(w1..wn) / (P(w1) * ... * P(wn))).
+
+        Args:
+            phrase: Krotka tokenów frazy
+            label: Etykieta (zbiór opinii), na którym liczone są prawdopodobieństwa
+
+        Returns:
+            Wartość PMI (0.0 dla brakujących danych)
+        """
+        total = self.token_totals.get(label, 0)
+        count = self.ngrams[len(phrase)].get(label, LayeredCounter()).get(phrase, 0)
+        if total == 0 or count == 0:
+            return 0.0
+        unigrams = self.unigrams[label]
+        log_joint = math.log2(count / total)
+        log_independent = sum(math.log2(unigrams[token] / total) for token in phrase)
+        return log_joint - log_independent
+
+    def top(
+        self,
+        n: int = 2,
+        label: Optional[str] = None,
+        limit: int = 20,
+        min_count: int = 2,
+        sort_by: str = "count",
+    ) -> List[Dict]:
+        """
+        Zwraca TOP frazy o długości n.
+
+        Args:
+            n: Długość frazy (2 lub 3)
+            label: Etykieta sentymentu; None = wszystkie opinie
+            limit: Liczba fraz do zwrócenia
+            min_count: Minimalna liczba wystąpień (PMI jest niestabilne dla rzadkich fraz)
+            sort_by: 'count' lub 'pmi'
+
+        Returns:
+            Lista słowników: phrase, count, pmi
+        """
+        if n not in self.ngrams:
+            raise ValueError(f"Nieobsługiwana długość n-gramu: {n}")
+        key = label or ALL_LABELS
+        counts = self.ngrams[n].get(key, LayeredCounter())
+        candidates = ((phrase, count) for phrase, count in counts.items() if count >= min_count)
+
+        if sort_by == "pmi":
+            scored = ((phrase, count, self.pmi(phrase, key)) for phrase, count in candidates)
+            best = heapq.nlargest(limit, scored, key=lambda item: (item[2], item[1]))
+        else:
+            best = [
+                (phrase, count, self.pmi(phrase, key))
+                for phrase, count in heapq.nlargest(limit, candidates, key=lambda item: item[1])
+            ]
+
+        return [
+            {"phrase": " ".join(phrase), "count": count, "pmi": round(score, 4)}
+            for phrase, count, score in best
+        ]
@@ -0,0 +1,195 @@
+"""
+Indeks odwrócony (token -> posting lista opinii) do wyszukiwania pełnotekstowego.
+Tokeny pochodzą z tego samego pipeline'u preprocessingu co analiza słów,
+ale bez usuwania stopwords, aby zapytania frazowe ("waste of money") działały.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .preprocessing import preprocess_text
+
+# Klauzula zapytania: krotka tokenów (1 token = term, więcej = fraza)
+Clause = Tuple[str, ...]
+
+_QUERY_TOKEN_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize_for_index(text: str) -> List[str]:
+    """
+    Tokenizuje tekst na potrzeby indeksu (normalizacja + tokenizacja, bez usuwania stopwords).
+
+    Args:
+        text: Tekst opinii
+
+    Returns:
+        Lista tokenów w kolejności występowania
+    """
+    if not isinstance(text, str):
+        return []
+    return preprocess_text(text, remove_stop=False)
+
+
+def parse_query(query: str) -> List[List[Clause]]:
+    """
+    Parsuje zapytanie do postaci alternatywy koniunkcji (OR grup AND).
+
+    Składnia: słowa oddzielone spacją są łączone przez AND, słowo kluczowe
+    OR rozdziela grupy, fraza w cudzysłowie jest dopasowywana dokładnie.
+    Przykład: ``"customer service" great OR excellent``.
+
+    Args:
+        query: Tekst zapytania
+
+    Returns:
+        Lista grup; każda grupa to lista klauzul (krotek tokenów)
+    """
+    groups: List[List[Clause]] = [[]]
+    for match in _QUERY_TOKEN_RE.finditer(query or ""):
+        phrase, word = match.groups()
+        if word is not None and word in ("OR", "|"):
+            if groups[-1]:
+                groups.append([])
+            continue
+        if word is not None and word in ("AND", "&"):
+            continue
+        tokens = tokenize_for_index(phrase if phrase is not None else word)
+        if tokens:
+            groups[-1].append(tuple(tokens))
+    return [group for group in groups if group]
+
+
+class InvertedIndex:
+    """
+    Indeks odwrócony utrzymywany przyrostowo.
+    Identyfikatorem dokumentu jest pozycja wiersza w DataFrame z opiniami.
+    """
+
+    def __init__(self):
+        """Inicjalizuje pusty indeks."""
+        # token -> {doc_id: [pozycje tokenu w dokumencie]}
+        self.postings: Dict[str, Dict[int, List[int]]] = {}
+        self.doc_count = 0
+        # Tokeny, których posting listy są współdzielone z indeksem, z którego
+        # powstała kopia (kopiowane przy pierwszym zapisie)
+        self._shared: Set[str] = set()
+
+    def copy(self) -> "InvertedIndex":
+        """
+        Zwraca kopię indeksu (copy-on-write): posting listy są kopiowane
+        dopiero przy dopisaniu do nich dokumentu, więc kopia kosztuje O(słownik).
+        """
+        clone = InvertedIndex()
+        clone.postings = dict(self.postings)
+        clone.doc_count = self.doc_count
+        clone._shared = set(self.postings)
+        return clone
+
+    def add_document(self, doc_id: int, tokens: Iterable[str]) -> None:
+        """
+        Dodaje dokument do indeksu.
+
+        Args:
+            doc_id: Identyfikator dokumentu (pozycja wiersza)
+            tokens: Tokeny dokumentu w kolejności występowania
+        """
+        for position, token in enumerate(tokens):
+            if token in self._shared:
+                self.postings[token] = dict(self.postings[token])
+                self._shared.discard(token)
+            self.postings.setdefault(token, {}).setdefault(doc_id, []).append(position)
+        self.doc_count += 1
+
+    def add_texts(self, texts: Iterable[str], start_id: int = 0) -> None:
+        """
+        Indeksuje kolejne teksty, nadając im identyfikatory od start_id.
+
+        Args:
+            texts: Teksty opinii
+            start_id: Identyfikator pierwszego dokumentu
+        """
+        for offset, text in enumerate(texts):
+            self.add_document(start_id + offset, tokenize_for_index(text))
+
+    def document_frequency(self, token: str) -> int:
+        """Zwraca liczbę dokumentów zawierających token (długość posting listy)."""
+        return len(self.postings.get(token, {}))
+
+    def substring_document_frequency(self, fragment: str) -> int:
+        """
+        Zwraca liczbę dokumentów z tokenem zawierającym fragment - te same
+        opinie, które znajduje str.contains(fragment, case=False) na tekście
+        (np. "excellent" pasuje także do "excellently"). Skanuje słownik, nie opinie.
+        """
+        fragment = fragment.lower()
+        docs: Set[int] = set()
+        for token, postings in self.postings.items():
+            if fragment in token:
+                docs.update(postings)
+        return len(docs)
+
+    def term_docs(self, token: str) -> Set[int]:
+        """Zwraca zbiór dokumentów zawierających token."""
+        return set(self.postings.get(token, {}))
+
+    def phrase_docs(self, tokens: Clause) -> Set[int]:
+        """
+        Zwraca dokumenty zawierające frazę (tokeny na kolejnych pozycjach).
+
+        Args:
+            tokens: Tokeny frazy
+
+        Returns:
+            Zbiór identyfikatorów dokumentów
+        """
+        if len(tokens) == 1:
+            return self.term_docs(tokens[0])
+
+        posting_lists = [self.postings.get(token) for token in tokens]
+        if any(not plist for plist in posting_lists):
+            return set()
+
+        # Kandydaci: dokumenty zawierające wszystkie tokeny frazy
+        candidates = set.intersection(*(set(plist) for plist in posting_lists))
+        result = set()
+        for doc_id in candidates:
+            starts = set(posting_lists[0][doc_id])
+            for shift, plist in enumerate(posting_lists[1:], start=1):
+                starts &= {pos - shift for pos in plist[doc_id]}
+                if not starts:
+                    break
+            if starts:
+                result.add(doc_id)
+        return result
+
+    def search(self, query: str, max_doc_id: Optional[int] = None) -> List[int]:
+        """
+        Wykonuje zapytanie (term, AND/OR, fraza) i zwraca posortowane identyfikatory.
+
+        Args:
+            query: Tekst zapytania (patrz parse_query)
+            max_doc_id: Opcjonalna górna granica (wyłącznie) identyfikatorów
+
+        Returns:
+            Posortowana lista identyfikatorów dokumentów
+        """
+        matched: Set[int] = set()
+        for group in parse_query(query):
+            # Najpierw najrzadsze klauzule - szybsze zawężanie
+            clauses = sorted(group, key=lambda c: min(self.document_frequency(t) for t in c))
+            docs = self.phrase_docs(clauses[0])
+            for clause in clauses[1:]:
+                if not docs:
+                    break
+                docs &= self.phrase_docs(clause)
+            matched |= docs
+        if max_doc_id is not None:
+            matched = {doc_id for doc_id in matched if doc_id < max_doc_id}
+        return sorted(matched)
+
+    def get_stats(self) -> Dict:
+        """Zwraca statystyki indeksu."""
+        return {
+            "documents": self.doc_count,
+            "vocabulary_size": len(self.postings),
+        }
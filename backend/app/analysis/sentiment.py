@@ -6,14 +6,17 @@ Zawiera funkcje EDA oraz klasyfikację sentymentu.
 import pandas as pd
 import numpy as np
 import asyncio
-from typing import Dict, List, Tuple
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
 from collections import Counter
 
 from .preprocessing import preprocess_text
+from .llm_scheduler import PRIORITY_BACKGROUND, PRIORITY_BULK, PRIORITY_INTERACTIVE
 from .ollama_client import ollama_client
+from .search_index import InvertedIndex
 
 
-async def analyze_sentiment_async(text: str, use_cache: bool = True) -> Dict[str, float]:
+async def analyze_sentiment_async(text: str, use_cache: bool = True,
+                                  priority: str = PRIORITY_INTERACTIVE) -> Dict[str, float]:
     """
     Analizuje sentyment pojedynczego tekstu przy użyciu LLaMA przez Ollama.
     Async wersja z cache'owaniem.
@@ -21,6 +24,7 @@ async def analyze_sentiment_async(text: str, use_cache: bool = True) -> Dict[str
     Args:
         text: Tekst do analizy
         use_cache: Czy używać cache
+        priority: Klasa priorytetu wywołania LLM (domyślnie interaktywna)
     
     Returns:
         Słownik z polarity (-1 do 1), subjectivity (0 do 1) i label
@@ -28,7 +32,7 @@ async def analyze_sentiment_async(text: str, use_cache: bool = True) -> Dict[str
     if not isinstance(text, str) or len(text.strip()) == 0:
         return {"polarity": 0.0, "subjectivity": 0.0, "label": "negative"}
     
-    result = await ollama_client.analyze_sentiment(text, use_cache=use_cache)
+    result = await ollama_client.analyze_sentiment(text, use_cache=use_cache, priority=priority)
     return result
 
 
@@ -81,13 +85,17 @@ def classify_sentiment(polarity: float) -> str:
     return "positive" if polarity > 0 else "negative"
 
 
-def perform_eda(df: pd.DataFrame) -> Dict:
+def perform_eda(df: pd.DataFrame, index: Optional[InvertedIndex] = None) -> Dict:
     """
     Wykonuje eksploracyjną analizę danych (EDA) przy użyciu Pandas.
     Wykorzystuje wymagane funkcje: str.contains(), apply(), value_counts().
     
     Args:
         df: DataFrame z opiniami (musi mieć kolumnę 'review_text')
+        index: Opcjonalny indeks odwrócony; jeśli podany, liczba wzmianek słów
+            kluczowych pochodzi z posting list (skan słownika) zamiast z pełnego
+            skanu opinii - wynik jak dla str.contains: liczba opinii zawierających
+            fragment, także jako część dłuższego słowa
     
     Returns:
         Słownik ze statystykami EDA
@@ -98,9 +106,12 @@ def perform_eda(df: pd.DataFrame) -> Dict:
     # Liczba opinii
     total_reviews = len(df)
     
-    # Długość opinii przy użyciu apply()
-    df['review_length'] = df['review_text'].apply(lambda x: len(str(x)))
-    df['word_count'] = df['review_text'].apply(lambda x: len(str(x).split()))
+    # Długość opinii przy użyciu apply() - tylko gdy kolumn jeszcze nie ma
+    # (np. kolumny mapowane ze współdzielonego snapshotu nie są nadpisywane)
+    if 'review_length' not in df.columns:
+        df['review_length'] = df['review_text'].apply(lambda x: len(str(x)))
+    if 'word_count' not in df.columns:
+        df['word_count'] = df['review_text'].apply(lambda x: len(str(x).split()))
     
     # Statystyki długości
     avg_length = df['review_length'].mean()
@@ -122,14 +133,19 @@ def perform_eda(df: pd.DataFrame) -> Dict:
     positive_count = sentiment_counts.get('positive', 0)
     negative_count = sentiment_counts.get('negative', 0)
     
-    # Filtrowanie przy użyciu str.contains() - przykłady użycia
-    # Opinie zawierające słowo "excellent"
-    excellent_reviews = df[df['review_text'].str.contains('excellent', case=False, na=False)]
-    excellent_count = len(excellent_reviews)
-    
-    # Opinie zawierające słowo "terrible"
-    terrible_reviews = df[df['review_text'].str.contains('terrible', case=False, na=False)]
-    terrible_count = len(terrible_reviews)
+    if index is not None:
+        # Liczba opinii z tokenem zawierającym słowo kluczowe (jak str.contains)
+        excellent_count = index.substring_document_frequency('excellent')
+        terrible_count = index.substring_document_frequency('terrible')
+    else:
+        # Filtrowanie przy użyciu str.contains() - przykłady użycia
+        # Opinie zawierające słowo "excellent"
+        excellent_reviews = df[df['review_text'].str.contains('excellent', case=False, na=False)]
+        excellent_count = len(excellent_reviews)
+        
+        # Opinie zawierające słowo "terrible"
+        terrible_reviews = df[df['review_text'].str.contains('terrible', case=False, na=False)]
+        terrible_count = len(terrible_reviews)
     
     # Statystyki
     eda_results = {
@@ -185,7 +201,12 @@ def get_top_words(df: pd.DataFrame, limit: int = 20, remove_stopwords: bool = Tr
     return result
 
 
-async def analyze_batch_async(df: pd.DataFrame, concurrent_limit: int = 5) -> pd.DataFrame:
+async def analyze_batch_async(
+    df: pd.DataFrame,
+    concurrent_limit: int = 5,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    priority: str = PRIORITY_BACKGROUND
+) -> pd.DataFrame:
     """
     Analizuje cały batch opinii asynchronicznie przy użyciu Ollama.
     Używa asyncio.gather() dla równoległych zapytań.
@@ -193,6 +214,8 @@ async def analyze_batch_async(df: pd.DataFrame, concurrent_limit: int = 5) -> pd
     Args:
         df: DataFrame z opiniami (musi mieć kolumnę 'review_text')
         concurrent_limit: Maksymalna liczba równoległych zapytań
+        on_progress: Opcjonalna funkcja wywoływana po każdej opinii (ocenione, wszystkie)
+        priority: Klasa priorytetu wywołań LLM (domyślnie przeliczanie datasetu w tle)
     
     Returns:
         DataFrame z dodanymi kolumnami: polarity, sentiment_label, word_count
@@ -204,15 +227,21 @@ async def analyze_batch_async(df: pd.DataFrame, concurrent_limit: int = 5) -> pd
     
     # Funkcja do analizy pojedynczego tekstu
     async def analyze_single(text: str) -> float:
-        result = await ollama_client.analyze_sentiment(str(text), use_cache=True)
+        result = await ollama_client.analyze_sentiment(str(text), use_cache=True, priority=priority)
         return result.get("polarity", 0.0)
     
     # Batch processing z limitem równoległych zapytań
     semaphore = asyncio.Semaphore(concurrent_limit)
+    done = 0
     
     async def analyze_with_limit(text: str) -> float:
+        nonlocal done
         async with semaphore:
-            return await analyze_single(text)
+            polarity = await analyze_single(text)
+        done += 1
+        if on_progress is not None:
+            on_progress(done, len(texts))
+        return polarity
     
     # Wykonaj wszystkie zapytania równolegle
     tasks = [analyze_with_limit(text) for text in texts]
@@ -230,6 +259,43 @@ async def analyze_batch_async(df: pd.DataFrame, concurrent_limit: int = 5) -> pd
     return df
 
 
+async def analyze_texts_stream(
+    texts: List[str],
+    concurrent_limit: int = 5,
+    use_cache: bool = True,
+    priority: str = PRIORITY_BULK
+) -> AsyncIterator[Tuple[int, Dict]]:
+    """
+    Analizuje listę tekstów i zwraca wyniki w kolejności ich ukończenia.
+    Równoległość wywołań LLM ogranicza dodatkowo wspólny limit klienta Ollama.
+    
+    Args:
+        texts: Teksty opinii
+        concurrent_limit: Maksymalna liczba równoległych zadań tego batcha
+        use_cache: Czy używać cache (False wymusza ponowną ocenę, np. nowym modelem)
+        priority: Klasa priorytetu wywołań LLM (domyślnie bulk)
+    
+    Yields:
+        Krotki (pozycja tekstu na liście, wynik analizy)
+    """
+    semaphore = asyncio.Semaphore(concurrent_limit)
+    
+    async def analyze_with_limit(position: int, text: str) -> Tuple[int, Dict]:
+        async with semaphore:
+            result = await ollama_client.analyze_sentiment(
+                str(text), use_cache=use_cache, priority=priority)
+        return position, result
+    
+    tasks = [asyncio.ensure_future(analyze_with_limit(i, text)) for i, text in enumerate(texts)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        # Klient przerwał odbiór - nie analizuj pozostałych tekstów
+        for task in tasks:
+            task.cancel()
+
+
 def analyze_batch(df: pd.DataFrame) -> pd.DataFrame:
     """
     Analizuje cały batch opinii i dodaje kolumny z wynikami (synchroniczna wersja).
@@ -0,0 +1,177 @@
+"""
+Agregaty trendów sentymentu w przedziałach czasowych (minuta, godzina, dzień).
+Liczniki są aktualizowane przy każdym dopisaniu opinii, więc odczyt trendu
+nie wymaga skanowania wierszy.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..config import TREND_MAX_BUCKETS
+
+# Szerokość przedziału w sekundach dla każdej granulacji
+GRANULARITIES: Dict[str, int] = {
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+
+def to_utc_timestamp(value) -> Optional[pd.Timestamp]:
+    """
+    Konwertuje wartość (datetime, string ISO, Timestamp) na pd.Timestamp w UTC.
+
+    Returns:
+        Timestamp w UTC lub None dla brakującej/niepoprawnej wartości
+    """
+    timestamp = pd.to_datetime(value, utc=True, errors="coerce")
+    if timestamp is None or pd.isna(timestamp):
+        return None
+    return timestamp
+
+
+class TrendAggregator:
+    """
+    Przyrostowe agregaty sentymentu w przedziałach czasowych.
+    Dla każdego przedziału przechowuje: liczbę opinii, liczbę pozytywnych
+    i sumę polaryzacji (średnia = suma / liczba).
+    """
+
+    def __init__(self, max_buckets: int = TREND_MAX_BUCKETS):
+        """
+        Inicjalizuje puste agregaty.
+
+        Args:
+            max_buckets: Maksymalna liczba przedziałów na granulację;
+                najstarsze przedziały są usuwane po przekroczeniu limitu
+        """
+        self.max_buckets = max_buckets
+        # granulacja -> {początek przedziału (epoch s): [count, positive, polarity_sum]}
+        self.buckets: Dict[str, Dict[int, list]] = {g: {} for g in GRANULARITIES}
+        self.untimestamped = 0
+
+    def _merge_bucket(self, granularity: str, start: int, count: int,
+                      positive: int, polarity_sum: float) -> None:
+        """Dodaje wartości do przedziału (tworzy go, jeśli nie istnieje)."""
+        bucket = self.buckets[granularity].get(start)
+        if bucket is None:
+            self.buckets[granularity][start] = [count, positive, polarity_sum]
+        else:
+            bucket[0] += count
+            bucket[1] += positive
+            bucket[2] += polarity_sum
+
+    def _prune(self, granularity: str) -> None:
+        """Usuwa najstarsze przedziały po przekroczeniu limitu (z zapasem 10%)."""
+        buckets = self.buckets[granularity]
+        if len(buckets) <= self.max_buckets:
+            return
+        keep = int(self.max_buckets * 0.9)
+        for start in sorted(buckets)[: len(buckets) - keep]:
+            del buckets[start]
+
+    def add(self, timestamp, polarity: float, label: str) -> None:
+        """
+        Dodaje pojedynczą opinię do agregatów.
+
+        Args:
+            timestamp: Czas dodania opinii (datetime / Timestamp / ISO string)
+            polarity: Polaryzacja opinii
+            label: Etykieta sentymentu
+        """
+        ts = to_utc_timestamp(timestamp)
+        if ts is None:
+            self.untimestamped += 1
+            return
+        seconds = int(ts.timestamp())
+        positive = 1 if label == "positive" else 0
+        for granularity, width in GRANULARITIES.items():
+            self._merge_bucket(granularity, seconds - seconds % width, 1,
+                               positive, float(polarity))
+            self._prune(granularity)
+
+    def add_frame(self, df: pd.DataFrame) -> None:
+        """
+        Dodaje wiele opinii naraz (wektorowo, groupby po przedziałach).
+
+        Args:
+            df: DataFrame z kolumnami created_at, polarity, sentiment_label
+        """
+        if len(df) == 0:
+            return
+        if "created_at" not in df.columns:
+            self.untimestamped += len(df)
+            return
+
+        timestamps = pd.to_datetime(df["created_at"], utc=True, errors="coerce")
+        valid = timestamps.notna().to_numpy()
+        self.untimestamped += int((~valid).sum())
+        if not valid.any():
+            return
+
+        epoch = pd.Timestamp(0, tz="UTC")
+        seconds = ((timestamps[valid] - epoch) // pd.Timedelta(seconds=1)).to_numpy(dtype=np.int64)
+        frame = pd.DataFrame({
+            "positive": (df["sentiment_label"].to_numpy()[valid] == "positive").astype(np.int64),
+            "polarity": df["polarity"].to_numpy(dtype=float)[valid],
+        })
+        for granularity, width in GRANULARITIES.items():
+            grouped = frame.groupby(seconds - seconds % width).agg(
+                reviews=("polarity", "size"),
+                positive=("positive", "sum"),
+                polarity_sum=("polarity", "sum"),
+            )
+            for start, row in zip(grouped.index, grouped.itertuples(index=False)):
+                self._merge_bucket(granularity, int(start), int(row.reviews),
+                                   int(row.positive), float(row.polarity_sum))
+            self._prune(granularity)
+
+    def series(
+        self,
+        granularity: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Dict]:
+        """
+        Zwraca posortowaną chronologicznie serię przedziałów.
+
+        Args:
+            granularity: 'minute', 'hour' lub 'day'
+            start: Opcjonalny początek okna (włącznie)
+            end: Opcjonalny koniec okna (wyłącznie)
+
+        Returns:
+            Lista słowników z danymi przedziałów
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Nieznana granulacja: {granularity}")
+
+        low = high = None
+        start_ts = to_utc_timestamp(start) if start is not None else None
+        end_ts = to_utc_timestamp(end) if end is not None else None
+        if start_ts is not None:
+            # Przedział zawierający start też należy do okna
+            low = int(start_ts.timestamp())
+            low -= low % GRANULARITIES[granularity]
+        if end_ts is not None:
+            high = int(end_ts.timestamp())
+
+        result = []
+        for bucket_start in sorted(self.buckets[granularity]):
+            if low is not None and bucket_start < low:
+                continue
+            if high is not None and bucket_start >= high:
+                break
+            count, positive, polarity_sum = self.buckets[granularity][bucket_start]
+            result.append({
+                "bucket_start": datetime.fromtimestamp(bucket_start, tz=timezone.utc),
+                "count": count,
+                "positive_count": positive,
+                "negative_count": count - positive,
+                "polarity_sum": polarity_sum,
+                "average_polarity": polarity_sum / count if count else 0.0,
+            })
+        return result
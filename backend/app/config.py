@@ -17,13 +17,104 @@ USE_OLLAMA: bool = os.getenv("USE_OLLAMA", "true").lower() == "true"
 CACHE_TTL: int = int(os.getenv("CACHE_TTL", "3600"))  # 1 godzina w sekundach
 CACHE_MAX_SIZE: int = int(os.getenv("CACHE_MAX_SIZE", "10000"))  # maksymalna liczba wpisów
 
+# Wykrywanie niemal identycznych opinii (MinHash/LSH) - ponowne użycie wyniku zamiast wywołania LLM
+NEAR_DUP_ENABLED: bool = os.getenv("NEAR_DUP_ENABLED", "true").lower() == "true"
+NEAR_DUP_THRESHOLD: float = float(os.getenv("NEAR_DUP_THRESHOLD", "0.9"))  # szacowane podobieństwo Jaccarda
+NEAR_DUP_NUM_PERM: int = int(os.getenv("NEAR_DUP_NUM_PERM", "128"))  # długość sygnatury MinHash
+NEAR_DUP_BANDS: int = int(os.getenv("NEAR_DUP_BANDS", "16"))  # liczba pasm LSH
+NEAR_DUP_SHINGLE_SIZE: int = int(os.getenv("NEAR_DUP_SHINGLE_SIZE", "5"))  # długość shingla (znaki)
+
+# Cache zserializowanych odpowiedzi endpointów odczytu (liczba wpisów)
+RESPONSE_CACHE_MAX_SIZE: int = int(os.getenv("RESPONSE_CACHE_MAX_SIZE", "256"))
+
+# Zdarzenia SSE (/api/events): zaległe zdarzenia na klienta, interwał keepalive (s), długość listy TOP słów
+EVENTS_QUEUE_SIZE: int = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+EVENTS_KEEPALIVE_SECONDS: float = float(os.getenv("EVENTS_KEEPALIVE_SECONDS", "15"))
+EVENTS_TOP_WORDS: int = int(os.getenv("EVENTS_TOP_WORDS", "30"))
+
+# Snapshoty danych: maksymalna liczba zgłoszeń zapisu łączonych w jeden nowy snapshot
+SNAPSHOT_MAX_BATCH: int = int(os.getenv("SNAPSHOT_MAX_BATCH", "256"))
+
+# Tryb wielu workerów: katalog współdzielonego snapshotu mapowanego w pamięć
+# (pusty = każdy proces ma własne dane), interwał sprawdzania nowej generacji (s)
+# i interwał ponawiania próby przejęcia blokady zapisu (s)
+SHARED_SNAPSHOT_DIR: Optional[str] = os.getenv("SHARED_SNAPSHOT_DIR") or None
+SHARED_SNAPSHOT_POLL_SECONDS: float = float(os.getenv("SHARED_SNAPSHOT_POLL_SECONDS", "1.0"))
+SHARED_LOCK_RETRY_SECONDS: float = float(os.getenv("SHARED_LOCK_RETRY_SECONDS", "0.01"))
+
+# Zadania w tle w procesie (np. przeładowanie danych): liczba pamiętanych zakończonych zadań
+TASKS_HISTORY_SIZE: int = int(os.getenv("TASKS_HISTORY_SIZE", "50"))
+
 # Ustawienia batch processing
 BATCH_CONCURRENT_LIMIT: int = int(os.getenv("BATCH_CONCURRENT_LIMIT", "5"))  # równoległe zapytania
+BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "1000"))  # maks. opinii w /api/analyze/batch
+
+# Harmonogram wywołań LLM: miejsca (z BATCH_CONCURRENT_LIMIT) zarezerwowane dla analiz
+# interaktywnych i wagi klas priorytetu (interaktywne / batch i zadania / przeliczanie datasetu)
+LLM_INTERACTIVE_RESERVED: int = int(os.getenv("LLM_INTERACTIVE_RESERVED", "1"))
+LLM_WEIGHT_INTERACTIVE: float = float(os.getenv("LLM_WEIGHT_INTERACTIVE", "8"))
+LLM_WEIGHT_BULK: float = float(os.getenv("LLM_WEIGHT_BULK", "2"))
+LLM_WEIGHT_BACKGROUND: float = float(os.getenv("LLM_WEIGHT_BACKGROUND", "1"))
+
+# Micro-batching analiz: okno zbierania równoczesnych żądań (ms) i maks. liczba opinii
+# w jednym prompcie (1 = każda opinia osobnym wywołaniem LLM)
+MICRO_BATCH_WINDOW_MS: float = float(os.getenv("MICRO_BATCH_WINDOW_MS", "20"))
+MICRO_BATCH_MAX_SIZE: int = int(os.getenv("MICRO_BATCH_MAX_SIZE", "8"))
+
+# Kontrola przyjmowania /api/analyze: równoległe analizy, długość kolejki oczekujących
+# i maksymalny czas oczekiwania w kolejce (s; poniżej timeoutu klienta frontendu - 10 s)
+ADMISSION_MAX_IN_FLIGHT: int = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "10"))
+ADMISSION_QUEUE_SIZE: int = int(os.getenv("ADMISSION_QUEUE_SIZE", "50"))
+ADMISSION_QUEUE_TIMEOUT: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5.0"))
+# Limit per klient (token bucket): żądania na sekundę (0 = bez limitu) i chwilowy burst
+ADMISSION_RATE_PER_SECOND: float = float(os.getenv("ADMISSION_RATE_PER_SECOND", "5.0"))
+ADMISSION_BURST: int = int(os.getenv("ADMISSION_BURST", "10"))
+ADMISSION_MAX_CLIENTS: int = int(os.getenv("ADMISSION_MAX_CLIENTS", "10000"))  # śledzeni klienci
+# Przy przeciążeniu oceniaj lokalnie (TextBlob) zamiast odpowiadać 503
+ADMISSION_DEGRADE: bool = os.getenv("ADMISSION_DEGRADE", "false").lower() == "true"
+
+# Kolejka zadań analizy (SQLite); pusta ścieżka = backend/data/jobs.sqlite3
+JOBS_DB_PATH: Optional[str] = os.getenv("JOBS_DB_PATH") or None
+JOBS_WORKERS: int = int(os.getenv("JOBS_WORKERS", "1"))  # równolegle wykonywane zadania
+JOBS_CHUNK_SIZE: int = int(os.getenv("JOBS_CHUNK_SIZE", "50"))  # opinii między checkpointami
+JOBS_CONCURRENT_LIMIT: int = int(os.getenv("JOBS_CONCURRENT_LIMIT", "5"))  # równoległe analizy w zadaniu
 
 # Ustawienia retry dla Ollama
 OLLAMA_MAX_RETRIES: int = int(os.getenv("OLLAMA_MAX_RETRIES", "3"))
 OLLAMA_RETRY_DELAY: float = float(os.getenv("OLLAMA_RETRY_DELAY", "1.0"))  # sekundy
 
+# Agregaty trendów: maksymalna liczba przedziałów na granulację (minuta/godzina/dzień)
+TREND_MAX_BUCKETS: int = int(os.getenv("TREND_MAX_BUCKETS", "10080"))  # tydzień minut
+
+# Rozkład polaryzacji: dokładność szkicu kwantyli KLL i liczba przedziałów histogramu
+QUANTILE_SKETCH_K: int = int(os.getenv("QUANTILE_SKETCH_K", "200"))
+POLARITY_HISTOGRAM_BINS: int = int(os.getenv("POLARITY_HISTOGRAM_BINS", "20"))
+
+# Przybliżone TOP słowa: budżet pamięci szkicu Space-Saving (liczba śledzonych słów)
+WORDS_SKETCH_CAPACITY: int = int(os.getenv("WORDS_SKETCH_CAPACITY", "2000"))
+
+# Raport PDF: liczba wierszy tabeli opinii w jednym fragmencie (~jedna strona A4),
+# maksymalna liczba opinii w jednej sekcji listy (pamięć renderowania jest O(liczba wierszy))
+# i rozmiar porcji przesyłanego pliku (bajty)
+REPORT_TABLE_CHUNK_ROWS: int = int(os.getenv("REPORT_TABLE_CHUNK_ROWS", "40"))
+REPORT_MAX_ROWS: int = int(os.getenv("REPORT_MAX_ROWS", "2000"))
+REPORT_STREAM_CHUNK_SIZE: int = int(os.getenv("REPORT_STREAM_CHUNK_SIZE", "65536"))
+# Cache wyrenderowanych raportów PDF na dysku; pusta ścieżka = backend/data/reports
+REPORT_CACHE_DIR: Optional[str] = os.getenv("REPORT_CACHE_DIR") or None
+REPORT_CACHE_MAX_FILES: int = int(os.getenv("REPORT_CACHE_MAX_FILES", "10"))
+# Renderowanie raportu w tle po zmianie danych: opóźnienie od ostatniej zmiany (s, 0 = wyłączone)
+# i okno (s), w którym wariant raportu musiał być pobrany, aby był renderowany w tle
+REPORT_PRERENDER_DEBOUNCE_SECONDS: float = float(os.getenv("REPORT_PRERENDER_DEBOUNCE_SECONDS", "5.0"))
+REPORT_PRERENDER_WINDOW_SECONDS: float = float(os.getenv("REPORT_PRERENDER_WINDOW_SECONDS", "3600"))
+
+# Eksport opinii (/api/export): liczba wierszy serializowanych w jednej porcji
+EXPORT_CHUNK_ROWS: int = int(os.getenv("EXPORT_CHUNK_ROWS", "10000"))
+
+# Wgrywanie opinii z pliku CSV (/api/upload): maks. rozmiar pliku (bajty, 0 = bez limitu)
+# i liczba wierszy parsowanych, ocenianych i dołączanych do danych w jednej porcji
+UPLOAD_MAX_BYTES: int = int(os.getenv("UPLOAD_MAX_BYTES", str(100 * 1024 * 1024)))
+UPLOAD_CHUNK_ROWS: int = int(os.getenv("UPLOAD_CHUNK_ROWS", "1000"))
+
 # Logging
 LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
 
@@ -0,0 +1,160 @@
+"""
+Strumieniowy eksport opinii z analizą (CSV, NDJSON, Parquet).
+Wiersze są serializowane porcjami prosto z kolumn snapshotu - bez obiektów
+per wiersz - więc pamięć zależy od rozmiaru porcji, a nie od liczby opinii.
+Parquet wymaga opcjonalnego pakietu pyarrow.
+"""
+
+from typing import Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from ..config import EXPORT_CHUNK_ROWS
+
+# Format eksportu -> (typ MIME, rozszerzenie pliku)
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def parquet_available() -> bool:
+    """Sprawdza, czy zainstalowany jest pyarrow (wymagany dla formatu parquet)."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _column_positions(df: pd.DataFrame, columns: List[str]) -> List[int]:
+    """
+    Zwraca pozycje eksportowanych kolumn - każda nazwa raz, z pierwszego wystąpienia
+    (DataFrame po wgraniu pliku z powtórzonymi nagłówkami może mieć zduplikowane
+    nazwy, a Parquet i JSON wymagają nazw unikalnych).
+    """
+    names = list(df.columns)
+    return [names.index(column) for column in dict.fromkeys(columns)]
+
+
+def _chunks(df: pd.DataFrame, positions: np.ndarray, columns: List[str],
+            chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Zwraca kolejne porcje wierszy (kopie tylko wybranych pozycji i kolumn)."""
+    column_positions = _column_positions(df, columns)
+    for start in range(0, len(positions), chunk_rows):
+        yield df.iloc[positions[start:start + chunk_rows], column_positions]
+
+
+def iter_csv(df: pd.DataFrame, positions: np.ndarray, columns: List[str],
+             chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Serializuje wiersze do CSV porcjami (nagłówek w pierwszej porcji).
+
+    Args:
+        df: DataFrame snapshotu
+        positions: Pozycje eksportowanych wierszy
+        columns: Eksportowane kolumny
+        chunk_rows: Liczba wierszy w porcji
+
+    Returns:
+        Iterator porcji CSV (UTF-8)
+    """
+    yield (",".join(dict.fromkeys(columns)) + "\n").encode("utf-8")
+    for chunk in _chunks(df, positions, columns, chunk_rows):
+        yield chunk.to_csv(index=False, header=False, date_format="%Y-%m-%dT%H:%M:%S%z").encode("utf-8")
+
+
+def iter_ndjson(df: pd.DataFrame, positions: np.ndarray, columns: List[str],
+                chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Serializuje wiersze do NDJSON porcjami (jeden obiekt JSON na linię, daty ISO 8601).
+
+    Args:
+        df: DataFrame snapshotu
+        positions: Pozycje eksportowanych wierszy
+        columns: Eksportowane kolumny
+        chunk_rows: Liczba wierszy w porcji
+
+    Returns:
+        Iterator porcji NDJSON (UTF-8)
+    """
+    for chunk in _chunks(df, positions, columns, chunk_rows):
+        body = chunk.to_json(orient="records", lines=True, date_format="iso", force_ascii=False)
+        yield (body if body.endswith("\n") else body + "\n").encode("utf-8")
+
+
+class _ChunkSink:
+    """Plik tylko do zapisu, z którego zapisane bajty są odbierane po każdej porcji."""
+
+    def __init__(self):
+        self.parts: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def iter_parquet(df: pd.DataFrame, positions: np.ndarray, columns: List[str],
+                 chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Serializuje wiersze do Parquet - każda porcja to osobna grupa wierszy
+    (row group) wysyłana zaraz po zapisaniu.
+
+    Args:
+        df: DataFrame snapshotu
+        positions: Pozycje eksportowanych wierszy
+        columns: Eksportowane kolumny
+        chunk_rows: Liczba wierszy w porcji
+
+    Returns:
+        Iterator porcji pliku Parquet
+
+    Raises:
+        ImportError: Brak pakietu pyarrow
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Schemat z typów kolumn całego DataFrame - taki sam dla wszystkich porcji
+    schema = pa.Schema.from_pandas(df.iloc[:0, _column_positions(df, columns)], preserve_index=False)
+    schema = pa.schema([
+        field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+        for field in schema
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for chunk in _chunks(df, positions, columns, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+# Format eksportu -> funkcja serializująca
+EXPORT_WRITERS = {
+    "csv": iter_csv,
+    "ndjson": iter_ndjson,
+    "parquet": iter_parquet,
+}
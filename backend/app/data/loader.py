@@ -3,12 +3,17 @@ Moduł do wczytywania i czyszczenia danych przy użyciu Pandas.
 """
 
 import csv
+import os
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, Union
+from typing import List, Optional, Union
 
 import numpy as np
 import pandas as pd
 
+# Kolumny pliku dataset.csv (created_at - czas dodania opinii, UTC, ISO 8601)
+DATASET_COLUMNS = ["review_id", "review_text", "rating", "sentiment", "created_at"]
+
 
 def get_dataset_path(file_path: Optional[Union[str, Path]] = None) -> Path:
     """Zwraca ścieżkę do pliku dataset.csv."""
@@ -31,6 +36,11 @@ def load_data(file_path: Optional[str] = None) -> pd.DataFrame:
     path = get_dataset_path(file_path)
     try:
         df = pd.read_csv(path, encoding='utf-8')
+        # Starsze pliki nie mają kolumny created_at - brak znacznika czasu (NaT)
+        if 'created_at' in df.columns:
+            df['created_at'] = pd.to_datetime(df['created_at'], utc=True, errors='coerce')
+        else:
+            df['created_at'] = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns, UTC]')
         print(f"Wczytano {len(df)} opinii z pliku: {path}")
         return df
     except FileNotFoundError:
@@ -95,13 +105,52 @@ def preprocess_text_basic(text: str) -> str:
     return text
 
 
+def _write_dataset_atomic(path: Path, header: List[str], rows: List[List[str]]) -> None:
+    """Zapisuje plik CSV do pliku tymczasowego obok i atomowo podmienia docelowy."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _ensure_dataset_columns(path: Path) -> List[str]:
+    """
+    Zapewnia, że plik CSV ma nagłówek z kolumnami DATASET_COLUMNS.
+    Tworzy plik z nagłówkiem, jeśli nie istnieje; starsze pliki bez kolumny
+    created_at są jednorazowo przepisywane (atomowo) z pustą wartością tej kolumny.
+
+    Returns:
+        Nagłówek pliku (kolejność kolumn, w jakiej należy dopisywać wiersze)
+    """
+    if not path.exists():
+        _write_dataset_atomic(path, DATASET_COLUMNS, [])
+        return list(DATASET_COLUMNS)
+
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        if "created_at" in header:
+            return header
+        rows = [row + [""] for row in reader if row]
+
+    header = header + ["created_at"]
+    _write_dataset_atomic(path, header, rows)
+    return header
+
+
 def append_review(
     review_id: int,
     review_text: str,
     sentiment: str,
     rating: int = 0,
     file_path: Optional[Union[str, Path]] = None,
-) -> None:
+    created_at: Optional[datetime] = None,
+) -> datetime:
     """
     Dopisuje jedną opinię do pliku dataset.csv.
     Używa modułu csv do poprawnego escapowania pól (przecinki, cudzysłowy).
@@ -112,11 +161,54 @@ def append_review(
         sentiment: Etykieta sentymentu (positive/negative)
         rating: Ocena (domyślnie 0)
         file_path: Ścieżka do pliku CSV; jeśli None, używa domyślnej
+        created_at: Czas dodania opinii; jeśli None, bieżący czas UTC
+
+    Returns:
+        Zapisany znacznik czasu dodania opinii
+    """
+    return append_reviews(
+        [{"review_id": review_id, "review_text": review_text,
+          "sentiment": sentiment, "rating": rating}],
+        file_path=file_path,
+        created_at=created_at,
+    )
+
+
+def append_reviews(
+    reviews: List[dict],
+    file_path: Optional[Union[str, Path]] = None,
+    created_at: Optional[datetime] = None,
+) -> datetime:
+    """
+    Dopisuje wiele opinii do pliku dataset.csv jednym otwarciem pliku.
+
+    Args:
+        reviews: Lista słowników z kluczami review_id, review_text i opcjonalnie
+            rating oraz sentiment (etykieta referencyjna; brak = puste pole)
+        file_path: Ścieżka do pliku CSV; jeśli None, używa domyślnej
+        created_at: Czas dodania opinii; jeśli None, bieżący czas UTC
+
+    Returns:
+        Zapisany znacznik czasu dodania opinii (wspólny dla całej partii)
     """
+    if created_at is None:
+        created_at = datetime.now(timezone.utc)
     path = get_dataset_path(file_path)
+    # Wiersze w kolejności kolumn z nagłówka pliku (kolumny nieznane - puste)
+    header = _ensure_dataset_columns(path)
+    timestamp = created_at.isoformat()
     with open(path, "a", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
-        writer.writerow([review_id, review_text, rating, sentiment])
+        for review in reviews:
+            values = {
+                "review_id": review["review_id"],
+                "review_text": review["review_text"],
+                "rating": review.get("rating", 0),
+                "sentiment": review.get("sentiment"),
+                "created_at": timestamp,
+            }
+            writer.writerow([values.get(column) for column in header])
+    return created_at
 
 
 def get_dataframe_info(df: pd.DataFrame) -> dict:
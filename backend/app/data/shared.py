@@ -0,0 +1,349 @@
+"""
+Snapshot danych współdzielony między procesami (uruchomienie z wieloma workerami uvicorn).
+Kolumny przeanalizowanego datasetu są zapisywane w plikach kolumnowych, które
+procesy mapują w pamięć tylko do odczytu (np.memmap); nowe wersje są wykrywane
+po liczniku generacji w pliku CURRENT.
+
+Układ katalogu SHARED_SNAPSHOT_DIR:
+    leader.lock  - blokada lidera, który buduje (ocenia) pełny snapshot przy starcie
+    write.lock   - blokada zapisu: dopisywanie opinii i publikacja nowej bazy
+    ID           - identyfikator katalogu (wspólny dla procesów, np. w ETag)
+    CURRENT      - JSON: generacja, katalog bazy i liczba wierszy
+    base-NNNNNN/ - kolumny jednej bazy (schema.json + pliki tylko dopisywane)
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import time
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from ..config import SHARED_LOCK_RETRY_SECONDS, SHARED_SNAPSHOT_DIR
+
+
+class SharedDataset:
+    """
+    Katalog współdzielonego snapshotu: publikacja bazy i dopisywanie wierszy
+    (pod blokadą zapisu) oraz mapowanie wierszy opublikowanej generacji.
+    Pliki kolumn są tylko dopisywane, a czytelnik mapuje wyłącznie wiersze
+    z CURRENT, więc widzi spójny stan także podczas dopisywania przez inny proces.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Inicjalizuje katalog (tworzy go, jeśli nie istnieje).
+
+        Args:
+            path: Ścieżka katalogu współdzielonego przez workery
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        # Identyfikator katalogu, wspólny dla wszystkich procesów (np. w ETag)
+        self.instance_id = self._read_instance_id()
+        # Metadane generacji, z którą zsynchronizowany jest snapshot tego procesu
+        self.synced: Optional[Dict] = None
+        self._leader_file = None
+
+    def _read_instance_id(self) -> str:
+        """Zwraca identyfikator katalogu, tworząc go atomowo przy pierwszym użyciu."""
+        id_path = self.path / "ID"
+        try:
+            fd = os.open(id_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+        except FileExistsError:
+            # Plik mógł zostać utworzony przed zapisem treści przez inny proces
+            while True:
+                instance_id = id_path.read_text(encoding="utf-8").strip()
+                if instance_id:
+                    return instance_id
+                time.sleep(0.01)
+        instance_id = uuid.uuid4().hex[:8]
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(instance_id)
+        return instance_id
+
+    @property
+    def is_leader(self) -> bool:
+        """Czy ten proces jest liderem."""
+        return self._leader_file is not None
+
+    def try_become_leader(self) -> bool:
+        """
+        Próbuje przejąć blokadę lidera (trzymaną do końca procesu).
+
+        Returns:
+            True, jeśli ten proces jest liderem
+        """
+        import fcntl
+
+        if self._leader_file is not None:
+            return True
+        leader_file = open(self.path / "leader.lock", "a+")
+        try:
+            fcntl.flock(leader_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            leader_file.close()
+            return False
+        self._leader_file = leader_file
+        return True
+
+    @asynccontextmanager
+    async def write_lock(self) -> AsyncIterator[None]:
+        """
+        Blokada zapisu współdzielona przez procesy (flock). Próby przejęcia są
+        nieblokujące i ponawiane co SHARED_LOCK_RETRY_SECONDS, więc oczekiwanie
+        na inny proces nie wstrzymuje pętli zdarzeń.
+        """
+        import fcntl
+
+        with open(self.path / "write.lock", "a+") as lock_file:
+            while True:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    await asyncio.sleep(SHARED_LOCK_RETRY_SECONDS)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def read_current(self) -> Optional[Dict]:
+        """Zwraca metadane opublikowanej generacji (None, jeśli brak)."""
+        try:
+            return json.loads((self.path / "CURRENT").read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    def _write_current(self, meta: Dict) -> None:
+        """Atomowo podmienia plik CURRENT."""
+        tmp_path = self.path / f"CURRENT.{os.getpid()}.tmp"
+        tmp_path.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp_path, self.path / "CURRENT")
+
+    def publish_base(self, df: pd.DataFrame) -> Dict:
+        """
+        Zapisuje cały DataFrame jako nową bazę i publikuje ją
+        (wywołujący trzyma write_lock).
+
+        Args:
+            df: Przeanalizowany DataFrame
+
+        Returns:
+            Metadane nowej generacji
+        """
+        current = self.read_current()
+        generation = (current["generation"] if current else 0) + 1
+        base = f"base-{generation:06d}"
+        base_dir = self.path / base
+        shutil.rmtree(base_dir, ignore_errors=True)
+        base_dir.mkdir()
+
+        schema = [_column_schema(name, df[name]) for name in df.columns]
+        (base_dir / "schema.json").write_text(json.dumps(schema), encoding="utf-8")
+        _append_columns(base_dir, schema, df, 0)
+
+        meta = {"generation": generation, "base": base, "rows": len(df)}
+        self._write_current(meta)
+        self._prune(keep={base, current["base"] if current else base})
+        return meta
+
+    def publish_rows(self, df: pd.DataFrame, start: int) -> Dict:
+        """
+        Dopisuje wiersze df od pozycji start do bieżącej bazy i publikuje
+        nową generację (wywołujący trzyma write_lock i jest zsynchronizowany).
+
+        Args:
+            df: DataFrame zawierający opublikowane wiersze i nowe wiersze
+            start: Pozycja pierwszego nowego wiersza (= liczba wierszy generacji)
+
+        Returns:
+            Metadane nowej generacji
+
+        Raises:
+            RuntimeError: Baza zmieniła się od ostatniej synchronizacji
+        """
+        current = self.read_current()
+        if current is None or current["rows"] != start:
+            raise RuntimeError("Współdzielony snapshot zmienił się - wymagana synchronizacja")
+        base_dir = self.path / current["base"]
+        schema = json.loads((base_dir / "schema.json").read_text(encoding="utf-8"))
+        _append_columns(base_dir, schema, df.iloc[start:], start)
+
+        meta = {**current, "generation": current["generation"] + 1, "rows": len(df)}
+        self._write_current(meta)
+        return meta
+
+    def read_rows(self, meta: Dict, start: int = 0) -> pd.DataFrame:
+        """
+        Mapuje wiersze generacji od pozycji start (kolumny liczbowe bez
+        kopiowania - tylko do odczytu; teksty są dekodowane do pamięci procesu).
+
+        Args:
+            meta: Metadane generacji (z read_current)
+            start: Pozycja pierwszego wiersza
+
+        Returns:
+            DataFrame z wierszami [start, meta["rows"])
+        """
+        base_dir = self.path / meta["base"]
+        schema = json.loads((base_dir / "schema.json").read_text(encoding="utf-8"))
+        end = meta["rows"]
+        columns = {
+            column["name"]: _read_column(base_dir, column, start, end)
+            for column in schema
+        }
+        return _frame_from_columns(columns)
+
+    def map_frame(self, meta: Dict, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Zwraca DataFrame z wierszami generacji, w którym kolumny liczbowe są
+        mapowane z plików (strony współdzielone przez procesy), a kolumny
+        tekstowe pochodzą z df - prywatna kopia kolumn liczbowych z pd.concat
+        po dopisaniu wierszy zostaje zwolniona.
+
+        Args:
+            meta: Metadane generacji (z read_current)
+            df: DataFrame z tymi samymi wierszami co generacja
+
+        Returns:
+            DataFrame z kolumnami schematu bazy
+        """
+        base_dir = self.path / meta["base"]
+        schema = json.loads((base_dir / "schema.json").read_text(encoding="utf-8"))
+        end = meta["rows"]
+        columns = {
+            column["name"]: (
+                df[column["name"]].reset_index(drop=True)
+                if column["kind"] == "text" and column["name"] in df.columns
+                else _read_column(base_dir, column, 0, end)
+            )
+            for column in schema
+        }
+        return _frame_from_columns(columns)
+
+    def _prune(self, keep: set) -> None:
+        """Usuwa bazy inne niż bieżąca i poprzednia (poprzednią może jeszcze czytać inny proces)."""
+        for base_dir in self.path.glob("base-*"):
+            if base_dir.name not in keep:
+                shutil.rmtree(base_dir, ignore_errors=True)
+
+
+def _frame_from_columns(columns: Dict[str, Union[np.ndarray, pd.Series]]) -> pd.DataFrame:
+    """
+    Składa DataFrame z kolumn bez kopiowania: każda kolumna pozostaje osobnym
+    blokiem, więc tablice np.memmap nie są konsolidowane we wspólną (prywatną) tablicę.
+    """
+    return pd.DataFrame(columns, copy=False)
+
+
+def _column_schema(name: str, series: pd.Series) -> Dict:
+    """Opisuje sposób zapisu kolumny: liczbowa, data (UTC) lub tekstowa."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return {"name": name, "kind": "datetime"}
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        if not series.hasnans:
+            return {"name": name, "kind": "number", "dtype": "<i8"}
+    if pd.api.types.is_numeric_dtype(series):
+        return {"name": name, "kind": "number", "dtype": "<f8"}
+    return {"name": name, "kind": "text", "dtype": str(series.dtype)}
+
+
+def _append_columns(base_dir: Path, schema: List[Dict], df: pd.DataFrame, start: int) -> None:
+    """
+    Dopisuje wiersze do plików kolumn. Pliki są najpierw przycinane do
+    start wierszy - usuwa to resztki zapisu przerwanego przed publikacją.
+    """
+    for column in schema:
+        name, kind = column["name"], column["kind"]
+        series = df[name] if name in df.columns else pd.Series([None] * len(df))
+        if kind == "text":
+            offsets_path = base_dir / f"{name}.off"
+            _truncate(offsets_path, start * 8)
+            _truncate(base_dir / f"{name}.nul", start)
+            data_end = _text_end(offsets_path, start)
+            _truncate(base_dir / f"{name}.bin", data_end)
+
+            nulls = series.isna().to_numpy()
+            encoded = [
+                b"" if is_null else str(value).encode("utf-8")
+                for value, is_null in zip(series.tolist(), nulls)
+            ]
+            lengths = np.fromiter((len(item) for item in encoded), dtype="<i8", count=len(encoded))
+            offsets = data_end + np.cumsum(lengths, dtype="<i8")
+            _append_bytes(base_dir / f"{name}.bin", b"".join(encoded))
+            _append_bytes(offsets_path, offsets.tobytes())
+            _append_bytes(base_dir / f"{name}.nul", nulls.astype("u1").tobytes())
+        else:
+            path = base_dir / f"{name}.col"
+            _truncate(path, start * 8)
+            if kind == "datetime":
+                values = pd.to_datetime(series, utc=True).to_numpy(dtype="datetime64[ns]").view("<i8")
+            elif column["dtype"] == "<i8":
+                # Kolumna całkowita bazy - brakujące wartości w dopisywanych wierszach jako 0
+                values = series.fillna(0).to_numpy(dtype="<i8")
+            else:
+                values = series.to_numpy(dtype="<f8", na_value=np.nan)
+            _append_bytes(path, np.ascontiguousarray(values).tobytes())
+
+
+def _read_column(base_dir: Path, column: Dict, start: int, end: int) -> Union[np.ndarray, pd.Series]:
+    """Odczytuje wiersze [start, end) kolumny (liczby przez mapowanie pliku)."""
+    name, kind = column["name"], column["kind"]
+    count = end - start
+    if kind == "text":
+        if count == 0:
+            return pd.Series([], dtype=column["dtype"])
+        offsets = np.memmap(base_dir / f"{name}.off", dtype="<i8", mode="r", shape=(end,))
+        nulls = np.memmap(base_dir / f"{name}.nul", dtype="u1", mode="r", shape=(end,))
+        data_start = int(offsets[start - 1]) if start > 0 else 0
+        with open(base_dir / f"{name}.bin", "rb") as f:
+            f.seek(data_start)
+            data = f.read(int(offsets[end - 1]) - data_start)
+        bounds = np.concatenate(([0], offsets[start:end] - data_start))
+        values = [
+            None if nulls[start + i] else data[bounds[i]:bounds[i + 1]].decode("utf-8")
+            for i in range(count)
+        ]
+        return pd.Series(values, dtype=column["dtype"])
+
+    dtype = "<i8" if kind == "datetime" else column["dtype"]
+    if count == 0:
+        values = np.empty(0, dtype=dtype)
+    else:
+        values = np.memmap(base_dir / f"{name}.col", dtype=dtype, mode="r",
+                           offset=start * 8, shape=(count,))
+    if kind == "datetime":
+        return pd.Series(pd.DatetimeIndex(values.view("datetime64[ns]")).tz_localize("UTC"))
+    return values
+
+
+def _text_end(offsets_path: Path, rows: int) -> int:
+    """Zwraca długość danych kolumny tekstowej dla pierwszych rows wierszy."""
+    if rows == 0:
+        return 0
+    with open(offsets_path, "rb") as f:
+        f.seek((rows - 1) * 8)
+        return int(np.frombuffer(f.read(8), dtype="<i8")[0])
+
+
+def _truncate(path: Path, size: int) -> None:
+    """Przycina (lub tworzy) plik do podanego rozmiaru."""
+    with open(path, "ab") as f:
+        f.truncate(size)
+
+
+def _append_bytes(path: Path, data: bytes) -> None:
+    """Dopisuje dane na końcu pliku."""
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+# Globalna instancja współdzielonego snapshotu (None = pojedynczy proces)
+shared_dataset = SharedDataset(SHARED_SNAPSHOT_DIR) if SHARED_SNAPSHOT_DIR else None
@@ -0,0 +1,200 @@
+"""
+Niezmienne, wersjonowane snapshoty zbioru opinii (copy-on-write).
+Czytelnicy pobierają bieżący snapshot jednym odczytem referencji i pracują
+na nim do końca żądania; wszystkie zmiany przechodzą przez jednego writera,
+który buduje nowy snapshot i podmienia referencję atomowo.
+"""
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from ..analysis.indexes import DatasetIndexes
+from ..config import SNAPSHOT_MAX_BATCH
+
+# Korutyna nakładająca partię zmian na snapshot: (bieżący snapshot, elementy) -> nowy snapshot
+ApplyBatch = Callable[["DatasetSnapshot", List[Any]], Awaitable["DatasetSnapshot"]]
+
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    """
+    Stan danych w jednej wersji: opinie, wyniki EDA i struktury pochodne.
+    DataFrame, eda_stats i struktury pochodne nie mogą być modyfikowane po
+    opublikowaniu snapshotu (nowa wersja dostaje własną kopię, zob. DatasetIndexes.extended).
+    """
+    version: int
+    df: pd.DataFrame
+    eda_stats: Dict
+    indexes: DatasetIndexes
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @property
+    def row_count(self) -> int:
+        """Liczba opinii w snapshocie."""
+        return len(self.df)
+
+    def successor(self, df: pd.DataFrame, eda_stats: Dict,
+                  indexes: Optional[DatasetIndexes] = None) -> "DatasetSnapshot":
+        """
+        Tworzy kolejną wersję snapshotu.
+
+        Args:
+            df: Nowy DataFrame (nowy obiekt, nie modyfikowany poprzedni)
+            eda_stats: Wyniki EDA dla nowego DataFrame
+            indexes: Struktury pochodne nowej wersji; None = te same (tylko gdy
+                wiersze się nie zmieniły)
+
+        Returns:
+            Snapshot o wersji o jeden większej
+        """
+        return DatasetSnapshot(
+            version=self.version + 1,
+            df=df,
+            eda_stats=eda_stats,
+            indexes=indexes if indexes is not None else self.indexes,
+        )
+
+
+class SnapshotStore:
+    """
+    Bieżący snapshot danych i kolejka zmian obsługiwana przez jednego writera.
+    Zmiany zgłoszone jednocześnie (np. kilka równoległych /api/analyze) są
+    łączone w jedną partię i dają jeden nowy snapshot.
+    """
+
+    def __init__(self, max_batch: int = SNAPSHOT_MAX_BATCH):
+        """
+        Inicjalizuje pusty magazyn (bez danych).
+
+        Args:
+            max_batch: Maksymalna liczba zgłoszeń łączonych w jedną partię
+        """
+        self.max_batch = max_batch
+        self.current: Optional[DatasetSnapshot] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self.stats = {"snapshots": 0, "writes": 0, "batches": 0}
+        # Funkcje wywoływane po publikacji snapshotu (np. renderowanie raportu w tle)
+        self._listeners: List[Callable[[DatasetSnapshot], None]] = []
+
+    def add_listener(self, listener: Callable[[DatasetSnapshot], None]) -> None:
+        """
+        Rejestruje funkcję wywoływaną (w pętli zdarzeń) po każdej publikacji snapshotu.
+
+        Args:
+            listener: Funkcja przyjmująca nowy snapshot; nie powinna blokować
+        """
+        self._listeners.append(listener)
+
+    def _publish(self, snapshot: Optional[DatasetSnapshot]) -> None:
+        """Podmienia bieżący snapshot (wywoływane wyłącznie przez writera)."""
+        self.current = snapshot
+        self.stats["snapshots"] += 1
+        if snapshot is None:
+            return
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print(f"Błąd obserwatora snapshotu: {e}")
+
+    def _ensure_writer(self) -> asyncio.Queue:
+        """Uruchamia zadanie writera przy pierwszym zgłoszeniu zmiany."""
+        if self._writer is None or self._writer.done():
+            self._queue = asyncio.Queue()
+            self._writer = asyncio.create_task(self._run_writer())
+        return self._queue
+
+    async def apply(self, items: List[Any], apply_batch: ApplyBatch) -> DatasetSnapshot:
+        """
+        Zgłasza zmianę danych i czeka na snapshot, który ją zawiera.
+
+        Args:
+            items: Elementy zmiany (np. nowe opinie)
+            apply_batch: Korutyna budująca nowy snapshot z bieżącego i połączonych
+                elementów; zgłoszenia z tą samą funkcją są łączone w partie
+
+        Returns:
+            Opublikowany snapshot zawierający zmianę
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._ensure_writer().put_nowait((apply_batch, items, future))
+        return await future
+
+    async def replace(
+        self,
+        build: Callable[[Optional[DatasetSnapshot]], Awaitable[DatasetSnapshot]],
+    ) -> DatasetSnapshot:
+        """
+        Zastępuje cały stan danych (np. ponowne wczytanie datasetu).
+        Budowa jest wykonywana przez writera, więc nie przeplata się z dopisywaniem.
+
+        Args:
+            build: Korutyna budująca nowy snapshot na podstawie bieżącego (może być None)
+
+        Returns:
+            Opublikowany snapshot
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._ensure_writer().put_nowait((None, build, future))
+        return await future
+
+    async def _run_writer(self) -> None:
+        """Pętla writera: pobiera zgłoszenia, łączy je w partie i publikuje snapshoty."""
+        queue = self._queue
+        pending: deque = deque()
+        while True:
+            if not pending:
+                pending.append(await queue.get())
+            while not queue.empty():
+                pending.append(queue.get_nowait())
+
+            apply_batch, payload, future = pending.popleft()
+            if apply_batch is None:
+                # Zastąpienie całego stanu
+                try:
+                    self._publish(await payload(self.current))
+                    if not future.done():
+                        future.set_result(self.current)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            # Dołącz kolejne oczekujące zgłoszenia z tą samą funkcją
+            batch = [(payload, future)]
+            while pending and len(batch) < self.max_batch and pending[0][0] is apply_batch:
+                _, next_payload, next_future = pending.popleft()
+                batch.append((next_payload, next_future))
+
+            items = [item for batch_items, _ in batch for item in batch_items]
+            try:
+                if self.current is None:
+                    raise RuntimeError("Brak załadowanych danych")
+                self._publish(await apply_batch(self.current, items))
+                self.stats["writes"] += len(batch)
+                self.stats["batches"] += 1
+                for _, batch_future in batch:
+                    if not batch_future.done():
+                        batch_future.set_result(self.current)
+            except Exception as e:
+                for _, batch_future in batch:
+                    if not batch_future.done():
+                        batch_future.set_exception(e)
+
+    def get_stats(self) -> Dict:
+        """Zwraca statystyki magazynu snapshotów."""
+        return {
+            **self.stats,
+            "version": self.current.version if self.current is not None else 0,
+            "rows": self.current.row_count if self.current is not None else 0,
+        }
+
+
+# Globalna instancja magazynu snapshotów
+dataset_store = SnapshotStore()
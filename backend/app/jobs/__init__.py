@@ -0,0 +1,6 @@
+"""Trwała kolejka zadań analizy sentymentu (SQLite + workery asyncio)."""
+
+from .manager import JobManager, job_manager
+from .store import JobStore
+
+__all__ = ["JobManager", "JobStore", "job_manager"]
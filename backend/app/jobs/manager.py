@@ -0,0 +1,149 @@
+"""
+Wykonywanie zadań analizy w tle.
+Pula workerów pobiera zadania z kolejki i ocenia opinie partiami
+(z ograniczoną równoległością); po każdej partii wyniki są zapisywane
+w bazie, więc po awarii zadanie jest wznawiane od ostatniego checkpointu.
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from ..analysis.sentiment import analyze_texts_stream, classify_sentiment
+from ..config import JOBS_CHUNK_SIZE, JOBS_CONCURRENT_LIMIT, JOBS_WORKERS
+from .store import STATUS_COMPLETED, STATUS_FAILED, JobStore
+
+
+class JobManager:
+    """
+    Kolejka zadań analizy z pulą workerów asyncio.
+    Przy starcie kolejkowane są ponownie wszystkie niezakończone zadania
+    (również te przerwane w trakcie wykonywania).
+    """
+
+    def __init__(
+        self,
+        store: Optional[JobStore] = None,
+        workers: int = JOBS_WORKERS,
+        chunk_size: int = JOBS_CHUNK_SIZE,
+        concurrent_limit: int = JOBS_CONCURRENT_LIMIT,
+    ):
+        """
+        Inicjalizuje menedżera (baza jest otwierana przy pierwszym użyciu).
+
+        Args:
+            store: Magazyn zadań; jeśli None, używa domyślnej bazy SQLite
+            workers: Liczba równolegle wykonywanych zadań
+            chunk_size: Liczba opinii między kolejnymi checkpointami
+            concurrent_limit: Maksymalna liczba równoległych analiz w jednym zadaniu
+        """
+        self._store = store
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.concurrent_limit = concurrent_limit
+        self.queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def store(self) -> JobStore:
+        """Magazyn zadań (tworzony leniwie)."""
+        if self._store is None:
+            self._store = JobStore()
+        return self._store
+
+    async def start(self, resume: bool = True) -> None:
+        """
+        Uruchamia workery i kolejkuje niezakończone zadania z bazy.
+
+        Args:
+            resume: Czy wznowić niezakończone zadania z poprzedniego uruchomienia
+        """
+        if self._tasks:
+            return
+        self.queue = asyncio.Queue()
+        if resume:
+            for job_id in await asyncio.to_thread(self.store.unfinished_jobs):
+                self.queue.put_nowait(job_id)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Zatrzymuje workery (przerwana partia zostanie oceniona po wznowieniu)."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, texts: List[str], source: str, use_cache: bool = True) -> Dict:
+        """
+        Zapisuje nowe zadanie i dodaje je do kolejki.
+
+        Args:
+            texts: Teksty opinii do oceny
+            source: Źródło tekstów ('texts' lub 'dataset')
+            use_cache: Czy analiza może korzystać z cache wyników
+
+        Returns:
+            Słownik z polami zadania
+        """
+        if not self._tasks:
+            await self.start()
+        job_id = await asyncio.to_thread(self.store.create_job, texts, source, use_cache)
+        self.queue.put_nowait(job_id)
+        return await asyncio.to_thread(self.store.get_job, job_id)
+
+    async def _worker(self) -> None:
+        """Pętla workera: wykonuje kolejne zadania z kolejki."""
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self._run_job(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Błąd zadania analizy {job_id}: {e}")
+                await asyncio.to_thread(self.store.mark_finished, job_id, STATUS_FAILED, str(e))
+            finally:
+                self.queue.task_done()
+
+    async def _run_job(self, job_id: str) -> None:
+        """
+        Ocenia pozostałe opinie zadania partiami, zapisując checkpoint po każdej.
+
+        Args:
+            job_id: Identyfikator zadania
+        """
+        job = await asyncio.to_thread(self.store.get_job, job_id)
+        if job is None:
+            return
+        await asyncio.to_thread(self.store.mark_running, job_id)
+        use_cache = bool(job["use_cache"])
+        run_started = time.monotonic()
+        run_processed = 0
+
+        while True:
+            items = await asyncio.to_thread(self.store.pending_items, job_id, self.chunk_size)
+            if not items:
+                break
+
+            results = []
+            texts = [text for _, text in items]
+            async for index, result in analyze_texts_stream(
+                    texts, self.concurrent_limit, use_cache=use_cache):
+                position = items[index][0]
+                if not texts[index].strip():
+                    results.append((position, None, None, "Tekst opinii nie może być pusty"))
+                    continue
+                polarity = result.get("polarity", 0.0)
+                label = result.get("label", classify_sentiment(polarity))
+                results.append((position, polarity, label, None))
+
+            run_processed += len(results)
+            elapsed = time.monotonic() - run_started
+            throughput = run_processed / elapsed if elapsed > 0 else None
+            await asyncio.to_thread(self.store.save_results, job_id, results, throughput)
+
+        await asyncio.to_thread(self.store.mark_finished, job_id, STATUS_COMPLETED)
+
+
+# Globalna instancja menedżera zadań
+job_manager = JobManager()
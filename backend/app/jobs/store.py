@@ -0,0 +1,251 @@
+"""
+Trwały magazyn zadań analizy w lokalnej bazie SQLite.
+Każda opinia zadania jest osobnym wierszem job_items, więc postęp
+(checkpoint) przetrwa restart procesu, a wznowione zadanie ocenia
+tylko opinie, które nie mają jeszcze zapisanego wyniku.
+"""
+
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from ..config import JOBS_DB_PATH
+
+# Statusy zadania
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+# Statusy pojedynczej opinii w zadaniu
+ITEM_PENDING = "pending"
+ITEM_DONE = "done"
+ITEM_ERROR = "error"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    source TEXT NOT NULL,
+    use_cache INTEGER NOT NULL DEFAULT 1,
+    total INTEGER NOT NULL,
+    processed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    throughput REAL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    updated_at REAL,
+    finished_at REAL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL REFERENCES jobs(id),
+    position INTEGER NOT NULL,
+    review_text TEXT NOT NULL,
+    status TEXT NOT NULL,
+    polarity REAL,
+    sentiment_label TEXT,
+    error TEXT,
+    PRIMARY KEY (job_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_job_items_status ON job_items(job_id, status);
+"""
+
+
+def get_jobs_db_path(db_path: Optional[Union[str, Path]] = None) -> Path:
+    """Zwraca ścieżkę do bazy zadań (domyślnie obok dataset.csv)."""
+    if db_path is not None:
+        return Path(db_path)
+    if JOBS_DB_PATH:
+        return Path(JOBS_DB_PATH)
+    base_dir = Path(__file__).parent.parent.parent
+    return base_dir / "data" / "jobs.sqlite3"
+
+
+class JobStore:
+    """
+    Zadania i ich opinie w SQLite.
+    Połączenie jest współdzielone między wątkami i chronione blokadą;
+    zapis wyników partii i liczników zadania odbywa się w jednej transakcji.
+    """
+
+    def __init__(self, db_path: Optional[Union[str, Path]] = None):
+        """
+        Otwiera (lub tworzy) bazę zadań.
+
+        Args:
+            db_path: Ścieżka do pliku SQLite; jeśli None, używa domyślnej
+        """
+        self.path = get_jobs_db_path(db_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(_SCHEMA)
+
+    def create_job(self, texts: List[str], source: str, use_cache: bool = True) -> str:
+        """
+        Zapisuje nowe zadanie wraz z opiniami do oceny.
+
+        Args:
+            texts: Teksty opinii (pozycja na liście = position w wynikach)
+            source: Źródło tekstów ('texts' lub 'dataset')
+            use_cache: Czy analiza może korzystać z cache wyników
+
+        Returns:
+            Identyfikator zadania
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO jobs (id, status, source, use_cache, total, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, STATUS_QUEUED, source, int(use_cache), len(texts), now),
+            )
+            self.conn.executemany(
+                "INSERT INTO job_items (job_id, position, review_text, status) VALUES (?, ?, ?, ?)",
+                ((job_id, position, text, ITEM_PENDING) for position, text in enumerate(texts)),
+            )
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """
+        Zwraca zadanie jako słownik.
+
+        Args:
+            job_id: Identyfikator zadania
+
+        Returns:
+            Słownik z polami zadania lub None, jeśli nie istnieje
+        """
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def list_jobs(self, limit: int = 50) -> List[Dict]:
+        """Zwraca najnowsze zadania (od najnowszego)."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def unfinished_jobs(self) -> List[str]:
+        """Zwraca identyfikatory zadań do wznowienia (kolejność zgłoszenia)."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (STATUS_QUEUED, STATUS_RUNNING),
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def mark_running(self, job_id: str) -> None:
+        """Oznacza zadanie jako wykonywane (started_at ustawiane tylko raz)."""
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, started_at = COALESCE(started_at, ?), updated_at = ? "
+                "WHERE id = ?",
+                (STATUS_RUNNING, now, now, job_id),
+            )
+
+    def mark_finished(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        """
+        Kończy zadanie.
+
+        Args:
+            job_id: Identyfikator zadania
+            status: STATUS_COMPLETED lub STATUS_FAILED
+            error: Opis błędu (dla STATUS_FAILED)
+        """
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ?, finished_at = ? WHERE id = ?",
+                (status, error, now, now, job_id),
+            )
+
+    def pending_items(self, job_id: str, limit: int) -> List[Tuple[int, str]]:
+        """
+        Zwraca kolejne opinie bez zapisanego wyniku.
+
+        Args:
+            job_id: Identyfikator zadania
+            limit: Maksymalna liczba opinii
+
+        Returns:
+            Lista krotek (position, review_text)
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT position, review_text FROM job_items "
+                "WHERE job_id = ? AND status = ? ORDER BY position LIMIT ?",
+                (job_id, ITEM_PENDING, limit),
+            ).fetchall()
+        return [(row["position"], row["review_text"]) for row in rows]
+
+    def save_results(
+        self,
+        job_id: str,
+        results: List[Tuple[int, Optional[float], Optional[str], Optional[str]]],
+        throughput: Optional[float] = None,
+    ) -> None:
+        """
+        Zapisuje wyniki partii opinii (checkpoint) i aktualizuje liczniki zadania.
+
+        Args:
+            job_id: Identyfikator zadania
+            results: Krotki (position, polarity, sentiment_label, error);
+                error różny od None oznacza nieudaną ocenę
+            throughput: Bieżąca przepustowość (opinie na sekundę)
+        """
+        if not results:
+            return
+        failed = sum(1 for result in results if result[3] is not None)
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "UPDATE job_items SET status = ?, polarity = ?, sentiment_label = ?, error = ? "
+                "WHERE job_id = ? AND position = ?",
+                (
+                    (ITEM_ERROR if error is not None else ITEM_DONE, polarity, label, error,
+                     job_id, position)
+                    for position, polarity, label, error in results
+                ),
+            )
+            self.conn.execute(
+                "UPDATE jobs SET processed = processed + ?, failed = failed + ?, "
+                "throughput = COALESCE(?, throughput), updated_at = ? WHERE id = ?",
+                (len(results), failed, throughput, time.time(), job_id),
+            )
+
+    def get_results(self, job_id: str, offset: int = 0, limit: int = 100) -> List[Dict]:
+        """
+        Zwraca stronę wyników zadania (tylko opinie już ocenione), według pozycji.
+
+        Args:
+            job_id: Identyfikator zadania
+            offset: Liczba pominiętych wyników
+            limit: Maksymalna liczba wyników
+
+        Returns:
+            Lista słowników: position, review_text, status, polarity, sentiment_label, error
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT position, review_text, status, polarity, sentiment_label, error "
+                "FROM job_items WHERE job_id = ? AND status != ? "
+                "ORDER BY position LIMIT ? OFFSET ?",
+                (job_id, ITEM_PENDING, limit, offset),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self) -> None:
+        """Zamyka połączenie z bazą."""
+        with self.lock:
+            self.conn.close()
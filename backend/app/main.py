@@ -2,23 +2,54 @@
 Główna aplikacja FastAPI - REST API do analizy sentymentu opinii.
 """
 
-from typing import Optional
+import asyncio
+import csv
+import dataclasses
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, File, HTTPException, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
 
+from .analysis.grouped import GROUP_COLUMNS, confusion_matrix, grouped_statistics
 from .analysis.ollama_client import ollama_client
+from .analysis.indexes import DatasetIndexes
+from .analysis.llm_scheduler import PRIORITY_BULK
+from .analysis.preprocessing import get_stopwords
+from .config import (ADMISSION_DEGRADE, BATCH_CONCURRENT_LIMIT, BATCH_MAX_ITEMS,
+                     EVENTS_KEEPALIVE_SECONDS, EVENTS_TOP_WORDS, REPORT_STREAM_CHUNK_SIZE,
+                     SHARED_SNAPSHOT_POLL_SECONDS, UPLOAD_CHUNK_ROWS, UPLOAD_MAX_BYTES)
 from .analysis.sentiment import (analyze_batch, analyze_batch_async,
                                  analyze_sentiment, analyze_sentiment_async,
-                                 classify_sentiment, get_average_polarity,
-                                 get_top_words, perform_eda)
-from .data.loader import append_review, clean_data, load_data
-from .models import (AveragePolarityResponse, HealthResponse, ReviewInput,
-                     ReviewItem, ReviewsListResponse, SentimentResponse,
-                     StatisticsResponse, TopWordsResponse)
-from .reports.pdf_report import build_report_pdf
+                                 analyze_texts_stream, classify_sentiment, get_average_polarity,
+                                 perform_eda)
+from .data.export import EXPORT_FORMATS, EXPORT_WRITERS, parquet_available
+from .data.loader import append_reviews, clean_data, load_data
+from .data.shared import shared_dataset
+from .data.snapshot import DatasetSnapshot, dataset_store
+from .jobs import job_manager
+from .utils.cache import sentiment_cache
+from .utils.events import event_broadcaster
+from .utils.near_duplicates import near_duplicate_index
+from .utils.admission import AdmissionRejected, admission_controller
+from .utils.response_cache import etag_matches, make_etag, response_cache
+from .utils.tasks import TASK_FAILED, BackgroundTask, task_registry
+from .models import (AveragePolarityResponse, BatchSentimentItem,
+                     GroupedStatsResponse, HealthResponse, HistogramBin, JobResultsResponse,
+                     JobStatus, JobSubmitRequest,
+                     PhrasesResponse, PolarityDistributionResponse, ReviewInput,
+                     ReviewItem, ReviewsListResponse, SearchResponse,
+                     SentimentResponse, StatisticsResponse, TaskStatus,
+                     TopWordsResponse, TrendsResponse)
+from .reports.pdf_report import DEFAULT_REPORT_LIMIT, DEFAULT_REPORT_MODE, report_options
+from .reports.report_cache import report_cache
 
 # Inicjalizacja FastAPI
 app = FastAPI(
@@ -35,39 +66,316 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After", "X-Total-Count"],
 )
 
-# Globalne zmienne do cache'owania danych
-cached_df: Optional[pd.DataFrame] = None
-eda_stats: Optional[dict] = None
+# Stan danych: niezmienne, wersjonowane snapshoty (dataset_store.current),
+# podmieniane atomowo przez jednego writera. Endpoint pobiera snapshot raz
+# i korzysta z niego do końca żądania.
 
 
-async def load_and_analyze_data():
-    """Wczytuje i analizuje dane przy starcie aplikacji (async)."""
-    global cached_df, eda_stats
+def _build_review_item(position: int, row, columns) -> ReviewItem:
+    """Buduje ReviewItem z wiersza DataFrame (position - pozycja 0-based)."""
+    return ReviewItem(
+        index=int(position) + 1,
+        review_id=int(row["review_id"]) if "review_id" in columns and pd.notna(
+            row.get("review_id")) else None,
+        review_text=str(row["review_text"]),
+        polarity=float(row["polarity"]),
+        sentiment_label=str(row["sentiment_label"]),
+        word_count=int(row["word_count"]) if "word_count" in columns else len(
+            str(row["review_text"]).split()),
+        review_length=int(row["review_length"]) if "review_length" in columns else len(
+            str(row["review_text"])),
+    )
+
+
+def _cached_json(
+    request: Request,
+    snapshot: DatasetSnapshot,
+    build: Callable[[], BaseModel],
+) -> Response:
+    """
+    Zwraca odpowiedź JSON z cache dla bieżącej wersji danych (z ETag).
+    Jeśli klient przesłał pasujący If-None-Match, zwraca 304 bez treści;
+    w przeciwnym razie serializuje odpowiedź tylko przy pierwszym żądaniu
+    dla danej wersji i zestawu parametrów.
+
+    Args:
+        request: Żądanie HTTP (ścieżka i parametry tworzą klucz cache)
+        snapshot: Snapshot danych, z którego budowana jest odpowiedź
+        build: Funkcja budująca model odpowiedzi (wywoływana przy braku w cache)
+    """
+    params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    key = f"{request.url.path}?{params}"
+    version = snapshot.version
+    etag = make_etag(key, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        response_cache.record_not_modified()
+        return Response(status_code=304, headers=headers)
+
+    body = response_cache.get(key, version)
+    if body is None:
+        body = build().model_dump_json().encode("utf-8")
+        response_cache.set(key, version, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _build_dataset(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict, DatasetIndexes]:
+    """Buduje struktury pochodne i EDA dla nowego DataFrame (w wątku, poza pętlą zdarzeń)."""
+    indexes = DatasetIndexes.build(df)
+    eda_results, df_final = perform_eda(df, index=indexes.search_index)
+    return df_final, eda_results, indexes
+
+
+def _append_rows(snapshot: DatasetSnapshot, new_rows: pd.DataFrame) -> DatasetSnapshot:
+    """
+    Dopisuje gotowe wiersze do nowej kopii DataFrame snapshotu, buduje
+    rozszerzoną kopię struktur pochodnych i przelicza EDA (wywoływane wyłącznie przez writera,
+    w wątku - tokenizacja i EDA na całym DataFrame nie blokują pętli zdarzeń).
+
+    Args:
+        snapshot: Bieżący snapshot danych
+        new_rows: Wiersze do dopisania (kolumny spoza snapshotu są pomijane)
+
+    Returns:
+        Nowy snapshot zawierający wiersze
+    """
+    df = snapshot.df
+    start = len(df)
+    new_rows = new_rows[[c for c in new_rows.columns if c in df.columns]]
+    new_df = pd.concat([df, new_rows], ignore_index=True)
+    indexes = snapshot.indexes.extended(new_df, start)
+    eda_results, new_df = perform_eda(new_df, index=indexes.search_index)
+    return snapshot.successor(new_df, eda_results, indexes)
+
+
+def _map_shared_base(meta: Dict) -> DatasetSnapshot:
+    """
+    Buduje snapshot procesu z całej generacji współdzielonego snapshotu
+    (bez oceny LLM - tylko struktury pochodne i EDA).
+
+    Args:
+        meta: Metadane generacji (z shared_dataset.read_current)
+
+    Returns:
+        Snapshot o wersji równej generacji
+    """
+    df_final, eda_results, indexes = _build_dataset(shared_dataset.read_rows(meta))
+    return DatasetSnapshot(
+        version=meta["generation"],
+        df=df_final,
+        eda_stats=eda_results,
+        indexes=indexes,
+    )
+
+
+async def _sync_shared_rows(current: Optional[DatasetSnapshot], meta: Dict) -> Optional[DatasetSnapshot]:
+    """
+    Dogania generację współdzielonego snapshotu w obrębie tej samej bazy,
+    dopisując wiersze dodane przez inne procesy (wywoływane wyłącznie przez writera).
+
+    Args:
+        current: Bieżący snapshot procesu
+        meta: Metadane opublikowanej generacji
+
+    Returns:
+        Zsynchronizowany snapshot albo None, jeśli zmieniła się baza (wymagane pełne mapowanie)
+    """
+    synced = shared_dataset.synced
+    if current is None or synced is None or synced["base"] != meta["base"]:
+        return None
+    if meta["generation"] == synced["generation"]:
+        return current
+
+    start = current.row_count
+    snapshot = current
+    if meta["rows"] > start:
+        top_before = current.indexes.word_sketch.top(EVENTS_TOP_WORDS)
+        snapshot = await asyncio.to_thread(_append_rows, current, shared_dataset.read_rows(meta, start))
+        snapshot = dataclasses.replace(snapshot, df=shared_dataset.map_frame(meta, snapshot.df))
+    snapshot = dataclasses.replace(snapshot, version=meta["generation"])
+    shared_dataset.synced = meta
+    if meta["rows"] > start:
+        _publish_dataset_delta(snapshot, start, top_before)
+    return snapshot
+
+
+async def _sync_from_shared(current: Optional[DatasetSnapshot]) -> Optional[DatasetSnapshot]:
+    """
+    Synchronizuje snapshot procesu z opublikowaną generacją (wywoływane przez writera).
+    Dopisywanie wierszy i pełne mapowanie nowej bazy są wykonywane w wątku.
+    """
+    meta = shared_dataset.read_current()
+    if meta is None:
+        return current
+    snapshot = await _sync_shared_rows(current, meta)
+    if snapshot is None:
+        snapshot = await asyncio.to_thread(_map_shared_base, meta)
+        shared_dataset.synced = meta
+        event_broadcaster.publish("reload", {"version": snapshot.version})
+    return snapshot
+
 
+async def _swap_shared(
+    current: Optional[DatasetSnapshot],
+    snapshot: DatasetSnapshot,
+    base_meta: Optional[Dict],
+) -> Optional[DatasetSnapshot]:
+    """
+    Publikuje przeładowane dane jako nową bazę współdzielonego snapshotu
+    (wywoływane wyłącznie przez writera). Wiersze dopisane przez dowolny proces
+    w trakcie przeładowania są przenoszone do nowej bazy.
+
+    Args:
+        current: Bieżący snapshot procesu
+        snapshot: Snapshot z przeładowanych danych
+        base_meta: Generacja opublikowana w chwili odczytu dataset.csv
+
+    Returns:
+        Opublikowany snapshot
+    """
+    async with shared_dataset.write_lock():
+        meta = shared_dataset.read_current()
+        if meta is not None and (base_meta is None or meta["base"] != base_meta["base"]):
+            # Inny proces opublikował bazę z późniejszego odczytu pliku - jest nowsza
+            return await _sync_from_shared(current)
+        if meta is not None and meta["rows"] > base_meta["rows"]:
+            snapshot = await asyncio.to_thread(
+                _append_rows, snapshot, shared_dataset.read_rows(meta, base_meta["rows"]))
+        new_meta = shared_dataset.publish_base(snapshot.df)
+        shared_dataset.synced = new_meta
+        return dataclasses.replace(snapshot, version=new_meta["generation"],
+                                   df=shared_dataset.map_frame(new_meta, snapshot.df))
+
+
+async def _watch_shared_snapshot() -> None:
+    """Co SHARED_SNAPSHOT_POLL_SECONDS sprawdza, czy inny proces opublikował nową generację."""
+    while True:
+        await asyncio.sleep(SHARED_SNAPSHOT_POLL_SECONDS)
+        try:
+            meta = shared_dataset.read_current()
+            synced = shared_dataset.synced
+            if meta is not None and (synced is None or meta["generation"] != synced["generation"]):
+                await dataset_store.replace(_sync_from_shared)
+        except Exception as e:
+            print(f"Błąd synchronizacji współdzielonego snapshotu: {e}")
+
+
+async def _reload_dataset(task: BackgroundTask) -> Dict:
+    """
+    Przeładowuje dane w tle: wczytuje i ocenia dataset, buduje nowy snapshot
+    obok bieżącego (który nadal obsługuje odczyty i zapisy) i podmienia go
+    atomowo. Opinie dopisane w trakcie przeładowania trafiają do nowego snapshotu.
+
+    Args:
+        task: Zadanie w tle (etap i postęp przeładowania)
+
+    Returns:
+        Słownik z wersją i liczbą opinii nowego snapshotu
+    """
     try:
+        task.update(stage="loading")
         print("Wczytywanie danych...")
-        df = load_data()
+        # Wiersze bieżącego snapshotu od pozycji base_rows zostaną dopisane
+        # do pliku już po jego odczycie - trzeba je przenieść przy podmianie
+        base = dataset_store.current
+        base_rows = base.row_count if base is not None else 0
+        base_meta = None
+        if shared_dataset is not None:
+            # W trybie wielu workerów wiersze dopisują też inne procesy - plik
+            # i generację współdzielonego snapshotu odczytaj razem pod blokadą
+            async with shared_dataset.write_lock():
+                base_meta = shared_dataset.read_current()
+                df = load_data()
+        else:
+            df = load_data()
         df = clean_data(df)
 
         print("Wykonywanie analizy sentymentu z Ollama...")
+        task.update(stage="scoring", processed=0, total=len(df))
         # Użyj async analyze_batch dla równoległych zapytań do Ollama
-        df_analyzed = await analyze_batch_async(df)
+        df_analyzed = await analyze_batch_async(
+            df, on_progress=lambda done, total: task.update(processed=done, total=total))
 
-        print("Wykonywanie EDA...")
-        eda_results, df_final = perform_eda(df_analyzed)
+        print("Budowanie indeksu wyszukiwania i EDA...")
+        task.update(stage="indexing")
+        df_final, eda_results, indexes = await asyncio.to_thread(_build_dataset, df_analyzed)
 
-        cached_df = df_final
-        eda_stats = eda_results
+        async def swap(current: Optional[DatasetSnapshot]) -> DatasetSnapshot:
+            snapshot = DatasetSnapshot(
+                version=current.version + 1 if current is not None else 1,
+                df=df_final,
+                eda_stats=eda_results,
+                indexes=indexes,
+            )
+            if shared_dataset is not None:
+                return await _swap_shared(current, snapshot, base_meta)
+            if base is not None and current is not None and current.row_count > base_rows:
+                snapshot = await asyncio.to_thread(_append_rows, snapshot, current.df.iloc[base_rows:])
+            return snapshot
 
-        print(f"Przygotowano {len(cached_df)} opinii do analizy")
-        return True
-    except Exception as e:
-        print(f"Błąd podczas wczytywania danych: {e}")
+        task.update(stage="swapping")
+        snapshot = await dataset_store.replace(swap)
+    except Exception:
         import traceback
         traceback.print_exc()
+        raise
+
+    task.update(stage="done")
+    event_broadcaster.publish("reload", {"version": snapshot.version})
+    print(f"Przygotowano {snapshot.row_count} opinii do analizy")
+    return {"version": snapshot.version, "rows": snapshot.row_count}
+
+
+async def load_and_analyze_data():
+    """
+    Wczytuje i analizuje dane (async). Jeśli przeładowanie już trwa,
+    dołącza do niego zamiast uruchamiać potok ponownie. W trybie wielu
+    workerów dane ocenia tylko lider; pozostałe procesy mapują jego snapshot.
+    """
+    if shared_dataset is not None and not shared_dataset.try_become_leader():
+        if shared_dataset.read_current() is None:
+            print("Oczekiwanie na snapshot danych budowany przez lidera...")
+            return False
+        await dataset_store.replace(_sync_from_shared)
+        return dataset_store.current is not None
+
+    task, _ = task_registry.start_or_join("reload", _reload_dataset)
+    await task_registry.wait(task)
+    if task.status == TASK_FAILED:
+        print(f"Błąd podczas wczytywania danych: {task.error}")
         return False
+    return True
+
+
+async def _require_snapshot() -> DatasetSnapshot:
+    """
+    Zwraca bieżący snapshot danych; przy braku danych próbuje je wczytać.
+
+    Raises:
+        HTTPException: 503, jeśli danych nie udało się wczytać
+    """
+    snapshot = dataset_store.current
+    if snapshot is None:
+        # Próba ponownego wczytania danych
+        if not await load_and_analyze_data():
+            raise HTTPException(
+                status_code=503,
+                detail="Dane nie zostały załadowane. Uruchom: python scripts/download_data.py"
+            )
+        snapshot = dataset_store.current
+    return snapshot
+
+
+# Zadanie synchronizacji ze współdzielonym snapshotem (tryb wielu workerów)
+_shared_watcher: Optional[asyncio.Task] = None
+
+
+# Raport PDF jest renderowany w tle po każdej zmianie danych (z opóźnieniem)
+dataset_store.add_listener(report_cache.schedule_prerender)
 
 
 # Event handler - wczytaj dane przy starcie
@@ -82,9 +390,25 @@ async def startup_event():
         print("⚠ UWAGA: Ollama nie jest dostępny, używam TextBlob jako fallback")
 
     success = await load_and_analyze_data()
-    if not success:
+    if not success and (shared_dataset is None or shared_dataset.is_leader):
         print("UWAGA: Aplikacja uruchomiona bez danych. Uruchom: python scripts/download_data.py")
 
+    global _shared_watcher
+    if shared_dataset is not None:
+        _shared_watcher = asyncio.create_task(_watch_shared_snapshot())
+
+    # Wznów niezakończone zadania analizy z poprzedniego uruchomienia
+    # (w trybie wielu workerów tylko lider, aby zadanie nie ruszyło kilka razy)
+    await job_manager.start(resume=shared_dataset is None or shared_dataset.is_leader)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Zatrzymuje workery zadań analizy i synchronizację współdzielonego snapshotu."""
+    if _shared_watcher is not None:
+        _shared_watcher.cancel()
+    await job_manager.stop()
+
 
 @app.get("/api/health", response_model=HealthResponse)
 async def health_check():
@@ -121,20 +445,39 @@ async def health_check_ollama():
         }
 
 
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """
+    Zwraca statystyki cache wyników oraz indeksu niemal identycznych opinii
+    (w tym liczbę wywołań LLM zaoszczędzonych dzięki ponownemu użyciu wyników).
+    """
+    return {
+        "cache_stats": sentiment_cache.get_stats(),
+        "near_duplicate_stats": near_duplicate_index.get_stats(),
+        "response_cache_stats": response_cache.get_stats(),
+        "event_stats": event_broadcaster.get_stats(),
+        "snapshot_stats": dataset_store.get_stats(),
+        "admission_stats": admission_controller.get_stats(),
+        "micro_batch_stats": ollama_client.batcher.get_stats(),
+        "llm_scheduler_stats": ollama_client.scheduler.get_stats(),
+        "ollama_stats": ollama_client.get_stats(),
+        "report_cache_stats": report_cache.get_stats()
+    }
+
+
 @app.get("/api/stats", response_model=StatisticsResponse)
-async def get_statistics():
+async def get_statistics(request: Request):
     """
     Zwraca statystyki ogólne dotyczące analizowanych opinii.
-    Wykorzystuje cache'owane dane z EDA.
+    Wykorzystuje cache'owane dane z EDA (odpowiedź z ETag per wersja danych).
     """
-    if cached_df is None or eda_stats is None:
-        # Próba ponownego wczytania danych
-        if not await load_and_analyze_data():
-            raise HTTPException(
-                status_code=503,
-                detail="Dane nie zostały załadowane. Uruchom: python scripts/download_data.py"
-            )
+    snapshot = await _require_snapshot()
 
+    return _cached_json(request, snapshot, lambda: _statistics_response(snapshot.eda_stats))
+
+
+def _statistics_response(eda_stats: Dict) -> StatisticsResponse:
+    """Buduje odpowiedź ze statystykami ogólnymi z wyników EDA snapshotu."""
     return StatisticsResponse(
         total_reviews=eda_stats["total_reviews"],
         positive_count=eda_stats["positive_count"],
@@ -147,38 +490,159 @@ async def get_statistics():
     )
 
 
+@app.get("/api/stats/grouped", response_model=GroupedStatsResponse)
+async def get_grouped_statistics(
+    request: Request,
+    by: str = Query("label", pattern="^(rating|sentiment|label)$",
+                    description="Klucz grupowania: ocena, etykieta referencyjna lub przewidziana"),
+):
+    """
+    Zwraca statystyki opinii w grupach (groupby na kolumnach snapshotu) oraz
+    macierz pomyłek etykiet przewidzianych względem referencyjnych z datasetu.
+    Odpowiedź z ETag per wersja danych i klucz grupowania.
+    """
+    snapshot = await _require_snapshot()
+    df = snapshot.df
+    if GROUP_COLUMNS[by] not in df.columns:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Dataset nie zawiera kolumny '{GROUP_COLUMNS[by]}' - grupowanie niemożliwe"
+        )
+
+    return _cached_json(request, snapshot, lambda: GroupedStatsResponse(
+        by=by,
+        total_reviews=len(df),
+        groups=grouped_statistics(df, by),
+        confusion_matrix=confusion_matrix(df),
+    ))
+
+
 @app.get("/api/polarity/average", response_model=AveragePolarityResponse)
-async def get_average_polarity_endpoint():
+async def get_average_polarity_endpoint(request: Request):
     """
-    Zwraca średnią polaryzację wszystkich opinii.
+    Zwraca średnią polaryzację wszystkich opinii (odpowiedź z ETag per wersja danych).
     """
-    if cached_df is None:
-        if not await load_and_analyze_data():
-            raise HTTPException(
-                status_code=503,
-                detail="Dane nie zostały załadowane. Uruchom: python scripts/download_data.py"
-            )
+    snapshot = await _require_snapshot()
+
+    return _cached_json(request, snapshot, lambda: AveragePolarityResponse(
+        average_polarity=get_average_polarity(snapshot.df)))
 
-    avg_polarity = get_average_polarity(cached_df)
-    return AveragePolarityResponse(average_polarity=avg_polarity)
+
+@app.get("/api/polarity/distribution", response_model=PolarityDistributionResponse)
+async def get_polarity_distribution(
+    include_sketch: bool = Query(
+        False, description="Dołącz zserializowany szkic (do łączenia między workerami)"),
+):
+    """
+    Zwraca rozkład polaryzacji: percentyle p50/p90/p99 ze strumieniowego
+    szkicu KLL oraz histogram o stałych przedziałach (stała pamięć, bez sortowania).
+    """
+    snapshot = await _require_snapshot()
+
+    polarity_sketch = snapshot.indexes.polarity_sketch
+    polarity_histogram = snapshot.indexes.polarity_histogram
+    p50, p90, p99 = polarity_sketch.quantiles([0.5, 0.9, 0.99])
+    edges = polarity_histogram.edges()
+    bins = [
+        HistogramBin(start=edges[i], end=edges[i + 1], count=count)
+        for i, count in enumerate(polarity_histogram.counts)
+    ]
+    sketch = None
+    if include_sketch:
+        sketch = {
+            "kll": polarity_sketch.to_dict(),
+            "histogram": polarity_histogram.to_dict(),
+        }
+    return PolarityDistributionResponse(
+        count=polarity_sketch.count,
+        min_polarity=polarity_sketch.min_value,
+        max_polarity=polarity_sketch.max_value,
+        p50=p50,
+        p90=p90,
+        p99=p99,
+        bins=bins,
+        sketch=sketch,
+    )
 
 
 @app.get("/api/words/top", response_model=TopWordsResponse)
-async def get_top_words_endpoint(limit: int = Query(20, ge=1, le=100, description="Liczba słów do zwrócenia")):
+async def get_top_words_endpoint(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100, description="Liczba słów do zwrócenia"),
+    approximate: bool = Query(
+        False, description="Tryb przybliżony (szkic Space-Saving o ograniczonej pamięci)"),
+    sentiment: Optional[str] = Query(
+        None, pattern="^(positive|negative)$", description="Tylko opinie o danej etykiecie"),
+    rating: Optional[int] = Query(None, description="Tylko opinie o danej ocenie"),
+):
     """
     Zwraca najczęściej występujące słowa w opiniach.
+    Dokładne zliczenia to sumy kolumn macierzy dokument-term po masce
+    wierszy (filtry sentiment / rating), bez ponownego preprocessingu tekstu.
+    Odpowiedź jest cache'owana z ETag per wersja danych i zestaw parametrów.
 
     Args:
         limit: Liczba TOP słów do zwrócenia (1-100)
+        approximate: Zwróć wynik z utrzymywanego przyrostowo szkicu Space-Saving
+            (stała pamięć, liczniki z ograniczeniem błędu) zamiast dokładnego zliczania
+        sentiment: Filtr etykiety sentymentu
+        rating: Filtr oceny
     """
-    if cached_df is None:
-        if not await load_and_analyze_data():
-            raise HTTPException(
-                status_code=503,
-                detail="Dane nie zostały załadowane. Uruchom: python scripts/download_data.py"
-            )
+    snapshot = await _require_snapshot()
+
+    if approximate and (sentiment is not None or rating is not None):
+        raise HTTPException(
+            status_code=400,
+            detail="Tryb przybliżony nie obsługuje filtrów sentiment/rating"
+        )
+
+    return _cached_json(
+        request, snapshot,
+        lambda: _top_words_response(snapshot, limit, approximate, sentiment, rating))
 
-    top_words = get_top_words(cached_df, limit=limit)
+
+def _top_words_response(
+    snapshot: DatasetSnapshot,
+    limit: int,
+    approximate: bool,
+    sentiment: Optional[str],
+    rating: Optional[int],
+) -> TopWordsResponse:
+    """Buduje odpowiedź /api/words/top (szkic przybliżony lub macierz dokument-term)."""
+    word_sketch = snapshot.indexes.word_sketch
+    doc_term_matrix = snapshot.indexes.doc_term_matrix
+    if approximate:
+        top_words = [
+            {"word": entry["item"], "count": entry["count"], "error": entry["error"]}
+            for entry in word_sketch.top(limit)
+        ]
+        return TopWordsResponse(
+            words=top_words,
+            total_words_analyzed=sum(word_data["count"] for word_data in top_words),
+            approximate=True,
+            error_bound=word_sketch.error_bound(),
+            memory_budget=word_sketch.capacity,
+        )
+
+    df = snapshot.df
+    # Struktury snapshotu są budowane razem z jego DataFrame i nigdy nie są rozszerzane w miejscu
+    assert doc_term_matrix.n_rows == len(df)
+    row_mask = None
+    if sentiment is not None or rating is not None:
+        row_mask = np.ones(len(df), dtype=bool)
+        if sentiment is not None:
+            row_mask &= (df["sentiment_label"] == sentiment).to_numpy()
+        if rating is not None:
+            if "rating" not in df.columns:
+                row_mask[:] = False
+            else:
+                row_mask &= (df["rating"] == rating).to_numpy()
+
+    top_words = [
+        {"word": word, "count": count}
+        for word, count in doc_term_matrix.top_terms(
+            limit, row_mask=row_mask, exclude=get_stopwords())
+    ]
 
     # Oblicz całkowitą liczbę słów
     total_words = sum(word_data["count"] for word_data in top_words)
@@ -189,49 +653,388 @@ async def get_top_words_endpoint(limit: int = Query(20, ge=1, le=100, descriptio
     )
 
 
+@app.get("/api/phrases/top", response_model=PhrasesResponse)
+async def get_top_phrases(
+    n: int = Query(2, ge=2, le=3, description="Długość frazy: 2 (bigramy) lub 3 (trigramy)"),
+    sentiment: Optional[str] = Query(
+        None, pattern="^(positive|negative)$", description="Tylko opinie o danej etykiecie"),
+    limit: int = Query(20, ge=1, le=100, description="Liczba fraz do zwrócenia"),
+    min_count: int = Query(2, ge=1, description="Minimalna liczba wystąpień frazy"),
+    sort: str = Query("count", pattern="^(count|pmi)$",
+                      description="Sortowanie: liczba wystąpień lub PMI"),
+):
+    """
+    Zwraca najczęstsze frazy (bigramy/trigramy) z miarą kolokacji PMI.
+    Liczniki fraz są utrzymywane przyrostowo per etykieta sentymentu.
+    """
+    snapshot = await _require_snapshot()
+
+    phrases = snapshot.indexes.phrase_stats.top(
+        n=n, label=sentiment, limit=limit, min_count=min_count, sort_by=sort)
+    return PhrasesResponse(n=n, sentiment=sentiment, phrases=phrases)
+
+
+def _filter_positions(
+    snapshot: DatasetSnapshot,
+    sentiment: Optional[str] = None,
+    min_polarity: Optional[float] = None,
+    max_polarity: Optional[float] = None,
+    q: Optional[str] = None,
+) -> np.ndarray:
+    """
+    Zwraca pozycje wierszy snapshotu spełniających filtry (operacje wektorowe
+    na kolumnach). Zapytanie tekstowe q jest wykonywane przez indeks wyszukiwania.
+    """
+    df = snapshot.df
+    mask = np.ones(len(df), dtype=bool)
+    if sentiment is not None:
+        mask &= (df["sentiment_label"] == sentiment).to_numpy()
+    if min_polarity is not None:
+        mask &= (df["polarity"] >= min_polarity).to_numpy()
+    if max_polarity is not None:
+        mask &= (df["polarity"] <= max_polarity).to_numpy()
+    positions = np.flatnonzero(mask)
+    if q:
+        matched = np.asarray(
+            snapshot.indexes.search_index.search(q, max_doc_id=len(df)), dtype=np.int64)
+        positions = np.intersect1d(positions, matched, assume_unique=True)
+    return positions
+
+
+# Kolumny sortowania dla /api/reviews
+REVIEW_SORT_COLUMNS = {
+    "id": "review_id",
+    "polarity": "polarity",
+    "length": "review_length",
+}
+
+
 @app.get("/api/reviews", response_model=ReviewsListResponse)
-async def get_reviews():
+async def get_reviews(
+    request: Request,
+    offset: int = Query(0, ge=0, description="Liczba pominiętych opinii"),
+    limit: int = Query(50, ge=1, le=500, description="Rozmiar strony"),
+    sort_by: str = Query("id", pattern="^(id|polarity|length)$",
+                         description="Sortowanie: id, polarity lub length"),
+    order: str = Query("asc", pattern="^(asc|desc)$", description="Kierunek sortowania"),
+    sentiment: Optional[str] = Query(
+        None, pattern="^(positive|negative)$", description="Filtr etykiety sentymentu"),
+    min_polarity: Optional[float] = Query(
+        None, ge=-1.0, le=1.0, description="Minimalna polaryzacja"),
+    max_polarity: Optional[float] = Query(
+        None, ge=-1.0, le=1.0, description="Maksymalna polaryzacja"),
+    q: Optional[str] = Query(
+        None, description="Zapytanie tekstowe (składnia jak w /api/search)"),
+):
     """
-    Zwraca listę wszystkich opinii z analizą sentymentu (do wyświetlenia w gridzie).
+    Zwraca stronę opinii z analizą sentymentu (do wyświetlenia w gridzie).
+    Filtrowanie i sortowanie są wykonywane wektorowo na kolumnach;
+    obiekty ReviewItem powstają tylko dla opinii z bieżącej strony.
+    Odpowiedź jest cache'owana z ETag per wersja danych i zestaw parametrów.
     """
-    global cached_df, eda_stats
-    if cached_df is None or eda_stats is None:
+    snapshot = dataset_store.current
+    if snapshot is None:
         if not await load_and_analyze_data():
-            return ReviewsListResponse(reviews=[])
-    reviews = []
-    for i, row in cached_df.iterrows():
-        item = ReviewItem(
-            index=int(i) + 1,
-            review_id=int(row["review_id"]) if "review_id" in cached_df.columns and pd.notna(
-                row.get("review_id")) else None,
-            review_text=str(row["review_text"]),
-            polarity=float(row["polarity"]),
-            sentiment_label=str(row["sentiment_label"]),
-            word_count=int(row["word_count"]) if "word_count" in cached_df.columns else len(
-                str(row["review_text"]).split()),
-            review_length=int(row["review_length"]) if "review_length" in cached_df.columns else len(
-                str(row["review_text"])),
+            return ReviewsListResponse(reviews=[], total=0, offset=offset, limit=limit)
+        snapshot = dataset_store.current
+
+    def build() -> ReviewsListResponse:
+        df = snapshot.df
+        positions = _filter_positions(snapshot, sentiment, min_polarity, max_polarity, q)
+
+        column = REVIEW_SORT_COLUMNS[sort_by]
+        if column in df.columns:
+            keys = df[column].to_numpy()[positions]
+            ordering = np.argsort(keys, kind="stable")
+        else:
+            # Brak kolumny (np. review_id) - kolejność wierszy w danych
+            ordering = np.arange(len(positions))
+        if order == "desc":
+            ordering = ordering[::-1]
+
+        page = positions[ordering][offset:offset + limit]
+        page_df = df.iloc[page]
+        reviews = [
+            _build_review_item(position, row, df.columns)
+            for position, (_, row) in zip(page, page_df.iterrows())
+        ]
+        return ReviewsListResponse(
+            reviews=reviews, total=len(positions), offset=offset, limit=limit)
+
+    return _cached_json(request, snapshot, build)
+
+
+@app.get("/api/export")
+async def export_reviews(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson|parquet)$",
+                               description="Format: csv, ndjson lub parquet"),
+    sentiment: Optional[str] = Query(
+        None, pattern="^(positive|negative)$", description="Filtr etykiety sentymentu"),
+    min_polarity: Optional[float] = Query(
+        None, ge=-1.0, le=1.0, description="Minimalna polaryzacja"),
+    max_polarity: Optional[float] = Query(
+        None, ge=-1.0, le=1.0, description="Maksymalna polaryzacja"),
+    q: Optional[str] = Query(
+        None, description="Zapytanie tekstowe (składnia jak w /api/search)"),
+    columns: Optional[str] = Query(
+        None, description="Eksportowane kolumny oddzielone przecinkami (domyślnie wszystkie)"),
+):
+    """
+    Eksportuje opinie z analizą sentymentu (z opcjonalnymi filtrami jak w /api/reviews).
+    Wiersze są wybierane wektorowo i serializowane porcjami EXPORT_CHUNK_ROWS prosto
+    z kolumn snapshotu (w wątku roboczym), więc pamięć nie rośnie z liczbą opinii.
+    """
+    snapshot = await _require_snapshot()
+    if export_format == "parquet" and not parquet_available():
+        raise HTTPException(
+            status_code=501,
+            detail="Eksport do formatu parquet wymaga pakietu pyarrow (pip install pyarrow)"
         )
-        reviews.append(item)
-    return ReviewsListResponse(reviews=reviews)
+
+    df = snapshot.df
+    # Każda kolumna raz (nazwy w danych lub w parametrze mogą się powtarzać) - sprawdzane
+    # przed rozpoczęciem strumienia, bo błąd w jego trakcie dałby ucięty plik ze statusem 200
+    selected = list(dict.fromkeys(df.columns))
+    if columns:
+        selected = list(dict.fromkeys(
+            column.strip() for column in columns.split(",") if column.strip())) or selected
+        unknown = [column for column in selected if column not in df.columns]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Nieznane kolumny: {', '.join(unknown)}. Dostępne: {', '.join(df.columns)}"
+            )
+
+    positions = _filter_positions(snapshot, sentiment, min_polarity, max_polarity, q)
+    media_type, extension = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        EXPORT_WRITERS[export_format](df, positions, selected),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="opinie.{extension}"',
+            "X-Total-Count": str(len(positions)),
+        },
+    )
+
+
+@app.get("/api/search", response_model=SearchResponse)
+async def search_reviews(
+    q: str = Query(..., min_length=1,
+                   description='Zapytanie: słowa (AND), OR, "fraza w cudzysłowie"'),
+    sentiment: Optional[str] = Query(
+        None, pattern="^(positive|negative)$", description="Filtr etykiety sentymentu"),
+    min_polarity: Optional[float] = Query(
+        None, ge=-1.0, le=1.0, description="Minimalna polaryzacja"),
+    max_polarity: Optional[float] = Query(
+        None, ge=-1.0, le=1.0, description="Maksymalna polaryzacja"),
+    limit: int = Query(50, ge=1, le=500,
+                       description="Maksymalna liczba zwróconych opinii"),
+):
+    """
+    Wyszukiwanie pełnotekstowe w opiniach przy użyciu indeksu odwróconego.
+    Obsługuje termy (AND), alternatywę OR oraz frazy w cudzysłowie,
+    z filtrami po etykiecie sentymentu i zakresie polaryzacji.
+    """
+    snapshot = await _require_snapshot()
+
+    df = snapshot.df
+    doc_ids = snapshot.indexes.search_index.search(q, max_doc_id=len(df))
+    matches = df.iloc[doc_ids]
+    if sentiment is not None:
+        matches = matches[matches["sentiment_label"] == sentiment]
+    if min_polarity is not None:
+        matches = matches[matches["polarity"] >= min_polarity]
+    if max_polarity is not None:
+        matches = matches[matches["polarity"] <= max_polarity]
+
+    results = [
+        _build_review_item(i, row, df.columns)
+        for i, row in matches.head(limit).iterrows()
+    ]
+    return SearchResponse(query=q, total=len(matches), results=results)
+
+
+@app.get("/api/trends", response_model=TrendsResponse)
+async def get_trends(
+    granularity: str = Query(
+        "hour", pattern="^(minute|hour|day)$", description="Granulacja przedziałów"),
+    start: Optional[datetime] = Query(
+        None, description="Początek okna (ISO 8601, domyślnie UTC)"),
+    end: Optional[datetime] = Query(
+        None, description="Koniec okna (ISO 8601, wyłącznie)"),
+):
+    """
+    Zwraca trend sentymentu w czasie z wcześniej zagregowanych przedziałów
+    (liczba opinii, pozytywne/negatywne, suma i średnia polaryzacji).
+    """
+    snapshot = await _require_snapshot()
+
+    return TrendsResponse(
+        granularity=granularity,
+        buckets=snapshot.indexes.trend_aggregator.series(granularity, start=start, end=end),
+        untimestamped_reviews=snapshot.indexes.trend_aggregator.untimestamped,
+    )
+
+
+async def _ingest_reviews(reviews: List[Dict]) -> int:
+    """
+    Zapisuje ocenione opinie do dataset.csv i publikuje nowy snapshot danych.
+    Zgłoszenia z równoległych żądań są łączone przez writera w jedną partię.
+
+    Args:
+        reviews: Lista słowników z kluczami review_text, polarity, sentiment_label
+
+    Returns:
+        Liczba zapisanych opinii (0, jeśli dane nie są załadowane)
+    """
+    if dataset_store.current is None or not reviews:
+        return 0
+    await dataset_store.apply(reviews, _apply_reviews)
+    return len(reviews)
+
+
+async def _apply_reviews(snapshot: DatasetSnapshot, reviews: List[Dict]) -> DatasetSnapshot:
+    """
+    Nakłada partię opinii na snapshot (wywoływane wyłącznie przez writera):
+    jedno dopisanie do pliku i jedno _append_rows (nowy DataFrame - poprzedni
+    pozostaje nietknięty, przyrostowa aktualizacja struktur, jedno przeliczenie EDA).
+    W trybie wielu workerów zapis odbywa się pod blokadą współdzieloną przez
+    procesy, na generacji zsynchronizowanej z innymi workerami.
+
+    Args:
+        snapshot: Bieżący snapshot danych
+        reviews: Opinie z połączonych zgłoszeń
+
+    Returns:
+        Nowy snapshot zawierający opinie
+    """
+    if shared_dataset is None:
+        return await _add_reviews(snapshot, reviews)
+    async with shared_dataset.write_lock():
+        return await _add_reviews(await _sync_from_shared(snapshot), reviews)
+
+
+async def _add_reviews(snapshot: DatasetSnapshot, reviews: List[Dict]) -> DatasetSnapshot:
+    """Dopisuje opinie do pliku i snapshotu (oraz do współdzielonego snapshotu)."""
+    df = snapshot.df
+    next_id = 1
+    if "review_id" in df.columns:
+        next_id = int(df["review_id"].max()) + 1
+    rows = []
+    for offset, review in enumerate(reviews):
+        text = review["review_text"]
+        row = {
+            "review_id": next_id + offset,
+            "review_text": text,
+            "polarity": review["polarity"],
+            "sentiment_label": review["sentiment_label"],
+            "word_count": len(text.split()),
+            "review_length": len(text),
+            "rating": review.get("rating", 0),
+        }
+        # Opinie z wgranego pliku mogą mieć etykietę referencyjną; pozostałe
+        # zapisywane są bez niej (etykieta przewidziana nie jest referencją)
+        if review.get("sentiment") is not None:
+            row["sentiment"] = review["sentiment"]
+        rows.append(row)
+
+    created_at = await asyncio.to_thread(
+        append_reviews,
+        [{"review_id": row["review_id"], "review_text": row["review_text"],
+          "sentiment": row.get("sentiment"),
+          "rating": row["rating"]} for row in rows],
+    )
+    new_rows = pd.DataFrame(rows)
+    new_rows["created_at"] = pd.Timestamp(created_at)
+
+    top_before = snapshot.indexes.word_sketch.top(EVENTS_TOP_WORDS)
+    new_snapshot = await asyncio.to_thread(_append_rows, snapshot, new_rows)
+    if shared_dataset is not None:
+        meta = shared_dataset.publish_rows(new_snapshot.df, len(df))
+        shared_dataset.synced = meta
+        new_snapshot = dataclasses.replace(new_snapshot, version=meta["generation"],
+                                           df=shared_dataset.map_frame(meta, new_snapshot.df))
+    _publish_dataset_delta(new_snapshot, len(df), top_before)
+    return new_snapshot
+
+
+def _publish_dataset_delta(snapshot: DatasetSnapshot, start: int, top_before: List[Dict]) -> None:
+    """
+    Rozgłasza zwartą deltę po dopisaniu opinii: nowe wiersze, aktualne
+    liczniki oraz słowa z listy TOP (szkic przybliżony), które się zmieniły.
+
+    Args:
+        snapshot: Nowy snapshot danych
+        start: Pozycja pierwszej nowej opinii w snapshocie
+        top_before: TOP słowa szkicu sprzed dopisania opinii
+    """
+    if not event_broadcaster.subscribers:
+        return
+    top_after = snapshot.indexes.word_sketch.top(EVENTS_TOP_WORDS)
+    before = {entry["item"]: (entry["count"], entry["error"]) for entry in top_before}
+    after_words = {entry["item"] for entry in top_after}
+    changed = [
+        {"word": entry["item"], "count": entry["count"], "error": entry["error"]}
+        for entry in top_after
+        if before.get(entry["item"]) != (entry["count"], entry["error"])
+    ]
+    df = snapshot.df
+    reviews = [
+        _build_review_item(start + offset, row, df.columns).model_dump()
+        for offset, (_, row) in enumerate(df.iloc[start:].iterrows())
+    ]
+    event_broadcaster.publish("dataset", {
+        "version": snapshot.version,
+        "reviews": reviews,
+        "stats": _statistics_response(snapshot.eda_stats).model_dump(),
+        "top_words": {
+            "changed": changed,
+            "removed": [word for word in before if word not in after_words],
+        },
+    })
+
+
+def _client_key(request: Request) -> str:
+    """Zwraca identyfikator klienta do limitów żądań (adres IP)."""
+    return request.client.host if request.client else "unknown"
 
 
 @app.post("/api/analyze", response_model=SentimentResponse)
-async def analyze_single_review(review_input: ReviewInput):
+async def analyze_single_review(review_input: ReviewInput, request: Request):
     """
     Analizuje pojedynczą opinię, zwraca wynik sentymentu oraz zapisuje opinię
     do dataset.csv i aktualizuje cache (wykresy i statystyki).
+    Przy przekroczeniu limitu klienta zwraca 429, a przy przeciążeniu 503
+    (z nagłówkiem Retry-After) albo - przy ADMISSION_DEGRADE - wynik TextBlob.
     """
-    global cached_df, eda_stats
     if not review_input.review_text or len(review_input.review_text.strip()) == 0:
         raise HTTPException(
             status_code=400, detail="Tekst opinii nie może być pusty")
 
+    retry_after = admission_controller.check_rate(_client_key(request))
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="Przekroczono limit zapytań. Spróbuj ponownie później",
+            headers={"Retry-After": str(retry_after)})
+
     try:
-        sentiment_result = await analyze_sentiment_async(review_input.review_text, use_cache=True)
+        async with admission_controller.slot():
+            sentiment_result = await analyze_sentiment_async(review_input.review_text, use_cache=True)
         polarity = sentiment_result.get("polarity", 0.0)
         sentiment_label = sentiment_result.get(
             "label", classify_sentiment(polarity))
+    except AdmissionRejected as e:
+        if not ADMISSION_DEGRADE:
+            raise HTTPException(
+                status_code=503,
+                detail="Serwis analizy jest przeciążony. Spróbuj ponownie później",
+                headers={"Retry-After": str(e.retry_after)})
+        # Przeciążenie - ocena lokalnym silnikiem zamiast kolejki do Ollama
+        admission_controller.record_degraded()
+        sentiment_result = ollama_client.analyze_local(review_input.review_text)
+        polarity = sentiment_result["polarity"]
+        sentiment_label = sentiment_result.get("label", classify_sentiment(polarity))
     except Exception as e:
         print(f"Błąd podczas async analizy, używam fallback: {e}")
         sentiment_result = analyze_sentiment(review_input.review_text)
@@ -239,95 +1042,524 @@ async def analyze_single_review(review_input: ReviewInput):
         sentiment_label = classify_sentiment(polarity)
 
     word_count = len(review_input.review_text.split())
-    review_length = len(review_input.review_text.strip())
 
     # Zapis do dataset.csv i aktualizacja cache
-    if cached_df is not None:
-        try:
-            next_id = 1
-            if "review_id" in cached_df.columns:
-                next_id = int(cached_df["review_id"].max()) + 1
-            append_review(
-                review_id=next_id,
-                review_text=review_input.review_text.strip(),
-                sentiment=sentiment_label,
-                rating=0,
-            )
-            new_row = {
-                "review_text": review_input.review_text.strip(),
-                "polarity": polarity,
-                "sentiment_label": sentiment_label,
-                "word_count": word_count,
-                "review_length": review_length,
-            }
-            if "review_id" in cached_df.columns:
-                new_row["review_id"] = next_id
-            if "rating" in cached_df.columns:
-                new_row["rating"] = 0
-            cached_df = pd.concat(
-                [cached_df, pd.DataFrame([new_row])],
-                ignore_index=True,
-            )
-            eda_results, cached_df = perform_eda(cached_df)
-            eda_stats = eda_results
-        except Exception as e:
-            print(f"Błąd zapisu opinii do datasetu: {e}")
+    try:
+        await _ingest_reviews([{
+            "review_text": review_input.review_text.strip(),
+            "polarity": polarity,
+            "sentiment_label": sentiment_label,
+        }])
+    except Exception as e:
+        print(f"Błąd zapisu opinii do datasetu: {e}")
 
     return SentimentResponse(
         polarity=polarity,
         sentiment_label=sentiment_label,
-        word_count=word_count
+        word_count=word_count,
+        near_duplicate=bool(sentiment_result.get("near_duplicate", False)),
+        similarity=sentiment_result.get("similarity"),
     )
 
 
-@app.get("/api/report/pdf")
-async def get_report_pdf():
+def _parse_batch_body(body: bytes, content_type: str) -> List[str]:
     """
-    Generuje i zwraca raport końcowy w formacie PDF.
-    Zawiera podsumowanie statystyk oraz listę wszystkich opinii z analizą sentymentu.
+    Odczytuje teksty opinii z treści żądania /api/analyze/batch.
+    Obsługuje listę JSON (tekstów lub obiektów z polem review_text),
+    obiekt {"reviews": [...]} oraz NDJSON (jedna opinia na linię).
+
+    Args:
+        body: Surowa treść żądania
+        content_type: Nagłówek Content-Type
+
+    Returns:
+        Lista tekstów opinii
     """
-    if cached_df is None or eda_stats is None:
-        if not await load_and_analyze_data():
+    try:
+        if "ndjson" in content_type or "jsonlines" in content_type:
+            items = [json.loads(line) for line in body.decode("utf-8").splitlines() if line.strip()]
+        else:
+            items = json.loads(body or b"null")
+            if isinstance(items, dict):
+                items = items.get("reviews")
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Nieprawidłowa treść żądania: {e}")
+
+    if not isinstance(items, list) or not items:
+        raise HTTPException(
+            status_code=400,
+            detail="Oczekiwano niepustej listy opinii (JSON lub NDJSON)")
+    if len(items) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Za dużo opinii w jednym żądaniu (maksymalnie {BATCH_MAX_ITEMS})")
+
+    texts = []
+    for item in items:
+        text = item.get("review_text") if isinstance(item, dict) else item
+        if not isinstance(text, str):
             raise HTTPException(
-                status_code=503,
-                detail="Dane nie zostały załadowane. Uruchom: python scripts/download_data.py"
+                status_code=400,
+                detail="Każda opinia musi być tekstem lub obiektem z polem review_text")
+        texts.append(text)
+    return texts
+
+
+@app.post("/api/analyze/batch")
+async def analyze_reviews_batch(
+    request: Request,
+    persist: bool = Query(False, description="Zapisz opinie do dataset.csv i zaktualizuj statystyki"),
+):
+    """
+    Analizuje listę opinii i strumieniuje wyniki jako NDJSON w kolejności ukończenia.
+    Wywołania LLM korzystają ze wspólnego limitu równoległości klienta Ollama.
+    Przy persist=true opinie są zapisywane i statystyki przeliczane raz,
+    po ocenie całej partii; ostatnia linia zawiera podsumowanie.
+    """
+    texts = _parse_batch_body(await request.body(), request.headers.get("content-type", ""))
+    if persist:
+        await _require_snapshot()
+
+    valid = [i for i, text in enumerate(texts) if text.strip()]
+
+    async def stream():
+        for i, text in enumerate(texts):
+            if not text.strip():
+                yield json.dumps({"index": i, "error": "Tekst opinii nie może być pusty"},
+                                 ensure_ascii=False) + "\n"
+
+        scored: Dict[int, Dict] = {}
+        near_duplicates = 0
+        async for position, result in analyze_texts_stream(
+                [texts[i] for i in valid], BATCH_CONCURRENT_LIMIT):
+            index = valid[position]
+            polarity = result.get("polarity", 0.0)
+            item = BatchSentimentItem(
+                index=index,
+                polarity=polarity,
+                sentiment_label=result.get("label", classify_sentiment(polarity)),
+                word_count=len(texts[index].split()),
+                near_duplicate=bool(result.get("near_duplicate", False)),
+                similarity=result.get("similarity"),
             )
+            scored[index] = {
+                "review_text": texts[index].strip(),
+                "polarity": item.polarity,
+                "sentiment_label": item.sentiment_label,
+            }
+            near_duplicates += item.near_duplicate
+            yield item.model_dump_json() + "\n"
+
+        persisted = 0
+        if persist:
+            try:
+                persisted = await _ingest_reviews([scored[i] for i in sorted(scored)])
+            except Exception as e:
+                print(f"Błąd zapisu partii opinii do datasetu: {e}")
+        yield json.dumps({
+            "done": True,
+            "total": len(texts),
+            "analyzed": len(scored),
+            "errors": len(texts) - len(valid),
+            "near_duplicates": near_duplicates,
+            "persisted": persisted,
+        }) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.get("/api/events")
+async def stream_events(request: Request):
+    """
+    Strumień Server-Sent Events ze zmianami danych.
+    Zdarzenia: 'dataset' (delta po dopisaniu opinii), 'reload' (dane wczytane
+    od nowa) i 'resync' (klient nie nadążał - należy pobrać pełny stan).
+    """
+    queue = event_broadcaster.subscribe()
+    snapshot = dataset_store.current
+    version = snapshot.version if snapshot is not None else 0
+
+    async def stream():
+        try:
+            yield f"retry: 3000\nevent: hello\ndata: {json.dumps({'version': version})}\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(queue.get(), timeout=EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # Komentarz SSE podtrzymuje połączenie przez proxy
+                    yield ": keepalive\n\n"
+                    continue
+                yield frame
+        finally:
+            event_broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _as_datetime(value: Optional[float]) -> Optional[datetime]:
+    """Zamienia znacznik czasu (epoch) na datetime UTC."""
+    return datetime.fromtimestamp(value, tz=timezone.utc) if value is not None else None
+
+
+def _job_status(job: Dict) -> JobStatus:
+    """Buduje model stanu zadania z wiersza bazy (czasy jako UTC)."""
+    remaining = job["total"] - job["processed"]
+    throughput = job["throughput"]
+    eta = None
+    if job["status"] in ("queued", "running") and throughput:
+        eta = round(remaining / throughput, 1)
+    return JobStatus(
+        id=job["id"],
+        status=job["status"],
+        source=job["source"],
+        total=job["total"],
+        processed=job["processed"],
+        failed=job["failed"],
+        progress=round(job["processed"] / job["total"] * 100, 2) if job["total"] else 100.0,
+        throughput=round(throughput, 3) if throughput else None,
+        eta_seconds=eta,
+        created_at=_as_datetime(job["created_at"]),
+        started_at=_as_datetime(job["started_at"]),
+        finished_at=_as_datetime(job["finished_at"]),
+        error=job["error"],
+    )
+
+
+async def _get_job_or_404(job_id: str) -> Dict:
+    """Zwraca zadanie z bazy (odczyt w wątku) lub zgłasza 404."""
+    job = await asyncio.to_thread(job_manager.store.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Nie znaleziono zadania: {job_id}")
+    return job
+
+
+@app.post("/api/jobs", response_model=JobStatus, status_code=202)
+async def submit_job(job_request: JobSubmitRequest):
+    """
+    Zgłasza zadanie analizy w tle i zwraca jego identyfikator.
+    Zadanie jest zapisywane w SQLite i wykonywane przez workery;
+    po restarcie serwera jest wznawiane od ostatniego checkpointu.
+    """
+    if job_request.source == "dataset":
+        snapshot = await _require_snapshot()
+        texts = snapshot.df["review_text"].astype(str).tolist()
+    else:
+        texts = job_request.texts or []
+    if not texts:
+        raise HTTPException(status_code=400, detail="Zadanie nie zawiera żadnych opinii")
+
+    job = await job_manager.submit(texts, job_request.source, use_cache=job_request.use_cache)
+    return _job_status(job)
+
+
+@app.get("/api/jobs", response_model=List[JobStatus])
+async def list_jobs(limit: int = Query(50, ge=1, le=500, description="Liczba zadań")):
+    """Zwraca najnowsze zadania analizy."""
+    jobs = await asyncio.to_thread(job_manager.store.list_jobs, limit)
+    return [_job_status(job) for job in jobs]
+
+
+@app.get("/api/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """Zwraca stan, postęp i przepustowość zadania."""
+    return _job_status(await _get_job_or_404(job_id))
+
+
+@app.get("/api/jobs/{job_id}/results", response_model=JobResultsResponse)
+async def get_job_results(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="Liczba pominiętych wyników"),
+    limit: int = Query(100, ge=1, le=1000, description="Rozmiar strony"),
+):
+    """
+    Zwraca stronę wyników zadania (według pozycji opinii).
+    Dostępne są wyniki zapisane w checkpointach - także dla zadania w toku.
+    """
+    job = await _get_job_or_404(job_id)
+    results = await asyncio.to_thread(job_manager.store.get_results, job_id, offset=offset, limit=limit)
+    return JobResultsResponse(
+        job_id=job_id,
+        status=job["status"],
+        processed=job["processed"],
+        offset=offset,
+        limit=limit,
+        results=results,
+    )
+
+
+def _stream_file(f: BinaryIO) -> Iterator[bytes]:
+    """Odczytuje otwarty plik porcjami REPORT_STREAM_CHUNK_SIZE i zamyka go po wysłaniu."""
+    try:
+        while True:
+            chunk = f.read(REPORT_STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        f.close()
+
+
+@app.get("/api/report/pdf")
+async def get_report_pdf(
+    request: Request,
+    mode: str = Query(DEFAULT_REPORT_MODE, pattern="^(full|summary|top|sample)$",
+                      description="Tryb: wszystkie opinie, podsumowanie, TOP-N lub próbka warstwowa"),
+    limit: int = Query(DEFAULT_REPORT_LIMIT, ge=1, le=500,
+                       description="Opinii na etykietę (top) lub na etykietę i ocenę (sample)"),
+):
+    """
+    Generuje i zwraca raport końcowy w formacie PDF.
+    Zawiera podsumowanie statystyk oraz listę opinii z analizą sentymentu
+    (wszystkich lub wybranych według trybu raportu).
+    Raport jest renderowany w wątku roboczym raz na wersję danych i opcje,
+    zapisywany w cache na dysku (domyślny - po zmianie danych w tle), a następnie
+    przesyłany strumieniowo porcjami. ETag per wersja danych (304 przy If-None-Match).
+    """
+    snapshot = await _require_snapshot()
+    options = report_options(mode, limit)
+    etag = make_etag(f"{request.url.path}?{json.dumps(options, sort_keys=True)}", snapshot.version)
+    filename = "raport_sentyment.pdf" if mode == "full" else f"raport_sentyment_{mode}.pdf"
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
     try:
-        pdf_bytes = build_report_pdf(cached_df, eda_stats)
+        # Plik otwarty przed odpowiedzią pozostaje czytelny nawet po usunięciu z cache
+        f = await report_cache.open_or_render(snapshot, options)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Błąd podczas generowania raportu PDF: {e}"
         )
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": 'attachment; filename="raport_sentyment.pdf"'
-        },
-    )
+    headers["Content-Length"] = str(os.fstat(f.fileno()).st_size)
+    return StreamingResponse(_stream_file(f), media_type="application/pdf", headers=headers)
+
+
+def _task_status(task: BackgroundTask) -> TaskStatus:
+    """Buduje model stanu zadania w tle."""
+    state = task.to_dict()
+    state["created_at"] = _as_datetime(state["created_at"])
+    state["finished_at"] = _as_datetime(state["finished_at"])
+    return TaskStatus(**state)
+
+
+@app.get("/api/tasks/{task_id}", response_model=TaskStatus)
+async def get_task(task_id: str):
+    """Zwraca stan i postęp zadania w tle (np. przeładowania danych)."""
+    task = task_registry.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail=f"Nie znaleziono zadania: {task_id}")
+    return _task_status(task)
 
 
 # Endpoint do ręcznego przeładowania danych (dla developmentu)
 @app.post("/api/reload")
-async def reload_data():
+async def reload_data(
+    wait: bool = Query(False, description="Czekaj na zakończenie przeładowania"),
+):
     """
-    Endpoint do ręcznego przeładowania danych (tylko dla developmentu).
+    Przeładowuje dane w tle bez przerwy w obsłudze żądań: bieżący snapshot
+    obsługuje odczyty i zapisy do chwili atomowej podmiany. Równoczesne
+    wywołania dołączają do trwającego przeładowania. Zwraca 202 z uchwytem
+    zadania (postęp: GET /api/tasks/{id}); przy wait=true czeka na wynik.
     """
-    success = await load_and_analyze_data()
-    if success:
-        from ..utils.cache import sentiment_cache
-        cache_stats = sentiment_cache.get_stats()
-        return {
-            "status": "success",
-            "message": f"Zaladowano {len(cached_df)} opinii",
-            "cache_stats": cache_stats
-        }
-    else:
+    task, coalesced = task_registry.start_or_join("reload", _reload_dataset)
+    if not wait:
+        return JSONResponse(
+            status_code=202,
+            content={
+                "status": "accepted",
+                "coalesced": coalesced,
+                "task": _task_status(task).model_dump(mode="json"),
+            },
+        )
+
+    await task_registry.wait(task)
+    if task.status == TASK_FAILED:
         raise HTTPException(
             status_code=500, detail="Błąd podczas wczytywania danych")
+    return {
+        "status": "success",
+        "message": f"Zaladowano {task.result['rows']} opinii",
+        "task": _task_status(task),
+        "cache_stats": sentiment_cache.get_stats(),
+        "near_duplicate_stats": near_duplicate_index.get_stats()
+    }
+
+
+def _read_csv_header(path: str) -> List[str]:
+    """Zwraca nazwy kolumn z pierwszego wiersza pliku CSV (pusta lista dla pustego pliku)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
 
 
-if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+async def _save_upload(file: UploadFile) -> str:
+    """
+    Zapisuje przesłany plik porcjami do pliku tymczasowego (zadanie wgrywania
+    działa dłużej niż żądanie, które zamyka UploadFile).
+
+    Raises:
+        HTTPException: 413, jeśli plik przekracza UPLOAD_MAX_BYTES
+    """
+    fd, path = tempfile.mkstemp(prefix="upload_", suffix=".csv")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(1024 * 1024)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if UPLOAD_MAX_BYTES and size > UPLOAD_MAX_BYTES:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Plik jest za duży (limit {UPLOAD_MAX_BYTES} bajtów)"
+                    )
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+async def _ingest_upload(task: BackgroundTask, path: str) -> Dict:
+    """
+    Dołącza opinie z wgranego pliku CSV do danych: plik jest parsowany porcjami
+    UPLOAD_CHUNK_ROWS wierszy, a każda porcja jest czyszczona (jak clean_data),
+    pozbawiana opinii już obecnych w danych, oceniana potokiem batch i dołączana
+    do bieżącego snapshotu (oraz dataset.csv) przez writera.
+    Postęp zadania to liczba przetworzonych bajtów pliku.
+
+    Args:
+        task: Zadanie w tle (etap, postęp i bieżące liczniki w result)
+        path: Ścieżka pliku tymczasowego (usuwanego po zakończeniu)
+
+    Returns:
+        Słownik z licznikami: rows, removed (braki i duplikaty w pliku),
+        duplicates (opinie obecne już w danych), added
+    """
+    counts = {"rows": 0, "removed": 0, "duplicates": 0, "added": 0}
+    task.result = counts
+    # Teksty opinii obecnych w danych (po strip) - uzupełniane przyrostowo o wiersze
+    # dopisane od ostatniej synchronizacji (od pozycji synced_rows)
+    known: set = set()
+    synced_rows = 0
+
+    def sync_known(snapshot: DatasetSnapshot) -> None:
+        nonlocal synced_rows
+        if snapshot.row_count < synced_rows:
+            # Dane przeładowane z mniejszą liczbą wierszy - pełna synchronizacja
+            known.clear()
+            synced_rows = 0
+        known.update(snapshot.df["review_text"].iloc[synced_rows:].astype(str).str.strip().tolist())
+        synced_rows = snapshot.row_count
+
+    async def apply_upload(snapshot: DatasetSnapshot, reviews: List[Dict]) -> DatasetSnapshot:
+        # Ponowne sprawdzenie duplikatów w writerze: w trakcie oceniania porcji
+        # te same opinie mogły zostać dodane innym żądaniem
+        sync_known(snapshot)
+        fresh = [review for review in reviews if review["review_text"] not in known]
+        counts["duplicates"] += len(reviews) - len(fresh)
+        if not fresh:
+            return snapshot
+        known.update(review["review_text"] for review in fresh)
+        counts["added"] += len(fresh)
+        return await _apply_reviews(snapshot, fresh)
+
+    size = os.path.getsize(path)
+    f = open(path, "rb")
+    try:
+        reader = pd.read_csv(f, chunksize=UPLOAD_CHUNK_ROWS, encoding="utf-8",
+                             dtype={"review_text": str})
+        task.update(stage="parsing", processed=0, total=size)
+        while True:
+            chunk = await asyncio.to_thread(next, reader, None)
+            if chunk is None:
+                break
+            counts["rows"] += len(chunk)
+
+            # Klucz duplikatów to tekst bez białych znaków na brzegach (jak w /api/analyze)
+            cleaned = clean_data(chunk)
+            cleaned = (cleaned.assign(review_text=cleaned["review_text"].str.strip())
+                       .drop_duplicates(subset=["review_text"]))
+            counts["removed"] += len(chunk) - len(cleaned)
+            snapshot = await _require_snapshot()
+            sync_known(snapshot)
+            new = cleaned[~cleaned["review_text"].isin(known)]
+            counts["duplicates"] += len(cleaned) - len(new)
+
+            if not new.empty:
+                task.update(stage="scoring")
+                scored = await analyze_batch_async(
+                    new[["review_text"]].copy(), priority=PRIORITY_BULK)
+                ratings = (pd.to_numeric(new["rating"], errors="coerce").fillna(0).astype(int)
+                           if "rating" in new.columns else pd.Series(0, index=new.index))
+                labels = (new["sentiment"].astype("string").str.strip().str.lower()
+                          if "sentiment" in new.columns else pd.Series(pd.NA, index=new.index))
+                reviews = [
+                    {
+                        "review_text": str(text),
+                        "polarity": float(polarity),
+                        "sentiment_label": label,
+                        "rating": int(rating),
+                        "sentiment": reference if pd.notna(reference) and reference else None,
+                    }
+                    for text, polarity, label, rating, reference in zip(
+                        scored["review_text"], scored["polarity"], scored["sentiment_label"],
+                        ratings, labels)
+                ]
+                task.update(stage="merging")
+                await dataset_store.apply(reviews, apply_upload)
+
+            task.update(stage="parsing", processed=min(f.tell(), size))
+    finally:
+        f.close()
+        os.unlink(path)
+
+    task.update(stage="done", processed=size)
+    print(f"Wgrano plik: {counts['added']} nowych opinii z {counts['rows']} wierszy")
+    return counts
+
+
+@app.post("/api/upload", status_code=202)
+async def upload_reviews(
+    file: UploadFile = File(..., description="Plik CSV z kolumną review_text"),
+):
+    """
+    Wgrywa plik CSV z opiniami (multipart/form-data, pole file) i dołącza nowe
+    opinie do danych w tle. Plik jest parsowany, oceniany i dołączany porcjami;
+    opinie obecne już w danych są pomijane. Zwraca 202 z uchwytem zadania
+    (postęp i liczniki: GET /api/tasks/{id}).
+    """
+    await _require_snapshot()
+    path = await _save_upload(file)
+    try:
+        header = await asyncio.to_thread(_read_csv_header, path)
+    except UnicodeDecodeError:
+        header = None
+    if not header or "review_text" not in header:
+        os.unlink(path)
+        raise HTTPException(
+            status_code=400,
+            detail="Plik musi być plikiem CSV (UTF-8) z kolumną review_text"
+        )
+
+    task = task_registry.start("upload", lambda task: _ingest_upload(task, path))
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": "accepted",
+            "filename": file.filename,
+            "task": _task_status(task).model_dump(mode="json"),
+        },
+    )
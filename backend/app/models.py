@@ -2,7 +2,8 @@
 Modele Pydantic dla API - definicje danych wejściowych i wyjściowych.
 """
 
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -20,12 +21,23 @@ class SentimentResponse(BaseModel):
     sentiment_label: str = Field(...,
                                  description="Etykieta sentymentu: 'positive' lub 'negative'")
     word_count: int = Field(..., description="Liczba słów w opinii")
+    near_duplicate: bool = Field(
+        False, description="Wynik ponownie użyty z niemal identycznej, już ocenionej opinii")
+    similarity: Optional[float] = Field(
+        None, description="Szacowane podobieństwo do tej opinii (gdy near_duplicate)")
+
+
+class BatchSentimentItem(SentimentResponse):
+    """Pojedyncza linia odpowiedzi NDJSON z /api/analyze/batch."""
+    index: int = Field(..., description="Pozycja opinii w przesłanej liście")
 
 
 class WordCount(BaseModel):
     """Model pojedynczego słowa z liczbą wystąpień."""
     word: str = Field(..., description="Słowo")
     count: int = Field(..., description="Liczba wystąpień")
+    error: Optional[int] = Field(
+        None, description="Maksymalne zawyżenie liczby wystąpień (tylko tryb przybliżony)")
 
 
 class StatisticsResponse(BaseModel):
@@ -56,6 +68,12 @@ class TopWordsResponse(BaseModel):
                                    description="Lista najczęściej występujących słów")
     total_words_analyzed: int = Field(...,
                                       description="Całkowita liczba przeanalizowanych słów")
+    approximate: bool = Field(
+        False, description="Czy wynik pochodzi ze szkicu przybliżonego (Space-Saving)")
+    error_bound: Optional[int] = Field(
+        None, description="Globalne ograniczenie błędu liczników (tryb przybliżony)")
+    memory_budget: Optional[int] = Field(
+        None, description="Maksymalna liczba śledzonych słów (tryb przybliżony)")
 
 
 class ReviewItem(BaseModel):
@@ -74,10 +92,178 @@ class ReviewItem(BaseModel):
 
 
 class ReviewsListResponse(BaseModel):
-    """Lista wszystkich opinii z analizą."""
-    reviews: List[ReviewItem] = Field(..., description="Lista opinii")
+    """Strona listy opinii z analizą."""
+    reviews: List[ReviewItem] = Field(..., description="Lista opinii (bieżąca strona)")
+    total: int = Field(0, description="Liczba opinii spełniających filtry")
+    offset: int = Field(0, description="Liczba pominiętych opinii")
+    limit: int = Field(0, description="Rozmiar strony")
 
 
 class HealthResponse(BaseModel):
     """Model odpowiedzi dla health check."""
     status: str = Field(default="ok", description="Status serwera")
+
+
+class SearchResponse(BaseModel):
+    """Wynik wyszukiwania pełnotekstowego w opiniach."""
+    query: str = Field(..., description="Zapytanie wyszukiwania")
+    total: int = Field(...,
+                       description="Liczba opinii spełniających zapytanie i filtry")
+    results: List[ReviewItem] = Field(...,
+                                      description="Znalezione opinie (maks. limit)")
+
+
+class TrendBucket(BaseModel):
+    """Zagregowane statystyki sentymentu w jednym przedziale czasowym."""
+    bucket_start: datetime = Field(...,
+                                   description="Początek przedziału (UTC)")
+    count: int = Field(..., description="Liczba opinii w przedziale")
+    positive_count: int = Field(..., description="Liczba opinii pozytywnych")
+    negative_count: int = Field(..., description="Liczba opinii negatywnych")
+    polarity_sum: float = Field(..., description="Suma polaryzacji")
+    average_polarity: float = Field(...,
+                                    description="Średnia polaryzacja w przedziale")
+
+
+class TrendsResponse(BaseModel):
+    """Seria czasowa sentymentu w wybranej granulacji."""
+    granularity: str = Field(...,
+                             description="Granulacja: minute, hour lub day")
+    buckets: List[TrendBucket] = Field(...,
+                                       description="Przedziały w kolejności chronologicznej")
+    untimestamped_reviews: int = Field(...,
+                                       description="Liczba opinii bez znacznika czasu (pominięte)")
+
+
+class HistogramBin(BaseModel):
+    """Pojedynczy przedział histogramu polaryzacji."""
+    start: float = Field(..., description="Dolna granica przedziału")
+    end: float = Field(..., description="Górna granica przedziału")
+    count: int = Field(..., description="Liczba opinii w przedziale")
+
+
+class PolarityDistributionResponse(BaseModel):
+    """Rozkład polaryzacji: kwantyle ze szkicu KLL i histogram."""
+    count: int = Field(..., description="Liczba opinii w szkicu")
+    min_polarity: Optional[float] = Field(None, description="Minimalna polaryzacja")
+    max_polarity: Optional[float] = Field(None, description="Maksymalna polaryzacja")
+    p50: Optional[float] = Field(None, description="Mediana polaryzacji (przybliżona)")
+    p90: Optional[float] = Field(None, description="90. percentyl polaryzacji (przybliżony)")
+    p99: Optional[float] = Field(None, description="99. percentyl polaryzacji (przybliżony)")
+    bins: List[HistogramBin] = Field(..., description="Histogram o stałych przedziałach")
+    sketch: Optional[Dict[str, Any]] = Field(
+        None, description="Zserializowany szkic KLL i histogram (do łączenia między workerami)")
+
+
+class PhraseCount(BaseModel):
+    """Fraza (n-gram) z liczbą wystąpień i miarą kolokacji."""
+    phrase: str = Field(..., description="Fraza (tokeny oddzielone spacją)")
+    count: int = Field(..., description="Liczba wystąpień")
+    pmi: float = Field(..., description="Pointwise Mutual Information frazy")
+
+
+class PhrasesResponse(BaseModel):
+    """Lista TOP fraz."""
+    n: int = Field(..., description="Długość frazy (2 lub 3)")
+    sentiment: Optional[str] = Field(
+        None, description="Etykieta sentymentu (None = wszystkie opinie)")
+    phrases: List[PhraseCount] = Field(..., description="Najczęstsze frazy")
+
+
+class GroupStats(BaseModel):
+    """Statystyki jednej grupy opinii."""
+    key: str = Field(..., description="Wartość klucza grupowania ('brak' = brak wartości)")
+    count: int = Field(..., description="Liczba opinii w grupie")
+    percentage: float = Field(..., description="Udział grupy we wszystkich opiniach (%)")
+    average_polarity: float = Field(..., description="Średnia polaryzacja w grupie")
+    positive_count: int = Field(..., description="Liczba opinii ocenionych jako pozytywne")
+    negative_count: int = Field(..., description="Liczba opinii ocenionych jako negatywne")
+    agreement_rate: Optional[float] = Field(
+        None, description="Zgodność z etykietą referencyjną (%, None = brak etykiet w grupie)")
+
+
+class ConfusionMatrix(BaseModel):
+    """Macierz pomyłek: etykieta referencyjna (wiersze) vs przewidziana (kolumny)."""
+    labels: List[str] = Field(..., description="Kolejność etykiet wierszy i kolumn")
+    matrix: List[List[int]] = Field(..., description="Liczba opinii [referencyjna][przewidziana]")
+    labelled: int = Field(..., description="Liczba opinii z etykietą referencyjną")
+    unlabelled: int = Field(..., description="Liczba opinii bez etykiety referencyjnej")
+    agreement_rate: Optional[float] = Field(
+        None, description="Odsetek zgodnych etykiet (%)")
+    precision: Dict[str, Optional[float]] = Field(..., description="Precyzja per etykieta (%)")
+    recall: Dict[str, Optional[float]] = Field(..., description="Czułość per etykieta (%)")
+
+
+class GroupedStatsResponse(BaseModel):
+    """Statystyki grupowane z macierzą pomyłek."""
+    by: str = Field(..., description="Klucz grupowania: rating, sentiment lub label")
+    total_reviews: int = Field(..., description="Całkowita liczba opinii")
+    groups: List[GroupStats] = Field(..., description="Statystyki grup")
+    confusion_matrix: Optional[ConfusionMatrix] = Field(
+        None, description="Macierz pomyłek (None = dataset bez etykiet referencyjnych)")
+
+
+class JobSubmitRequest(BaseModel):
+    """Zgłoszenie zadania analizy w tle."""
+    source: Literal["texts", "dataset"] = Field(
+        "texts", description="'texts' - przesłane teksty, 'dataset' - ponowna ocena całego datasetu")
+    texts: Optional[List[str]] = Field(
+        None, description="Teksty opinii (wymagane dla source='texts')")
+    use_cache: bool = Field(
+        True, description="Czy korzystać z cache wyników (false wymusza ponowną ocenę modelem)")
+
+
+class JobStatus(BaseModel):
+    """Stan zadania analizy."""
+    id: str = Field(..., description="Identyfikator zadania")
+    status: str = Field(..., description="queued, running, completed lub failed")
+    source: str = Field(..., description="Źródło tekstów zadania")
+    total: int = Field(..., description="Liczba opinii w zadaniu")
+    processed: int = Field(..., description="Liczba ocenionych opinii (zapisanych w checkpointach)")
+    failed: int = Field(..., description="Liczba opinii, których nie udało się ocenić")
+    progress: float = Field(..., description="Postęp w procentach")
+    throughput: Optional[float] = Field(
+        None, description="Przepustowość ostatniego przebiegu (opinie/s)")
+    eta_seconds: Optional[float] = Field(
+        None, description="Szacowany czas do końca (s)")
+    created_at: datetime = Field(..., description="Czas zgłoszenia zadania")
+    started_at: Optional[datetime] = Field(None, description="Czas rozpoczęcia wykonywania")
+    finished_at: Optional[datetime] = Field(None, description="Czas zakończenia")
+    error: Optional[str] = Field(None, description="Opis błędu (status failed)")
+
+
+class JobResultItem(BaseModel):
+    """Wynik oceny jednej opinii w zadaniu."""
+    position: int = Field(..., description="Pozycja opinii w zadaniu (dla 'dataset' - indeks w danych)")
+    review_text: str = Field(..., description="Tekst opinii")
+    status: str = Field(..., description="done lub error")
+    polarity: Optional[float] = Field(None, description="Polaryzacja sentymentu (-1 do 1)")
+    sentiment_label: Optional[str] = Field(None, description="Etykieta sentymentu")
+    error: Optional[str] = Field(None, description="Opis błędu oceny")
+
+
+class JobResultsResponse(BaseModel):
+    """Strona wyników zadania."""
+    job_id: str = Field(..., description="Identyfikator zadania")
+    status: str = Field(..., description="Stan zadania")
+    processed: int = Field(..., description="Liczba dostępnych wyników")
+    offset: int = Field(..., description="Liczba pominiętych wyników")
+    limit: int = Field(..., description="Rozmiar strony")
+    results: List[JobResultItem] = Field(..., description="Wyniki (według pozycji)")
+
+
+class TaskStatus(BaseModel):
+    """Stan zadania w tle wykonywanego w procesie (np. przeładowania danych)."""
+    id: str = Field(..., description="Identyfikator zadania")
+    kind: str = Field(..., description="Rodzaj zadania (np. 'reload')")
+    status: str = Field(..., description="running, completed lub failed")
+    stage: str = Field(..., description="Bieżący etap (np. loading, scoring, indexing, swapping)")
+    processed: int = Field(..., description="Liczba przetworzonych elementów etapu")
+    total: int = Field(..., description="Liczba wszystkich elementów etapu")
+    progress: float = Field(..., description="Postęp bieżącego etapu w procentach")
+    coalesced: int = Field(
+        ..., description="Liczba zgłoszeń dołączonych do tego zadania zamiast nowego uruchomienia")
+    created_at: datetime = Field(..., description="Czas uruchomienia zadania")
+    finished_at: Optional[datetime] = Field(None, description="Czas zakończenia")
+    error: Optional[str] = Field(None, description="Opis błędu (status failed)")
+    result: Optional[Dict[str, Any]] = Field(None, description="Wynik zadania")
@@ -1,12 +1,21 @@
 """
 Generowanie raportu PDF z analizy sentymentu opinii.
 Wykorzystuje ReportLab do budowy dokumentu: nagłówek, podsumowanie, lista opinii.
+Tryby raportu ograniczają listę opinii (samo podsumowanie, TOP-N według polaryzacji,
+próbka warstwowa), więc koszt zależy od szczegółowości, a nie od wielkości datasetu.
+Lista opinii jest dzielona na tabele o rozmiarze strony - koszt układu rośnie
+liniowo z liczbą opinii (jedna wielka tabela jest dzielona wielokrotnie).
+ReportLab trzyma wszystkie elementy dokumentu w pamięci do końca budowy, więc
+sekcja listy obejmuje najwyżej REPORT_MAX_ROWS opinii (nagłówek sekcji podaje,
+ile z ilu opinii wyświetlono) - pamięć renderowania nie rośnie z wielkością datasetu.
 """
 
 from datetime import datetime
 from io import BytesIO
-from typing import Any, Dict
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple, Union
 
+import numpy as np
 import pandas as pd
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
@@ -15,9 +24,20 @@ from reportlab.lib.units import cm
 from reportlab.platypus import (Paragraph, SimpleDocTemplate, Spacer, Table,
                                 TableStyle)
 
+from ..config import REPORT_MAX_ROWS, REPORT_TABLE_CHUNK_ROWS
+
 # Maksymalna długość fragmentu opinii w tabeli (znaki)
 MAX_REVIEW_SNIPPET_LEN = 400
 
+# Tryby raportu: wszystkie opinie, samo podsumowanie, TOP-N najbardziej
+# pozytywnych i negatywnych, próbka warstwowa per etykieta i ocena
+REPORT_MODES = ("full", "summary", "top", "sample")
+DEFAULT_REPORT_MODE = "full"
+DEFAULT_REPORT_LIMIT = 20
+
+# Ziarno losowania próbki - ta sama wersja danych daje ten sam raport (cache)
+SAMPLE_SEED = 42
+
 
 def _truncate_text(text: str, max_len: int = MAX_REVIEW_SNIPPET_LEN) -> str:
     """Skraca tekst do max_len znaków; dodaje '...' jeśli obcięty."""
@@ -29,20 +49,150 @@ def _truncate_text(text: str, max_len: int = MAX_REVIEW_SNIPPET_LEN) -> str:
     return text[: max_len - 3].rstrip() + "..."
 
 
-def build_report_pdf(df: pd.DataFrame, eda_stats: Dict[str, Any]) -> bytes:
+# Nagłówek i styl tabel z listą opinii (wspólne dla wszystkich fragmentów)
+REVIEW_TABLE_HEADER = ["Lp.", "Opinia (fragment)", "Polaryzacja", "Sentyment", "Słowa"]
+REVIEW_TABLE_COL_WIDTHS = [1.2 * cm, None, 2.2 * cm, 2.2 * cm, 1.2 * cm]
+REVIEW_TABLE_STYLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+        ("ALIGN", (0, 0), (0, -1), "CENTER"),
+        ("ALIGN", (2, 0), (2, -1), "CENTER"),
+        ("ALIGN", (3, 0), (3, -1), "CENTER"),
+        ("ALIGN", (4, 0), (4, -1), "CENTER"),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.lightgrey),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1),
+         [colors.white, colors.lightgrey]),
+    ]
+)
+
+
+def _review_rows(df: pd.DataFrame) -> Iterator[List[str]]:
+    """Zwraca wiersze tabeli opinii (itertuples na potrzebnych kolumnach)."""
+    has_words = "word_count" in df.columns
+    columns = ["review_text", "polarity", "sentiment_label"] + (["word_count"] if has_words else [])
+    for lp, row in enumerate(df[columns].itertuples(index=False, name=None), start=1):
+        words = row[3] if has_words else ""
+        yield [str(lp), _truncate_text(row[0]), f"{float(row[1]):.4f}", str(row[2]), str(words)]
+
+
+def _review_tables(df: pd.DataFrame, chunk_rows: int = REPORT_TABLE_CHUNK_ROWS) -> Iterator[Table]:
+    """Dzieli listę opinii na tabele po chunk_rows wierszy (każda z nagłówkiem)."""
+    chunk: List[List[str]] = []
+    for row in _review_rows(df):
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            yield _review_table(chunk)
+            chunk = []
+    if chunk:
+        yield _review_table(chunk)
+
+
+def _review_table(rows: List[List[str]]) -> Table:
+    """Buduje jedną tabelę fragmentu listy opinii."""
+    table = Table([REVIEW_TABLE_HEADER] + rows, colWidths=REVIEW_TABLE_COL_WIDTHS, repeatRows=1)
+    table.setStyle(REVIEW_TABLE_STYLE)
+    return table
+
+
+def report_options(mode: str = DEFAULT_REPORT_MODE, limit: int = DEFAULT_REPORT_LIMIT) -> Dict[str, Any]:
+    """
+    Zwraca znormalizowane opcje raportu (klucz cache): limit tylko dla trybów, które go używają.
+
+    Args:
+        mode: Tryb raportu (zob. REPORT_MODES)
+        limit: Liczba opinii w trybie top (na etykietę) lub sample (na warstwę)
+
+    Raises:
+        ValueError: Nieznany tryb raportu
+    """
+    if mode not in REPORT_MODES:
+        raise ValueError(f"Nieznany tryb raportu: {mode}")
+    if mode in ("top", "sample"):
+        return {"mode": mode, "limit": limit}
+    return {"mode": mode}
+
+
+def _report_sections(df: pd.DataFrame, mode: str, limit: int) -> List[Tuple[str, pd.DataFrame]]:
+    """
+    Wybiera opinie do listy w raporcie (tytuł sekcji, wiersze).
+    Top-N korzysta z nlargest/nsmallest (bez pełnego sortowania); próbka warstwowa
+    bierze pierwsze limit opinii każdej warstwy po jednej losowej permutacji
+    pozycji - permutowane są tylko kolumny warstw, a pełne wiersze pobierane
+    wyłącznie dla wylosowanych opinii.
+    """
+    if mode == "summary":
+        return []
+    if mode == "top":
+        return [
+            (f"Najbardziej pozytywne opinie (TOP {limit})", df.nlargest(limit, "polarity")),
+            (f"Najbardziej negatywne opinie (TOP {limit})", df.nsmallest(limit, "polarity")),
+        ]
+    if mode == "sample":
+        keys = ["sentiment_label"] + (["rating"] if "rating" in df.columns else [])
+        strata = df[keys].reset_index(drop=True)
+        positions = np.random.default_rng(SAMPLE_SEED).permutation(len(df))
+        chosen = strata.iloc[positions].groupby(keys, sort=False, dropna=False).head(limit).index
+        sample = df.iloc[chosen.to_numpy()]
+        sizes = strata.groupby(keys, dropna=False).size()
+        sections = []
+        for key, rows in sample.groupby(keys, sort=True, dropna=False):
+            key = key if isinstance(key, tuple) else (key,)
+            title = f"Etykieta: {key[0]}" + (f", ocena: {key[1]}" if len(key) > 1 else "")
+            sections.append((f"{title} ({len(rows)} z {sizes.loc[key]} opinii)", rows))
+        return sections
+    return [("Lista opinii i wyniki analizy", df)]
+
+
+def build_report_pdf(df: pd.DataFrame, eda_stats: Dict[str, Any], **options: Any) -> bytes:
     """
-    Buduje raport PDF zawierający podsumowanie i wszystkie opinie z analizą.
+    Buduje raport PDF w pamięci (zob. write_report_pdf).
 
     Args:
         df: DataFrame z kolumnami review_text, polarity, sentiment_label, word_count (opcjonalnie review_length).
         eda_stats: Słownik ze statystykami EDA (total_reviews, positive_count, negative_count, itd.).
+        **options: Opcje raportu (mode, limit).
 
     Returns:
         bytes: Zawartość pliku PDF.
     """
     buffer = BytesIO()
+    write_report_pdf(df, eda_stats, buffer, **options)
+    return buffer.getvalue()
+
+
+def write_report_pdf(
+    df: pd.DataFrame,
+    eda_stats: Dict[str, Any],
+    output: Union[str, Path, BinaryIO],
+    mode: str = DEFAULT_REPORT_MODE,
+    limit: int = DEFAULT_REPORT_LIMIT,
+    max_rows: int = REPORT_MAX_ROWS,
+) -> None:
+    """
+    Zapisuje raport PDF zawierający podsumowanie i opinie z analizą.
+    Funkcja blokująca (CPU) - w API wywoływana w wątku roboczym.
+
+    Args:
+        df: DataFrame z kolumnami review_text, polarity, sentiment_label, word_count (opcjonalnie review_length).
+        eda_stats: Słownik ze statystykami EDA (total_reviews, positive_count, negative_count, itd.).
+        output: Ścieżka pliku lub plik binarny otwarty do zapisu.
+        mode: Tryb raportu: full (wszystkie opinie), summary (samo podsumowanie),
+            top (limit najbardziej pozytywnych i negatywnych), sample (do limit opinii
+            na etykietę i ocenę).
+        limit: Liczba opinii w trybie top (na etykietę) lub sample (na warstwę).
+        max_rows: Maksymalna liczba opinii w jednej sekcji listy (także w trybie
+            full); sekcja z większą liczbą opinii zaczyna się od adnotacji
+            "Wyświetlono N z M opinii".
+
+    Raises:
+        ValueError: Nieznany tryb raportu
+    """
+    report_options(mode, limit)
     doc = SimpleDocTemplate(
-        buffer,
+        str(output) if isinstance(output, Path) else output,
         pagesize=A4,
         rightMargin=1.5 * cm,
         leftMargin=1.5 * cm,
@@ -115,15 +265,9 @@ def build_report_pdf(df: pd.DataFrame, eda_stats: Dict[str, Any]) -> bytes:
     story.append(Spacer(1, 0.8 * cm))
 
     # --- Lista opinii i analiza ---
-    story.append(Paragraph("Lista opinii i wyniki analizy", heading_style))
-
-    # Nagłówki tabeli
-    table_header = ["Lp.", "Opinia (fragment)",
-                    "Polaryzacja", "Sentyment", "Słowa"]
-    table_data = [table_header]
-
     required_cols = ["review_text", "polarity", "sentiment_label"]
-    if not all(c in df.columns for c in required_cols):
+    if mode != "summary" and not all(c in df.columns for c in required_cols):
+        story.append(Paragraph("Lista opinii i wyniki analizy", heading_style))
         story.append(
             Paragraph(
                 "Brak wymaganych kolumn w danych (review_text, polarity, sentiment_label).",
@@ -131,39 +275,18 @@ def build_report_pdf(df: pd.DataFrame, eda_stats: Dict[str, Any]) -> bytes:
             )
         )
     else:
-        word_col = "word_count" if "word_count" in df.columns else None
-        for idx, row in df.iterrows():
-            lp = len(table_data)
-            text = _truncate_text(row["review_text"])
-            polarity = row["polarity"]
-            label = row["sentiment_label"]
-            words = row[word_col] if word_col is not None else ""
-            table_data.append(
-                [str(lp), text, f"{float(polarity):.4f}",
-                 str(label), str(words)]
-            )
-
-        col_widths = [1.2 * cm, None, 2.2 * cm, 2.2 * cm, 1.2 * cm]
-        t = Table(table_data, colWidths=col_widths, repeatRows=1)
-        t.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (0, -1), "CENTER"),
-                    ("ALIGN", (2, 0), (2, -1), "CENTER"),
-                    ("ALIGN", (3, 0), (3, -1), "CENTER"),
-                    ("ALIGN", (4, 0), (4, -1), "CENTER"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 9),
-                    ("GRID", (0, 0), (-1, -1), 0.25, colors.lightgrey),
-                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                    ("ROWBACKGROUNDS", (0, 1), (-1, -1),
-                     [colors.white, colors.lightgrey]),
-                ]
-            )
-        )
-        story.append(t)
+        for title, rows in _report_sections(df, mode, limit):
+            story.append(Paragraph(title, heading_style))
+            if len(rows) > max_rows:
+                # Informacja przed tabelą - przy limicie sekcji notka za nią
+                # wypadałaby dziesiątki stron dalej
+                story.append(
+                    Paragraph(
+                        f"Wyświetlono {max_rows} z {len(rows)} opinii (limit {max_rows} na sekcję). "
+                        "Pełne dane są dostępne w eksporcie (/api/export).",
+                        normal_style,
+                    )
+                )
+            story.extend(_review_tables(rows.iloc[:max_rows]))
 
     doc.build(story)
-    buffer.seek(0)
-    return buffer.getvalue()
@@ -0,0 +1,258 @@
+"""
+Cache wyrenderowanych raportów PDF na dysku.
+Plik raportu jest identyfikowany wersją danych i opcjami raportu; po zmianie
+danych w tle (z opóźnieniem liczonym od ostatniej zmiany) renderowane są
+warianty raportu pobrane w ostatnim oknie REPORT_PRERENDER_WINDOW_SECONDS,
+więc pobranie zwykle serwuje gotowy plik, a nieużywane warianty nie kosztują nic.
+Pobrania są zapisywane jako pliki requested-*.json w katalogu cache - widzi je
+także lider w trybie wielu workerów.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Set, Union
+
+from ..config import (REPORT_CACHE_DIR, REPORT_CACHE_MAX_FILES,
+                      REPORT_PRERENDER_DEBOUNCE_SECONDS, REPORT_PRERENDER_WINDOW_SECONDS)
+from ..data.shared import shared_dataset
+from ..data.snapshot import DatasetSnapshot
+from ..utils.response_cache import BOOT_ID
+from .pdf_report import write_report_pdf
+
+
+def get_report_cache_dir(directory: Optional[Union[str, Path]] = None) -> Path:
+    """Zwraca katalog cache raportów (domyślnie obok dataset.csv)."""
+    if directory is not None:
+        return Path(directory)
+    if REPORT_CACHE_DIR:
+        return Path(REPORT_CACHE_DIR)
+    base_dir = Path(__file__).parent.parent.parent
+    return base_dir / "data" / "reports"
+
+
+class ReportCache:
+    """
+    Raporty PDF zapisane na dysku, po jednym pliku na wersję danych i zestaw opcji.
+    Równoczesne żądania tego samego raportu czekają na jedno renderowanie;
+    najstarsze pliki są usuwane powyżej max_files.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        max_files: int = REPORT_CACHE_MAX_FILES,
+        debounce: float = REPORT_PRERENDER_DEBOUNCE_SECONDS,
+        prerender_window: float = REPORT_PRERENDER_WINDOW_SECONDS,
+    ):
+        """
+        Inicjalizuje cache (katalog jest tworzony przy pierwszym renderowaniu).
+
+        Args:
+            directory: Katalog plików raportów (None = z konfiguracji)
+            max_files: Maksymalna liczba przechowywanych raportów
+            debounce: Opóźnienie renderowania w tle od ostatniej zmiany danych (s, 0 = wyłączone)
+            prerender_window: Okno (s), w którym wariant musiał być pobrany,
+                aby był renderowany w tle
+        """
+        self.directory = get_report_cache_dir(directory)
+        self.max_files = max_files
+        self.debounce = debounce
+        self.prerender_window = prerender_window
+        # Wersje datasetu liczone są od zera po restarcie procesu - pliki odróżnia
+        # identyfikator uruchomienia; w trybie wielu workerów jest on wspólny
+        # dla procesów (wersja to generacja współdzielonego snapshotu)
+        self.namespace = BOOT_ID
+        self._rendering: Dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._pending: Optional[DatasetSnapshot] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {"hits": 0, "misses": 0, "renders": 0, "prerenders": 0, "errors": 0}
+
+    def path_for(self, version: int, options: Dict[str, Any]) -> Path:
+        """
+        Zwraca ścieżkę pliku raportu dla wersji danych i opcji.
+
+        Args:
+            version: Wersja snapshotu danych
+            options: Opcje raportu (przekazywane do write_report_pdf)
+        """
+        return self.directory / f"report-{self.namespace}-{version}-{_options_digest(options)}.pdf"
+
+    async def open_or_render(self, snapshot: DatasetSnapshot, options: Dict[str, Any]) -> BinaryIO:
+        """
+        Otwiera plik raportu dla snapshotu, renderując go w wątku roboczym przy braku w cache.
+        Plik jest otwierany bez wcześniejszego sprawdzania istnienia - równoległe
+        czyszczenie cache (także w innym procesie) może go usunąć w dowolnej chwili,
+        a otwarty plik pozostaje czytelny po usunięciu.
+
+        Args:
+            snapshot: Snapshot danych raportu
+            options: Opcje raportu
+
+        Returns:
+            Plik PDF otwarty do odczytu binarnego (zamyka go wywołujący)
+        """
+        path = self.path_for(snapshot.version, options)
+        f = await asyncio.to_thread(self._open_cached, path, options)
+        if f is not None:
+            self.stats["hits"] += 1
+            return f
+        self.stats["misses"] += 1
+        await self._render(snapshot, options, path)
+        return await asyncio.to_thread(open, path, "rb")
+
+    def _open_cached(self, path: Path, options: Dict[str, Any]) -> Optional[BinaryIO]:
+        """
+        Zapisuje pobranie wariantu i otwiera plik z cache (wywoływane w wątku -
+        operacje na plikach nie blokują pętli zdarzeń).
+
+        Returns:
+            Otwarty plik albo None, jeśli raportu nie ma w cache
+        """
+        self._record_request(options)
+        try:
+            return open(path, "rb")
+        except FileNotFoundError:
+            return None
+
+    async def _render(self, snapshot: DatasetSnapshot, options: Dict[str, Any], path: Path) -> Path:
+        """Renderuje raport do pliku (równoczesne renderowania tego samego pliku są łączone)."""
+        key = path.name
+        future = self._rendering.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._rendering[key] = future
+        try:
+            await asyncio.to_thread(self._write, snapshot, options, path)
+        except Exception as e:
+            self.stats["errors"] += 1
+            future.set_exception(e)
+            # Wyjątek trafia do wywołującego; oczekujący odbierają go z future
+            future.exception()
+            raise
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        else:
+            self.stats["renders"] += 1
+            future.set_result(path)
+            return path
+        finally:
+            self._rendering.pop(key, None)
+
+    def _write(self, snapshot: DatasetSnapshot, options: Dict[str, Any], path: Path) -> None:
+        """Zapisuje raport do pliku tymczasowego i atomowo podmienia plik docelowy."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                write_report_pdf(snapshot.df, snapshot.eda_stats, f, **options)
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        self._prune(keep=path)
+
+    def _prune(self, keep: Path) -> None:
+        """Usuwa najstarsze raporty powyżej max_files (otwarte pliki pozostają czytelne)."""
+        files = []
+        for path in self.directory.glob("report-*.pdf"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                # Usunięty przez równoległe czyszczenie (inny proces lub renderowanie)
+                continue
+        files.sort(reverse=True)
+        for _, old_path in files[self.max_files:]:
+            if old_path != keep:
+                old_path.unlink(missing_ok=True)
+
+    def _record_request(self, options: Dict[str, Any]) -> None:
+        """Zapisuje (lub odświeża czas) pobrania wariantu raportu."""
+        path = self.directory / f"requested-{_options_digest(options)}.json"
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(options, sort_keys=True), encoding="utf-8")
+
+    def _recent_requests(self) -> List[Dict[str, Any]]:
+        """Zwraca opcje wariantów pobranych w oknie prerender_window (starsze wpisy usuwa)."""
+        now = time.time()
+        recent = []
+        for path in self.directory.glob("requested-*.json"):
+            try:
+                if now - path.stat().st_mtime > self.prerender_window:
+                    path.unlink(missing_ok=True)
+                    continue
+                recent.append(json.loads(path.read_text(encoding="utf-8")))
+            except (FileNotFoundError, ValueError):
+                # Wpis usunięty lub zapisywany równolegle przez inny proces
+                continue
+        return recent
+
+    def schedule_prerender(self, snapshot: DatasetSnapshot) -> None:
+        """
+        Planuje renderowanie ostatnio pobieranych raportów dla snapshotu po debounce sekundach;
+        kolejna zmiana danych w tym czasie przesuwa termin (obserwator dataset_store).
+        W trybie wielu workerów raport w tle renderuje tylko lider.
+        """
+        if self.debounce <= 0:
+            return
+        if shared_dataset is not None and not shared_dataset.is_leader:
+            return
+        self._pending = snapshot
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(self.debounce, self._start_prerender)
+
+    def _start_prerender(self) -> None:
+        """Uruchamia renderowanie w tle ostatniego zaplanowanego snapshotu."""
+        self._timer = None
+        snapshot, self._pending = self._pending, None
+        if snapshot is None:
+            return
+        task = asyncio.ensure_future(self._prerender(snapshot))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _prerender(self, snapshot: DatasetSnapshot) -> None:
+        """
+        Renderuje kolejno warianty raportu pobrane w oknie prerender_window
+        (bez pobrań - nic; błędy są tylko logowane).
+        """
+        for options in await asyncio.to_thread(self._recent_requests):
+            path = self.path_for(snapshot.version, options)
+            if path.exists():
+                continue
+            try:
+                await self._render(snapshot, options, path)
+                self.stats["prerenders"] += 1
+            except Exception as e:
+                print(f"Błąd renderowania raportu PDF w tle: {e}")
+
+    def get_stats(self) -> Dict:
+        """Zwraca statystyki cache raportów."""
+        return {
+            **self.stats,
+            "rendering": len(self._rendering),
+            "prerender_scheduled": self._timer is not None,
+            "debounce_seconds": self.debounce,
+            "prerender_window_seconds": self.prerender_window,
+            "max_files": self.max_files,
+        }
+
+
+def _options_digest(options: Dict[str, Any]) -> str:
+    """Skrót opcji raportu (część nazwy pliku)."""
+    return hashlib.md5(json.dumps(options, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+# Globalna instancja cache raportów PDF
+report_cache = ReportCache()
@@ -0,0 +1,208 @@
+"""
+Kontrola przyjmowania żądań analizy (admission control).
+Ogranicza liczbę równoległych analiz i długość kolejki oczekujących oraz
+stosuje limity per klient (token bucket), aby przy przeciążeniu żądania
+były odrzucane szybko (z Retry-After) zamiast czekać do timeoutu klienta.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from ..config import (ADMISSION_BURST, ADMISSION_MAX_CLIENTS,
+                      ADMISSION_MAX_IN_FLIGHT, ADMISSION_QUEUE_SIZE,
+                      ADMISSION_QUEUE_TIMEOUT, ADMISSION_RATE_PER_SECOND)
+
+
+class AdmissionRejected(Exception):
+    """Żądanie nie zostało przyjęte do analizy (przeciążenie)."""
+
+    def __init__(self, reason: str, retry_after: int):
+        """
+        Args:
+            reason: Powód odrzucenia ('queue_full' lub 'queue_timeout')
+            retry_after: Sugerowany czas do ponowienia (sekundy)
+        """
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token bucket: średnio rate żądań na sekundę, chwilowo do burst."""
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Args:
+            rate: Liczba tokenów odnawianych na sekundę
+            burst: Pojemność kubełka
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """
+        Pobiera jeden token.
+
+        Returns:
+            0, jeśli token pobrano; w przeciwnym razie liczba sekund do jego odnowienia
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """
+    Ograniczona kolejka przyjmowania analiz z limitami per klient.
+    Co najwyżej max_in_flight analiz jest wykonywanych naraz, a co najwyżej
+    queue_size czeka na miejsce (nie dłużej niż queue_timeout sekund).
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = ADMISSION_MAX_IN_FLIGHT,
+        queue_size: int = ADMISSION_QUEUE_SIZE,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+        rate_per_second: float = ADMISSION_RATE_PER_SECOND,
+        burst: int = ADMISSION_BURST,
+        max_clients: int = ADMISSION_MAX_CLIENTS,
+    ):
+        """
+        Inicjalizuje kontroler.
+
+        Args:
+            max_in_flight: Maksymalna liczba równolegle wykonywanych analiz
+            queue_size: Maksymalna liczba żądań czekających na miejsce
+            queue_timeout: Maksymalny czas oczekiwania w kolejce (sekundy)
+            rate_per_second: Limit żądań na sekundę per klient (0 = bez limitu)
+            burst: Chwilowy limit żądań per klient
+            max_clients: Liczba śledzonych klientów (najdawniej aktywni są usuwani)
+        """
+        self.max_in_flight = max_in_flight
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_clients = max_clients
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self.buckets: OrderedDict = OrderedDict()
+        self.in_flight = 0
+        self.waiting = 0
+        # Średni czas obsługi (EWMA) - podstawa szacowania Retry-After
+        self.service_time = 1.0
+        self.stats = {
+            "admitted": 0,
+            "rate_limited": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+            "degraded": 0,
+        }
+
+    def check_rate(self, client: str) -> Optional[int]:
+        """
+        Sprawdza limit żądań klienta i pobiera token.
+
+        Args:
+            client: Identyfikator klienta (np. adres IP)
+
+        Returns:
+            None, jeśli limit nie został przekroczony; w przeciwnym razie Retry-After (sekundy)
+        """
+        if self.rate_per_second <= 0:
+            return None
+        bucket = self.buckets.get(client)
+        if bucket is None:
+            bucket = TokenBucket(self.rate_per_second, self.burst)
+            self.buckets[client] = bucket
+            if len(self.buckets) > self.max_clients:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(client)
+
+        wait = bucket.try_acquire()
+        if wait == 0:
+            return None
+        self.stats["rate_limited"] += 1
+        return max(1, math.ceil(wait))
+
+    def retry_after(self) -> int:
+        """Szacuje czas do zwolnienia miejsca na podstawie kolejki i średniego czasu obsługi."""
+        rounds = (self.waiting + 1) / self.max_in_flight
+        return max(1, math.ceil(rounds * self.service_time))
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Zajmuje miejsce na wykonanie analizy (czeka w ograniczonej kolejce).
+
+        Raises:
+            AdmissionRejected: Kolejka jest pełna lub czas oczekiwania minął
+        """
+        if self.semaphore.locked():
+            if self.waiting >= self.queue_size:
+                self.stats["rejected_queue_full"] += 1
+                raise AdmissionRejected("queue_full", self.retry_after())
+            self.waiting += 1
+            # Zajęcie semafora w osobnym zadaniu: po przekroczeniu czasu (lub anulowaniu
+            # żądania) wiadomo, czy miejsce zostało już zajęte i trzeba je zwolnić
+            acquire = asyncio.ensure_future(self.semaphore.acquire())
+            try:
+                await asyncio.wait_for(asyncio.shield(acquire), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._abandon(acquire)
+                self.stats["rejected_timeout"] += 1
+                raise AdmissionRejected("queue_timeout", self.retry_after())
+            except asyncio.CancelledError:
+                self._abandon(acquire)
+                raise
+            finally:
+                self.waiting -= 1
+        else:
+            await self.semaphore.acquire()
+
+        self.in_flight += 1
+        self.stats["admitted"] += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.semaphore.release()
+            self.service_time = 0.8 * self.service_time + 0.2 * (time.monotonic() - started)
+
+    def _abandon(self, acquire: asyncio.Future) -> None:
+        """Rezygnuje z oczekiwania na miejsce; zwalnia je, jeśli zostało zajęte tuż przed rezygnacją."""
+        if acquire.cancel():
+            return
+        if not acquire.cancelled() and acquire.exception() is None:
+            self.semaphore.release()
+
+    def record_degraded(self) -> None:
+        """Odnotowuje żądanie obsłużone lokalnym silnikiem z powodu przeciążenia."""
+        self.stats["degraded"] += 1
+
+    def get_stats(self) -> Dict:
+        """Zwraca statystyki kontroli przyjmowania."""
+        return {
+            **self.stats,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_in_flight": self.max_in_flight,
+            "queue_size": self.queue_size,
+            "clients": len(self.buckets),
+            "avg_service_time": round(self.service_time, 3),
+        }
+
+
+# Globalna instancja kontrolera przyjmowania żądań
+admission_controller = AdmissionController()
@@ -0,0 +1,85 @@
+"""
+Rozgłaszanie zmian danych do otwartych dashboardów (Server-Sent Events).
+Zdarzenie jest serializowane raz i trafia do kolejek wszystkich subskrybentów,
+więc koszt zmiany nie zależy od liczby klientów.
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, Optional, Set
+
+from ..config import EVENTS_QUEUE_SIZE
+
+
+class EventBroadcaster:
+    """
+    Fan-out zdarzeń SSE do subskrybentów (po jednej ograniczonej kolejce na klienta).
+    Klient, który nie nadąża, traci zaległe zdarzenia i dostaje zdarzenie
+    'resync' - powinien wtedy pobrać pełny stan przez zwykłe endpointy.
+    """
+
+    def __init__(self, queue_size: int = EVENTS_QUEUE_SIZE):
+        """
+        Inicjalizuje broadcaster.
+
+        Args:
+            queue_size: Maksymalna liczba zaległych zdarzeń na subskrybenta
+        """
+        self.queue_size = queue_size
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.sequence = 0
+        self.stats = {"published": 0, "resyncs": 0}
+
+    def subscribe(self) -> asyncio.Queue:
+        """Rejestruje nowego subskrybenta i zwraca jego kolejkę ramek SSE."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """Wyrejestrowuje subskrybenta."""
+        self.subscribers.discard(queue)
+
+    def _frame(self, event: str, data: Any, event_id: Optional[int] = None) -> str:
+        """Serializuje zdarzenie do ramki SSE."""
+        payload = json.dumps(data, ensure_ascii=False, default=str)
+        prefix = f"id: {event_id}\n" if event_id is not None else ""
+        return f"{prefix}event: {event}\ndata: {payload}\n\n"
+
+    def publish(self, event: str, data: Dict) -> int:
+        """
+        Wysyła zdarzenie do wszystkich subskrybentów.
+        Musi być wywoływane z wątku pętli zdarzeń.
+
+        Args:
+            event: Nazwa zdarzenia
+            data: Treść zdarzenia (serializowana do JSON)
+
+        Returns:
+            Liczba subskrybentów, do których trafiło zdarzenie
+        """
+        self.sequence += 1
+        self.stats["published"] += 1
+        frame = self._frame(event, data, self.sequence)
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Klient nie nadąża - zamiast zaległych delt wyślij żądanie pełnego odświeżenia
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self._frame("resync", {"sequence": self.sequence}))
+                self.stats["resyncs"] += 1
+        return len(self.subscribers)
+
+    def get_stats(self) -> Dict:
+        """Zwraca statystyki broadcastera."""
+        return {
+            **self.stats,
+            "subscribers": len(self.subscribers),
+            "sequence": self.sequence,
+        }
+
+
+# Globalna instancja broadcastera
+event_broadcaster = EventBroadcaster()
@@ -0,0 +1,210 @@
+"""
+Wykrywanie niemal identycznych opinii (MinHash + LSH).
+Pozwala ponownie użyć wyniku analizy dla tekstu, który różni się od już
+ocenionego tylko interpunkcją lub pojedynczym słowem, zamiast wywoływać LLM.
+"""
+
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import (CACHE_MAX_SIZE, NEAR_DUP_BANDS, NEAR_DUP_NUM_PERM,
+                      NEAR_DUP_SHINGLE_SIZE, NEAR_DUP_THRESHOLD)
+
+
+# Znaki inne niż litery i cyfry dowolnego alfabetu (oraz białe znaki)
+_NON_WORD_RE = re.compile(r"[^\w\s]|_")
+
+
+def normalize_for_shingles(text: str) -> str:
+    """
+    Normalizuje tekst do shinglowania niezależnie od alfabetu: casefold,
+    usunięcie interpunkcji i symboli (np. emoji), scalenie białych znaków.
+    Litery spoza ASCII (cyrylica, CJK, polskie znaki) są zachowane.
+    """
+    return " ".join(_NON_WORD_RE.sub("", text.casefold()).split())
+
+
+class NearDuplicateIndex:
+    """
+    Indeks MinHash/LSH nad znakowymi shinglami znormalizowanego tekstu.
+    Sygnatura ma `num_perm` wartości podzielonych na `bands` pasm; teksty
+    o wspólnym paśmie są kandydatami, a podobieństwo Jaccarda jest
+    szacowane jako odsetek zgodnych wartości sygnatury.
+    """
+
+    def __init__(
+        self,
+        threshold: float = NEAR_DUP_THRESHOLD,
+        num_perm: int = NEAR_DUP_NUM_PERM,
+        bands: int = NEAR_DUP_BANDS,
+        shingle_size: int = NEAR_DUP_SHINGLE_SIZE,
+        max_size: int = CACHE_MAX_SIZE,
+        seed: int = 1,
+    ):
+        """
+        Inicjalizuje pusty indeks.
+
+        Args:
+            threshold: Minimalne szacowane podobieństwo do ponownego użycia wyniku
+            num_perm: Liczba funkcji haszujących (długość sygnatury)
+            bands: Liczba pasm LSH (num_perm musi być podzielne przez bands)
+            shingle_size: Długość znakowego shingla
+            max_size: Maksymalna liczba tekstów w indeksie (najstarsze są usuwane)
+            seed: Ziarno losowania funkcji haszujących
+        """
+        if num_perm % bands != 0:
+            raise ValueError("num_perm musi być podzielne przez bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_size = max_size
+
+        # Haszowanie multiply-shift: h(x) = (a * x + b) >> 32 w arytmetyce 64-bit
+        rng = np.random.default_rng(seed)
+        self._a = (rng.integers(1, 2**63, num_perm, dtype=np.uint64) | np.uint64(1))[:, None]
+        self._b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)[:, None]
+
+        self.entries: OrderedDict = OrderedDict()  # id -> (sygnatura, klucze pasm, wynik)
+        self.buckets: List[Dict[bytes, set]] = [{} for _ in range(bands)]
+        self._next_id = 0
+        self.lock = threading.Lock()
+        self.stats = {"lookups": 0, "reused": 0, "indexed": 0}
+
+    def _shingles(self, text: str) -> Optional[np.ndarray]:
+        """
+        Zwraca hasze znakowych shingli znormalizowanego tekstu; None, gdy tekst
+        jest krótszy niż shingle_size (za mało treści, by porównywać opinie).
+        """
+        normalized = normalize_for_shingles(text)
+        k = self.shingle_size
+        if len(normalized) < k:
+            return None
+        grams = {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+        return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams),
+                           dtype=np.uint64, count=len(grams))
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        Oblicza sygnaturę MinHash tekstu.
+
+        Args:
+            text: Tekst opinii
+
+        Returns:
+            Tablica num_perm minimalnych haszy; None dla tekstu krótszego
+            (po normalizacji) niż shingle_size
+        """
+        if not isinstance(text, str):
+            return None
+        shingles = self._shingles(text)
+        if shingles is None:
+            return None
+        hashed = (self._a * shingles[None, :] + self._b) >> np.uint64(32)
+        return hashed.min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        """Dzieli sygnaturę na pasma i zwraca ich klucze."""
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def find(self, text: str) -> Optional[Tuple[Dict, float]]:
+        """
+        Szuka ocenionego wcześniej tekstu podobnego co najmniej w stopniu threshold.
+
+        Args:
+            text: Tekst opinii
+
+        Returns:
+            Krotka (wynik analizy, szacowane podobieństwo) lub None
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        keys = self._band_keys(signature)
+
+        with self.lock:
+            self.stats["lookups"] += 1
+            candidates = set()
+            for band, key in enumerate(keys):
+                candidates |= self.buckets[band].get(key, set())
+
+            best: Optional[Tuple[Dict, float]] = None
+            for entry_id in candidates:
+                entry_signature, _, result = self.entries[entry_id]
+                similarity = float(np.mean(entry_signature == signature))
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (result, similarity)
+
+            if best is not None:
+                self.stats["reused"] += 1
+            return best
+
+    def add(self, text: str, result: Dict) -> None:
+        """
+        Dodaje oceniony tekst do indeksu.
+
+        Args:
+            text: Tekst opinii
+            result: Wynik analizy sentymentu
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return
+        keys = self._band_keys(signature)
+
+        with self.lock:
+            if len(self.entries) >= self.max_size:
+                self._evict_oldest()
+            entry_id = self._next_id
+            self._next_id += 1
+            self.entries[entry_id] = (signature, keys, result)
+            for band, key in enumerate(keys):
+                self.buckets[band].setdefault(key, set()).add(entry_id)
+            self.stats["indexed"] += 1
+
+    def _evict_oldest(self) -> None:
+        """Usuwa najstarszy wpis (wywoływane pod blokadą)."""
+        entry_id, (_, keys, _) = self.entries.popitem(last=False)
+        for band, key in enumerate(keys):
+            bucket = self.buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self.buckets[band][key]
+
+    def clear(self) -> None:
+        """Czyści indeks i statystyki."""
+        with self.lock:
+            self.entries.clear()
+            self.buckets = [{} for _ in range(self.bands)]
+            self.stats = {"lookups": 0, "reused": 0, "indexed": 0}
+
+    def get_stats(self) -> Dict:
+        """
+        Zwraca statystyki indeksu, w tym liczbę zaoszczędzonych wywołań LLM.
+
+        Returns:
+            Słownik ze statystykami
+        """
+        with self.lock:
+            lookups = self.stats["lookups"]
+            return {
+                "lookups": lookups,
+                "reused": self.stats["reused"],
+                "llm_calls_saved": self.stats["reused"],
+                "reuse_rate": round(self.stats["reused"] / lookups * 100, 2) if lookups else 0.0,
+                "indexed": self.stats["indexed"],
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "threshold": self.threshold,
+            }
+
+
+# Globalna instancja indeksu
+near_duplicate_index = NearDuplicateIndex()
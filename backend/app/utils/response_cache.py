@@ -0,0 +1,131 @@
+"""
+Cache gotowych (zserializowanych) odpowiedzi JSON powiązany z wersją danych.
+Odpowiedź jest serializowana raz na wersję datasetu i zestaw parametrów,
+a ETag pozwala klientom otrzymać 304 bez ponownego przesyłania treści.
+"""
+
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from ..config import RESPONSE_CACHE_MAX_SIZE
+from ..data.shared import shared_dataset
+
+# Identyfikator uruchomienia - wersje datasetu liczone są od zera po restarcie,
+# więc ETag musi je odróżniać między uruchomieniami. W trybie wielu workerów
+# wersja to generacja współdzielonego snapshotu, a identyfikator pochodzi
+# z jego katalogu - ta sama wersja ma ten sam ETag w każdym procesie
+BOOT_ID = shared_dataset.instance_id if shared_dataset is not None else uuid.uuid4().hex[:8]
+
+
+def make_etag(key: str, version: int) -> str:
+    """
+    Buduje ETag dla klucza odpowiedzi i wersji danych.
+
+    Args:
+        key: Klucz odpowiedzi (endpoint + parametry)
+        version: Wersja datasetu
+
+    Returns:
+        ETag w cudzysłowie (zgodnie z RFC 7232)
+    """
+    digest = hashlib.md5(key.encode("utf-8")).hexdigest()[:12]
+    return f'"{BOOT_ID}-{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Sprawdza, czy nagłówek If-None-Match pasuje do ETag (porównanie słabe).
+
+    Args:
+        if_none_match: Wartość nagłówka If-None-Match (może być None)
+        etag: Bieżący ETag
+
+    Returns:
+        True, jeśli klient ma aktualną wersję odpowiedzi
+    """
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class ResponseCache:
+    """
+    Cache LRU zserializowanych odpowiedzi.
+    Wpis jest ważny tylko dla wersji danych, przy której powstał.
+    """
+
+    def __init__(self, max_size: int = RESPONSE_CACHE_MAX_SIZE):
+        """
+        Inicjalizuje cache.
+
+        Args:
+            max_size: Maksymalna liczba przechowywanych odpowiedzi
+        """
+        self.max_size = max_size
+        self.cache: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0}
+
+    def get(self, key: str, version: int) -> Optional[bytes]:
+        """
+        Zwraca zserializowaną odpowiedź, jeśli powstała dla tej wersji danych.
+
+        Args:
+            key: Klucz odpowiedzi
+            version: Bieżąca wersja datasetu
+
+        Returns:
+            Treść odpowiedzi (bytes) lub None
+        """
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is not None and entry[0] == version:
+                self.cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[1]
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, key: str, version: int, body: bytes) -> None:
+        """
+        Zapisuje zserializowaną odpowiedź dla wersji danych.
+
+        Args:
+            key: Klucz odpowiedzi
+            version: Wersja datasetu
+            body: Treść odpowiedzi
+        """
+        with self.lock:
+            self.cache[key] = (version, body)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
+
+    def record_not_modified(self) -> None:
+        """Zlicza odpowiedź 304 (klient miał aktualną wersję)."""
+        with self.lock:
+            self.stats["not_modified"] += 1
+
+    def clear(self) -> None:
+        """Czyści cache."""
+        with self.lock:
+            self.cache.clear()
+
+    def get_stats(self) -> Dict:
+        """Zwraca statystyki cache odpowiedzi."""
+        with self.lock:
+            return {
+                **self.stats,
+                "size": len(self.cache),
+                "max_size": self.max_size,
+            }
+
+
+# Globalna instancja cache odpowiedzi
+response_cache = ResponseCache()
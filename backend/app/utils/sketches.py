@@ -0,0 +1,362 @@
+"""
+Strumieniowe szkice statystyczne o stałej pamięci.
+Szkic kwantyli KLL, histogram o stałych przedziałach i Space-Saving (TOP-k) -
+aktualizowane przyrostowo i łączone (merge) między workerami.
+"""
+
+import heapq
+import math
+import random
+from typing import Dict, Iterable, List, Optional
+
+from ..config import QUANTILE_SKETCH_K
+
+
+class KLLSketch:
+    """
+    Szkic kwantyli KLL (Karnin, Lang, Liberty).
+    Pamięć O(k), błąd rangi rzędu 1/k, szkice można łączyć metodą merge().
+    """
+
+    def __init__(self, k: int = QUANTILE_SKETCH_K, c: float = 2.0 / 3.0, seed: Optional[int] = None):
+        """
+        Inicjalizuje pusty szkic.
+
+        Args:
+            k: Parametr dokładności (pojemność najwyższego kompaktora)
+            c: Współczynnik zmniejszania pojemności niższych poziomów
+            seed: Ziarno generatora losowego (dla powtarzalności)
+        """
+        self.k = k
+        self.c = c
+        self.compactors: List[List[float]] = []
+        self.count = 0
+        self.min_value: Optional[float] = None
+        self.max_value: Optional[float] = None
+        self._size = 0
+        self._max_size = 0
+        self._random = random.Random(seed)
+        self._grow()
+
+    def _capacity(self, level: int) -> int:
+        """Pojemność kompaktora na danym poziomie."""
+        depth = len(self.compactors) - level - 1
+        return int(math.ceil(self.c ** depth * self.k)) + 1
+
+    def _grow(self) -> None:
+        """Dodaje nowy poziom kompaktora."""
+        self.compactors.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _compact_level(self, level: int) -> None:
+        """Kompaktuje poziom: sortuje i przenosi co drugi element poziom wyżej."""
+        if level + 1 >= len(self.compactors):
+            self._grow()
+        items = sorted(self.compactors[level])
+        # Przy nieparzystej liczbie elementów ostatni zostaje na poziomie
+        leftover = [items.pop()] if len(items) % 2 else []
+        offset = self._random.randint(0, 1)
+        self.compactors[level + 1].extend(items[offset::2])
+        self.compactors[level] = leftover
+
+    def _compress(self) -> None:
+        """Kompaktuje poziomy, dopóki rozmiar szkicu przekracza limit."""
+        while self._size >= self._max_size:
+            for level in range(len(self.compactors)):
+                if len(self.compactors[level]) >= self._capacity(level):
+                    self._compact_level(level)
+                    break
+            else:
+                break
+            self._size = sum(len(items) for items in self.compactors)
+
+    def update(self, value: float) -> None:
+        """
+        Dodaje wartość do szkicu.
+
+        Args:
+            value: Wartość (np. polaryzacja opinii)
+        """
+        value = float(value)
+        if math.isnan(value):
+            return
+        self.compactors[0].append(value)
+        self.count += 1
+        self._size += 1
+        self.min_value = value if self.min_value is None else min(self.min_value, value)
+        self.max_value = value if self.max_value is None else max(self.max_value, value)
+        if self._size >= self._max_size:
+            self._compress()
+
+    def update_many(self, values: Iterable[float]) -> None:
+        """Dodaje wiele wartości do szkicu."""
+        for value in values:
+            self.update(value)
+
+    def merge(self, other: "KLLSketch") -> None:
+        """
+        Łączy inny szkic z bieżącym (np. szkic z innego workera).
+
+        Args:
+            other: Szkic do połączenia
+        """
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.count += other.count
+        if other.min_value is not None:
+            self.min_value = other.min_value if self.min_value is None else min(self.min_value, other.min_value)
+            self.max_value = other.max_value if self.max_value is None else max(self.max_value, other.max_value)
+        self._size = sum(len(items) for items in self.compactors)
+        self._compress()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Zwraca przybliżony kwantyl rzędu q.
+
+        Args:
+            q: Rząd kwantyla (0 - 1)
+
+        Returns:
+            Wartość kwantyla lub None dla pustego szkicu
+        """
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs: List[float]) -> List[Optional[float]]:
+        """
+        Zwraca przybliżone kwantyle dla listy rzędów (jedno sortowanie).
+
+        Args:
+            qs: Rzędy kwantyli (0 - 1)
+
+        Returns:
+            Lista wartości kwantyli (None dla pustego szkicu)
+        """
+        weighted = sorted(
+            (value, 2 ** level)
+            for level, items in enumerate(self.compactors)
+            for value in items
+        )
+        if not weighted:
+            return [None for _ in qs]
+
+        total = sum(weight for _, weight in weighted)
+        result = []
+        for q in qs:
+            if q <= 0:
+                result.append(self.min_value)
+                continue
+            if q >= 1:
+                result.append(self.max_value)
+                continue
+            target = q * total
+            cumulative = 0
+            value = weighted[-1][0]
+            for item, weight in weighted:
+                cumulative += weight
+                if cumulative >= target:
+                    value = item
+                    break
+            result.append(value)
+        return result
+
+    def to_dict(self) -> Dict:
+        """Serializuje szkic do słownika (JSON) - do przesłania między workerami."""
+        return {
+            "k": self.k,
+            "c": self.c,
+            "count": self.count,
+            "min": self.min_value,
+            "max": self.max_value,
+            "compactors": [list(items) for items in self.compactors],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "KLLSketch":
+        """Odtwarza szkic z postaci słownikowej (to_dict)."""
+        sketch = cls(k=int(data["k"]), c=float(data["c"]))
+        sketch.compactors = [[float(v) for v in items] for items in data["compactors"]] or [[]]
+        sketch.count = int(data["count"])
+        sketch.min_value = data.get("min")
+        sketch.max_value = data.get("max")
+        sketch._max_size = sum(sketch._capacity(h) for h in range(len(sketch.compactors)))
+        sketch._size = sum(len(items) for items in sketch.compactors)
+        return sketch
+
+
+class FixedHistogram:
+    """
+    Histogram o stałych, równych przedziałach na zakresie [low, high].
+    Wartości spoza zakresu trafiają do skrajnych przedziałów.
+    """
+
+    def __init__(self, low: float = -1.0, high: float = 1.0, bins: int = 20):
+        """
+        Inicjalizuje pusty histogram.
+
+        Args:
+            low: Dolna granica zakresu
+            high: Górna granica zakresu
+            bins: Liczba przedziałów
+        """
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.counts = [0] * bins
+
+    def _bin_index(self, value: float) -> int:
+        """Zwraca indeks przedziału dla wartości."""
+        position = int((value - self.low) / (self.high - self.low) * self.bins)
+        return min(max(position, 0), self.bins - 1)
+
+    def update(self, value: float) -> None:
+        """Dodaje wartość do histogramu."""
+        value = float(value)
+        if math.isnan(value):
+            return
+        self.counts[self._bin_index(value)] += 1
+
+    def update_many(self, values: Iterable[float]) -> None:
+        """Dodaje wiele wartości do histogramu."""
+        for value in values:
+            self.update(value)
+
+    def merge(self, other: "FixedHistogram") -> None:
+        """
+        Łączy histogram o tych samych przedziałach z bieżącym.
+
+        Raises:
+            ValueError: Gdy histogramy mają różne przedziały
+        """
+        if (self.low, self.high, self.bins) != (other.low, other.high, other.bins):
+            raise ValueError("Nie można połączyć histogramów o różnych przedziałach")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+
+    def edges(self) -> List[float]:
+        """Zwraca granice przedziałów (bins + 1 wartości)."""
+        width = (self.high - self.low) / self.bins
+        return [self.low + i * width for i in range(self.bins + 1)]
+
+    def to_dict(self) -> Dict:
+        """Serializuje histogram do słownika (JSON)."""
+        return {"low": self.low, "high": self.high, "bins": self.bins, "counts": list(self.counts)}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "FixedHistogram":
+        """Odtwarza histogram z postaci słownikowej (to_dict)."""
+        histogram = cls(low=float(data["low"]), high=float(data["high"]), bins=int(data["bins"]))
+        histogram.counts = [int(c) for c in data["counts"]]
+        return histogram
+
+
+class SpaceSaving:
+    """
+    Algorytm Space-Saving (Metwally i in.) do przybliżonych TOP-k elementów.
+    Przechowuje co najwyżej `capacity` liczników; zawyżenie licznika każdego
+    elementu jest ograniczone przez jego `error` (i przez total / capacity).
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """
+        Inicjalizuje pusty szkic.
+
+        Args:
+            capacity: Maksymalna liczba śledzonych elementów (budżet pamięci)
+        """
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.total = 0
+        # Kopiec (count, item) z leniwą walidacją - do szybkiego znalezienia minimum
+        self._heap: List[tuple] = []
+
+    def _push(self, item: str) -> None:
+        """Dodaje aktualny licznik elementu do kopca; przebudowuje przerośnięty kopiec."""
+        heapq.heappush(self._heap, (self.counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, key) for key, count in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> str:
+        """Usuwa z kopca i zwraca element o najmniejszym aktualnym liczniku."""
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return item
+
+    def update(self, item: str, count: int = 1) -> None:
+        """
+        Zlicza wystąpienie elementu.
+
+        Args:
+            item: Element (np. słowo)
+            count: Liczba wystąpień do dodania
+        """
+        self.total += count
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            # Zastąp element o najmniejszym liczniku; jego licznik staje się błędem
+            evicted = self._pop_min()
+            minimum = self.counts.pop(evicted)
+            self.errors.pop(evicted)
+            self.counts[item] = minimum + count
+            self.errors[item] = minimum
+        self._push(item)
+
+    def update_many(self, items: Iterable[str]) -> None:
+        """Zlicza wiele elementów."""
+        for item in items:
+            self.update(item)
+
+    def error_bound(self) -> int:
+        """
+        Zwraca globalne ograniczenie zawyżenia liczników.
+        Dopóki szkic nie jest pełny, liczniki są dokładne (0).
+        """
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    def top(self, k: int) -> List[Dict]:
+        """
+        Zwraca k elementów o największych licznikach.
+
+        Args:
+            k: Liczba elementów
+
+        Returns:
+            Lista słowników: item, count (górne oszacowanie), error (maks. zawyżenie)
+        """
+        top_items = heapq.nlargest(k, self.counts.items(), key=lambda kv: kv[1])
+        return [
+            {"item": item, "count": count, "error": self.errors[item]}
+            for item, count in top_items
+        ]
+
+    def merge(self, other: "SpaceSaving") -> None:
+        """
+        Łączy inny szkic z bieżącym (scalanie szkiców Space-Saving, Agarwal i in.).
+        Element nieobecny w pełnym szkicu mógł tam mieć licznik co najwyżej równy
+        jego minimum (error_bound), więc minimum jest doliczane do licznika
+        i błędu - scalone liczniki pozostają górnymi oszacowaniami.
+        Wynik jest przycinany do pojemności.
+        """
+        self_missing = self.error_bound()
+        other_missing = other.error_bound()
+        counts = {}
+        errors = {}
+        for item in self.counts.keys() | other.counts.keys():
+            counts[item] = self.counts.get(item, self_missing) + other.counts.get(item, other_missing)
+            errors[item] = self.errors.get(item, self_missing) + other.errors.get(item, other_missing)
+        if len(counts) > self.capacity:
+            counts = dict(heapq.nlargest(self.capacity, counts.items(), key=lambda kv: kv[1]))
+        self.counts = counts
+        self.errors = {item: errors[item] for item in counts}
+        self.total += other.total
+        self._heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self._heap)
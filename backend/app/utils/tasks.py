@@ -0,0 +1,182 @@
+"""
+Rejestr zadań w tle wykonywanych w procesie (np. przeładowanie danych).
+Zadanie ma identyfikator i postęp do odpytywania przez API; zgłoszenia
+zadania wyłącznego rodzaju (np. przeładowanie), gdy poprzednie jeszcze trwa,
+są do niego dołączane.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..config import TASKS_HISTORY_SIZE
+
+# Statusy zadania
+TASK_RUNNING = "running"
+TASK_COMPLETED = "completed"
+TASK_FAILED = "failed"
+
+
+class BackgroundTask:
+    """Stan pojedynczego zadania w tle (etap, postęp, wynik lub błąd)."""
+
+    def __init__(self, kind: str):
+        """
+        Tworzy zadanie w stanie 'running'.
+
+        Args:
+            kind: Rodzaj zadania (np. 'reload')
+        """
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = TASK_RUNNING
+        self.stage = "pending"
+        self.processed = 0
+        self.total = 0
+        self.coalesced = 0
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.future: Optional[asyncio.Future] = None
+
+    def update(self, stage: Optional[str] = None, processed: Optional[int] = None,
+               total: Optional[int] = None) -> None:
+        """
+        Aktualizuje etap i postęp zadania.
+
+        Args:
+            stage: Nazwa bieżącego etapu
+            processed: Liczba przetworzonych elementów etapu
+            total: Liczba wszystkich elementów etapu
+        """
+        if stage is not None:
+            self.stage = stage
+        if processed is not None:
+            self.processed = processed
+        if total is not None:
+            self.total = total
+
+    @property
+    def progress(self) -> float:
+        """Postęp bieżącego etapu w procentach (100 po zakończeniu)."""
+        if self.status != TASK_RUNNING:
+            return 100.0
+        return round(self.processed / self.total * 100, 2) if self.total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Zwraca stan zadania jako słownik."""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "processed": self.processed,
+            "total": self.total,
+            "progress": self.progress,
+            "coalesced": self.coalesced,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "result": self.result,
+        }
+
+
+class TaskRegistry:
+    """
+    Rejestr zadań w tle z historią ostatnio zakończonych.
+    Zadania uruchamiane przez start_or_join są wyłączne - co najwyżej jedno
+    zadanie danego rodzaju jest wykonywane naraz.
+    """
+
+    def __init__(self, history_size: int = TASKS_HISTORY_SIZE):
+        """
+        Inicjalizuje pusty rejestr.
+
+        Args:
+            history_size: Liczba przechowywanych zakończonych zadań
+        """
+        self.history_size = history_size
+        self.tasks: OrderedDict = OrderedDict()
+        self.running: Dict[str, BackgroundTask] = {}
+
+    def get(self, task_id: str) -> Optional[BackgroundTask]:
+        """Zwraca zadanie o podanym identyfikatorze."""
+        return self.tasks.get(task_id)
+
+    def start_or_join(
+        self,
+        kind: str,
+        run: Callable[[BackgroundTask], Awaitable[Dict[str, Any]]],
+    ) -> Tuple[BackgroundTask, bool]:
+        """
+        Uruchamia zadanie danego rodzaju albo dołącza do już trwającego.
+
+        Args:
+            kind: Rodzaj zadania
+            run: Korutyna wykonująca zadanie; aktualizuje postęp przez
+                przekazany BackgroundTask i zwraca słownik z wynikiem
+
+        Returns:
+            Krotka (zadanie, czy dołączono do trwającego)
+        """
+        task = self.running.get(kind)
+        if task is not None:
+            task.coalesced += 1
+            return task, True
+
+        task = self.start(kind, run)
+        self.running[kind] = task
+        return task, False
+
+    def start(
+        self,
+        kind: str,
+        run: Callable[[BackgroundTask], Awaitable[Dict[str, Any]]],
+    ) -> BackgroundTask:
+        """
+        Uruchamia nowe zadanie niezależnie od trwających zadań tego rodzaju.
+
+        Args:
+            kind: Rodzaj zadania
+            run: Korutyna wykonująca zadanie (jak w start_or_join)
+
+        Returns:
+            Uruchomione zadanie
+        """
+        task = BackgroundTask(kind)
+        self.tasks[task.id] = task
+        task.future = asyncio.ensure_future(self._run(task, run))
+        self._trim()
+        return task
+
+    async def _run(self, task: BackgroundTask,
+                   run: Callable[[BackgroundTask], Awaitable[Dict[str, Any]]]) -> None:
+        """Wykonuje zadanie i zapisuje jego wynik lub błąd."""
+        try:
+            task.result = await run(task)
+            task.status = TASK_COMPLETED
+        except Exception as e:
+            task.status = TASK_FAILED
+            task.error = str(e)
+        finally:
+            task.finished_at = time.time()
+            if self.running.get(task.kind) is task:
+                del self.running[task.kind]
+
+    async def wait(self, task: BackgroundTask) -> BackgroundTask:
+        """Czeka na zakończenie zadania (anulowanie czekającego nie przerywa zadania)."""
+        await asyncio.shield(task.future)
+        return task
+
+    def _trim(self) -> None:
+        """Usuwa najstarsze zakończone zadania ponad limit historii."""
+        finished = [task_id for task_id, task in self.tasks.items() if task.status != TASK_RUNNING]
+        for task_id in finished[:max(0, len(finished) - self.history_size)]:
+            del self.tasks[task_id]
+
+
+# Globalna instancja rejestru zadań
+task_registry = TaskRegistry()
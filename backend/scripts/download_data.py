@@ -53,10 +53,12 @@ def generate_sample_dataset(num_reviews=100):
         num_reviews: Liczba opinii do wygenerowania
     
     Returns:
-        pandas.DataFrame z kolumnami: review_text, rating, review_id
+        pandas.DataFrame z kolumnami: review_id, review_text, rating, sentiment, created_at
     """
     import random
+    from datetime import datetime, timezone
     
+    created_at = datetime.now(timezone.utc).isoformat()
     reviews = []
     review_id = 1
     
@@ -76,7 +78,8 @@ def generate_sample_dataset(num_reviews=100):
             "review_id": review_id,
             "review_text": review_text,
             "rating": rating,
-            "sentiment": sentiment
+            "sentiment": sentiment,
+            "created_at": created_at
         })
         review_id += 1
     
@@ -0,0 +1,312 @@
+"""
+Skrypt porównujący silniki analizy sentymentu na oznaczonym zbiorze opinii.
+Dla każdego silnika raportuje jakość (accuracy, F1) obok kosztu: przepustowości
+(opinie/s), opóźnienia p50/p95, trafień cache i odsetka fallbacków do TextBlob.
+
+Użycie (z katalogu backend):
+    python scripts/evaluate_engines.py
+    python scripts/evaluate_engines.py --data data/dataset.csv --engines ollama,textblob
+    python scripts/evaluate_engines.py --stand-in always --output wyniki.json
+
+Plik CSV ma format dataset.csv: etykieta referencyjna w kolumnie sentiment
+(positive / negative). Jeśli serwer Ollama nie odpowiada, silnik ollama korzysta
+z lokalnego zamiennika (LocalOllamaStand-In), który odpowiada na prompty klienta
+w oczekiwanym formacie - mierzony jest wtedy narzut ścieżki Ollama (cache,
+micro-batching, harmonogram, parsowanie), a nie jakość modelu.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Silnik ollama jest oceniany ścieżką modelu niezależnie od ustawienia USE_OLLAMA
+os.environ["USE_OLLAMA"] = "true"
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+from textblob import TextBlob
+
+from app.analysis.grouped import LABELS, confusion_matrix
+from app.analysis.llm_scheduler import PRIORITY_BULK
+from app.analysis.ollama_client import ollama_client
+from app.data.loader import load_data
+from app.utils.cache import sentiment_cache
+from app.utils.near_duplicates import near_duplicate_index
+
+
+class LocalOllamaStandIn:
+    """
+    Lokalny zamiennik ollama.Client (metody chat i list) do pomiarów bez serwera.
+    Odpowiada na prompty OllamaClient (pojedyncze i wieloopiniowe) tablicą lub
+    obiektem JSON z oceną TextBlob, po symulowanym czasie odpowiedzi modelu.
+    """
+
+    def __init__(self, latency_ms: float, per_review_ms: float):
+        """
+        Inicjalizuje zamiennik.
+
+        Args:
+            latency_ms: Stały czas odpowiedzi na jedno wywołanie (ms)
+            per_review_ms: Dodatkowy czas na każdą opinię w prompcie (ms)
+        """
+        self.latency = latency_ms / 1000
+        self.per_review = per_review_ms / 1000
+
+    def list(self) -> Dict:
+        """Lista modeli (zamiennik jest zawsze dostępny)."""
+        return {"models": []}
+
+    def chat(self, model: str, messages: List[Dict], stream: bool = False,
+             options: Optional[Dict] = None) -> Dict:
+        """Odpowiada na prompt w formacie oczekiwanym przez OllamaClient."""
+        prompt = messages[-1]["content"]
+        if "\nReviews:\n" in prompt:
+            block = prompt.split("\nReviews:\n", 1)[1].rsplit("\n\nJSON:", 1)[0]
+            reviews = re.findall(r"^(\d+)\. (.*)$", block, flags=re.MULTILINE)
+            content = json.dumps([
+                {"id": int(number), **self._score(text)} for number, text in reviews
+            ])
+            count = len(reviews)
+        else:
+            text = prompt.split("\nReview: ", 1)[1].rsplit("\n\nJSON:", 1)[0]
+            content = json.dumps(self._score(text))
+            count = 1
+        time.sleep(self.latency + self.per_review * count)
+        return {"message": {"role": "assistant", "content": content}}
+
+    @staticmethod
+    def _score(text: str) -> Dict:
+        """Ocena opinii TextBlob w formacie odpowiedzi modelu."""
+        polarity = TextBlob(text).sentiment.polarity
+        return {"polarity": round(polarity, 4), "label": "positive" if polarity > 0 else "negative"}
+
+
+def load_labelled(path: Optional[str], limit: Optional[int]) -> pd.DataFrame:
+    """
+    Wczytuje opinie z etykietą referencyjną positive / negative.
+
+    Args:
+        path: Ścieżka do pliku CSV (None = data/dataset.csv)
+        limit: Maksymalna liczba opinii (None = wszystkie)
+
+    Returns:
+        DataFrame z kolumnami review_text i sentiment
+
+    Raises:
+        ValueError: Plik nie zawiera kolumn review_text i sentiment
+    """
+    df = load_data(path)
+    if "review_text" not in df.columns or "sentiment" not in df.columns:
+        raise ValueError("Plik musi zawierać kolumny review_text i sentiment")
+    df = df.dropna(subset=["review_text"])
+    df = df[df["review_text"].str.strip() != ""]
+    labels = df["sentiment"].astype("string").str.strip().str.lower()
+    df = df.loc[labels.isin(LABELS).fillna(False), ["review_text", "sentiment"]]
+    if limit is not None:
+        df = df.head(limit)
+    return df.reset_index(drop=True)
+
+
+def quality_metrics(reference: pd.Series, predicted: List[str]) -> Dict:
+    """
+    Liczy accuracy oraz F1 per etykieta i macro-F1 z macierzy pomyłek.
+
+    Args:
+        reference: Etykiety referencyjne
+        predicted: Etykiety przewidziane przez silnik (w tej samej kolejności)
+
+    Returns:
+        Słownik z accuracy, f1 (per etykieta) i macro_f1 (w %)
+    """
+    matrix = confusion_matrix(pd.DataFrame({
+        "sentiment": reference.to_numpy(),
+        "sentiment_label": predicted,
+    }))
+    f1 = {}
+    for label in LABELS:
+        precision, recall = matrix["precision"][label], matrix["recall"][label]
+        if precision and recall:
+            f1[label] = round(2 * precision * recall / (precision + recall), 2)
+        else:
+            f1[label] = 0.0
+    return {
+        "accuracy": matrix["agreement_rate"],
+        "f1": f1,
+        "macro_f1": round(sum(f1.values()) / len(f1), 2),
+    }
+
+
+def latency_percentiles(latencies: List[float]) -> Dict:
+    """Zwraca p50 / p95 opóźnienia w milisekundach."""
+    p50, p95 = np.percentile(np.asarray(latencies) * 1000, [50, 95])
+    return {"p50_ms": round(float(p50), 2), "p95_ms": round(float(p95), 2)}
+
+
+def evaluate_textblob(texts: List[str]) -> Dict:
+    """Ocena silnikiem TextBlob (ten sam kod co fallback klienta Ollama)."""
+    labels, latencies = [], []
+    started = time.perf_counter()
+    for text in texts:
+        call_started = time.perf_counter()
+        labels.append(ollama_client._analyze_with_textblob_fallback(text)["label"])
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+    return {
+        "labels": labels,
+        "latencies": latencies,
+        "elapsed": elapsed,
+        "cache_hit_rate": None,
+        "fallback_rate": None,
+    }
+
+
+async def _evaluate_ollama(texts: List[str], concurrency: int) -> Dict:
+    """Ocena ścieżką Ollama (cache, micro-batching, harmonogram, fallback)."""
+    sentiment_cache.clear()
+    near_duplicate_index.clear()
+    ollama_client.stats = {key: 0 for key in ollama_client.stats}
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = [0.0] * len(texts)
+
+    async def score(position: int, text: str) -> str:
+        async with semaphore:
+            call_started = time.perf_counter()
+            result = await ollama_client.analyze_sentiment(text, priority=PRIORITY_BULK)
+            latencies[position] = time.perf_counter() - call_started
+            return result["label"]
+
+    started = time.perf_counter()
+    labels = await asyncio.gather(*(score(i, text) for i, text in enumerate(texts)))
+    elapsed = time.perf_counter() - started
+    return {
+        "labels": list(labels),
+        "latencies": latencies,
+        "elapsed": elapsed,
+        "cache_hit_rate": sentiment_cache.get_stats()["hit_rate"],
+        "fallback_rate": ollama_client.get_stats()["fallback_rate"],
+    }
+
+
+def evaluate_ollama(texts: List[str], concurrency: int) -> Dict:
+    """Ocena silnikiem Ollama (synchroniczny wrapper)."""
+    return asyncio.run(_evaluate_ollama(texts, concurrency))
+
+
+def use_stand_in(mode: str, latency_ms: float, per_review_ms: float) -> bool:
+    """
+    Podłącza lokalny zamiennik Ollama zgodnie z trybem.
+
+    Args:
+        mode: 'auto' (gdy serwer nie odpowiada), 'always' lub 'never'
+        latency_ms: Stały czas odpowiedzi zamiennika (ms)
+        per_review_ms: Czas zamiennika na opinię (ms)
+
+    Returns:
+        True, jeśli używany jest zamiennik
+    """
+    if mode == "never":
+        return False
+    if mode == "auto" and asyncio.run(ollama_client.health_check()):
+        return False
+    print("Serwer Ollama niedostępny - używam lokalnego zamiennika" if mode == "auto"
+          else "Używam lokalnego zamiennika Ollama")
+    ollama_client.client = LocalOllamaStandIn(latency_ms, per_review_ms)
+    return True
+
+
+def print_report(results: List[Dict]) -> None:
+    """Wypisuje tabelę wyników."""
+    def fmt(value) -> str:
+        return "-" if value is None else f"{value}"
+
+    header = ["silnik", "opinie", "accuracy %", "macro-F1 %", "opinie/s",
+              "p50 ms", "p95 ms", "cache hit %", "fallback %"]
+    rows = [[
+        result["engine"] + (" (zamiennik)" if result.get("stand_in") else ""),
+        fmt(result["reviews"]),
+        fmt(result["accuracy"]),
+        fmt(result["macro_f1"]),
+        fmt(result["reviews_per_second"]),
+        fmt(result["p50_ms"]),
+        fmt(result["p95_ms"]),
+        fmt(result["cache_hit_rate"]),
+        fmt(result["fallback_rate"]),
+    ] for result in results]
+    widths = [max(len(row[i]) for row in rows + [header]) for i in range(len(header))]
+    for row in [header] + rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+
+# Silniki dostępne w porównaniu (nazwa -> funkcja oceniająca listę tekstów)
+ENGINES: Dict[str, Callable[..., Dict]] = {
+    "ollama": evaluate_ollama,
+    "textblob": lambda texts, concurrency: evaluate_textblob(texts),
+}
+
+
+def main():
+    """Główna funkcja porównania silników."""
+    parser = argparse.ArgumentParser(description="Porównanie silników analizy sentymentu")
+    parser.add_argument("--data", default=None,
+                        help="Plik CSV z etykietami (domyślnie data/dataset.csv)")
+    parser.add_argument("--engines", default=",".join(ENGINES),
+                        help="Silniki oddzielone przecinkami (ollama, textblob)")
+    parser.add_argument("--limit", type=int, default=None, help="Maksymalna liczba opinii")
+    parser.add_argument("--concurrency", type=int, default=20,
+                        help="Równoległe analizy dla silnika ollama")
+    parser.add_argument("--stand-in", choices=["auto", "always", "never"], default="auto",
+                        help="Lokalny zamiennik Ollama: gdy serwer nie odpowiada, zawsze lub nigdy")
+    parser.add_argument("--stand-in-latency-ms", type=float, default=200.0,
+                        help="Czas odpowiedzi zamiennika na wywołanie (ms)")
+    parser.add_argument("--stand-in-per-review-ms", type=float, default=20.0,
+                        help="Dodatkowy czas zamiennika na opinię w prompcie (ms)")
+    parser.add_argument("--output", default=None, help="Zapisz wyniki do pliku JSON")
+    args = parser.parse_args()
+
+    engines = [name.strip() for name in args.engines.split(",") if name.strip()]
+    unknown = [name for name in engines if name not in ENGINES]
+    if unknown:
+        parser.error(f"Nieznane silniki: {', '.join(unknown)}")
+
+    df = load_labelled(args.data, args.limit)
+    if df.empty:
+        print("Brak opinii z etykietą positive/negative w kolumnie sentiment")
+        sys.exit(1)
+    texts = df["review_text"].astype(str).tolist()
+    print(f"Ocena {len(texts)} opinii silnikami: {', '.join(engines)}")
+
+    results = []
+    for name in engines:
+        stand_in = False
+        if name == "ollama":
+            stand_in = use_stand_in(args.stand_in, args.stand_in_latency_ms,
+                                    args.stand_in_per_review_ms)
+        run = ENGINES[name](texts, args.concurrency)
+        results.append({
+            "engine": name,
+            "stand_in": stand_in,
+            "reviews": len(texts),
+            **quality_metrics(df["sentiment"], run["labels"]),
+            "reviews_per_second": round(len(texts) / run["elapsed"], 2) if run["elapsed"] else None,
+            **latency_percentiles(run["latencies"]),
+            "cache_hit_rate": run["cache_hit_rate"],
+            "fallback_rate": run["fallback_rate"],
+        })
+
+    print()
+    print_report(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False),
+                                     encoding="utf-8")
+        print(f"\nWyniki zapisane do: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
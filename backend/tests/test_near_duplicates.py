@@ -0,0 +1,35 @@
+"""Testy wykrywania niemal identycznych opinii (MinHash + LSH)."""
+
+from app.utils.near_duplicates import NearDuplicateIndex, normalize_for_shingles
+
+POSITIVE = {"sentiment_label": "positive", "polarity": 0.8}
+
+
+def test_punctuation_and_case_variants_are_reused():
+    index = NearDuplicateIndex()
+    index.add("This product is absolutely amazing, I love it so much!", POSITIVE)
+
+    match = index.find("this product is absolutely amazing I love it so much")
+
+    assert match is not None and match[0] == POSITIVE
+
+
+def test_non_ascii_reviews_are_not_collapsed():
+    index = NearDuplicateIndex()
+    index.add("Отличный товар, всем рекомендую", POSITIVE)
+    index.add("Świetna jakość, polecam każdemu", POSITIVE)
+
+    assert index.find("Ужасное качество, не покупайте") is None
+    assert index.find("Żałosna obsługa, nie kupujcie") is None
+    assert index.find("Отличный товар! Всем рекомендую")[0] == POSITIVE
+    assert normalize_for_shingles("Świetna  Jakość!") == "świetna jakość"
+
+
+def test_short_and_symbol_only_texts_are_skipped():
+    index = NearDuplicateIndex()
+    index.add("👍👍👍", POSITIVE)
+    index.add("好", POSITIVE)
+
+    assert index.get_stats()["indexed"] == 0
+    assert index.find("👎") is None
+    assert index.find("不好") is None
@@ -0,0 +1,83 @@
+"""Testy raportu PDF: liczba elementów dokumentu nie rośnie z wielkością datasetu."""
+
+import numpy as np
+import pandas as pd
+from reportlab.platypus import Paragraph, Table
+
+from app.reports import pdf_report
+from app.reports.pdf_report import REVIEW_TABLE_HEADER, _report_sections, write_report_pdf
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "review_text": [f"review number {i}" for i in range(rows)],
+        "polarity": rng.uniform(-1, 1, rows),
+        "sentiment_label": rng.choice(["positive", "negative"], rows),
+        "word_count": rng.integers(1, 50, rows),
+    })
+
+
+def _build_story(monkeypatch, df: pd.DataFrame, **options) -> list:
+    """Buduje raport, przechwytując elementy dokumentu zamiast renderowania."""
+    captured = []
+    monkeypatch.setattr(pdf_report.SimpleDocTemplate, "build",
+                        lambda self, story: captured.extend(story))
+    write_report_pdf(df, {"total_reviews": len(df)}, "unused.pdf", **options)
+    return captured
+
+
+def _review_rows(story: list) -> int:
+    return sum(
+        len(flowable._cellvalues) - 1
+        for flowable in story
+        if isinstance(flowable, Table) and flowable._cellvalues[0] == REVIEW_TABLE_HEADER
+    )
+
+
+def test_full_report_caps_review_rows(monkeypatch):
+    story = _build_story(monkeypatch, _frame(200_000), max_rows=500)
+
+    assert _review_rows(story) == 500
+    assert len(story) < 50
+    assert any(isinstance(f, Paragraph) and "Wyświetlono 500 z 200000" in f.text for f in story)
+
+
+def test_small_report_lists_all_reviews(monkeypatch):
+    story = _build_story(monkeypatch, _frame(120), max_rows=500)
+
+    assert _review_rows(story) == 120
+    assert not any(isinstance(f, Paragraph) and "Wyświetlono" in f.text for f in story)
+
+
+def test_capped_sections_state_shown_and_total_before_table(monkeypatch):
+    for mode, expected in (("full", ["Wyświetlono 800 z 3000 opinii"]),
+                           ("top", ["Wyświetlono 800 z 1500 opinii"] * 2)):
+        story = _build_story(monkeypatch, _frame(3_000), mode=mode, limit=1_500, max_rows=800)
+
+        notes = [i for i, f in enumerate(story) if isinstance(f, Paragraph) and "Wyświetlono" in f.text]
+        assert [story[i].text.split(" (")[0] for i in notes] == expected
+        for i in notes:
+            assert isinstance(story[i + 1], Table) and story[i + 1]._cellvalues[0] == REVIEW_TABLE_HEADER
+
+
+def test_report_renders_pdf(tmp_path):
+    path = tmp_path / "report.pdf"
+    write_report_pdf(_frame(5_000), {"total_reviews": 5_000}, path, max_rows=100)
+
+    assert path.read_bytes().startswith(b"%PDF")
+
+
+def test_sample_mode_takes_limit_rows_per_stratum():
+    df = _frame(10_000)
+    df["rating"] = np.random.default_rng(1).integers(1, 6, len(df))
+
+    sections = _report_sections(df, "sample", 3)
+
+    assert len(sections) == 10
+    for _, rows in sections:
+        assert len(rows) == 3
+        assert rows[["sentiment_label", "rating"]].drop_duplicates().shape[0] == 1
+    # Stałe ziarno - ta sama wersja danych daje ten sam raport
+    again = _report_sections(df, "sample", 3)
+    assert all(a[1].index.equals(b[1].index) for a, b in zip(sections, again))
@@ -2,18 +2,39 @@
  * Główny komponent dashboardu - integruje wszystkie komponenty.
  */
 
-import React, { useEffect, useState } from 'react';
-import { getReportPdf, getReviews, getStatistics, getTopWords } from '../services/api';
-import type { ReviewItem, Statistics, WordCount } from '../types';
+import React, { useEffect, useRef, useState } from 'react';
+import {
+  getReportPdf,
+  getStatistics,
+  getTopWords,
+  subscribeToDatasetEvents,
+} from '../services/api';
+import type { DatasetDelta, Statistics, WordCount } from '../types';
 import { ReviewsGrid } from './ReviewsGrid';
 import { SentimentChart } from './SentimentChart';
 import { SingleAnalysis } from './SingleAnalysis';
 import { StatisticsComponent } from './Statistics';
+import type { LiveReviewsUpdate } from './ReviewsGrid';
+
+const TOP_WORDS_LIMIT = 30;
+
+/** Nakłada zmienione i usunięte słowa z delty na bieżącą listę TOP słów. */
+function mergeTopWords(current: WordCount[], delta: DatasetDelta['top_words']): WordCount[] {
+  const byWord = new Map(current.map((w) => [w.word, w]));
+  delta.removed.forEach((word) => byWord.delete(word));
+  delta.changed.forEach((w) => byWord.set(w.word, w));
+  return Array.from(byWord.values())
+    .sort((a, b) => b.count - a.count)
+    .slice(0, TOP_WORDS_LIMIT);
+}
 
 export const Dashboard: React.FC = () => {
   const [statistics, setStatistics] = useState<Statistics | null>(null);
   const [topWords, setTopWords] = useState<WordCount[]>([]);
-  const [reviews, setReviews] = useState<ReviewItem[]>([]);
+  const [reviewsRefreshKey, setReviewsRefreshKey] = useState(0);
+  const [liveReviews, setLiveReviews] = useState<LiveReviewsUpdate | null>(null);
+  // Gdy strumień zdarzeń działa, zmiany przychodzą jako delty - bez ponownego pobierania
+  const liveConnected = useRef(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [reportPdfLoading, setReportPdfLoading] = useState(false);
@@ -23,20 +44,37 @@ export const Dashboard: React.FC = () => {
     loadData();
   }, []);
 
+  useEffect(() => {
+    return subscribeToDatasetEvents({
+      onDelta: (delta) => {
+        setStatistics(delta.stats);
+        setTopWords((words) => mergeTopWords(words, delta.top_words));
+        setLiveReviews((prev) => ({ key: (prev?.key ?? 0) + 1, reviews: delta.reviews }));
+      },
+      onResync: () => loadData(),
+      onConnectionChange: (connected) => {
+        liveConnected.current = connected;
+      },
+    });
+  }, []);
+
+  const handleAnalysisSuccess = () => {
+    if (!liveConnected.current) loadData();
+  };
+
   const loadData = async () => {
     setLoading(true);
     setError(null);
 
     try {
-      const [stats, words, reviewsList] = await Promise.all([
+      const [stats, words] = await Promise.all([
         getStatistics(),
-        getTopWords(30),
-        getReviews(),
+        getTopWords(TOP_WORDS_LIMIT, true),
       ]);
 
       setStatistics(stats);
       setTopWords(words.words);
-      setReviews(reviewsList);
+      setReviewsRefreshKey((key) => key + 1);
     } catch (err: any) {
       let errorMessage = 'Błąd podczas ładowania danych';
 
@@ -143,12 +181,12 @@ export const Dashboard: React.FC = () => {
 
         {/* Analiza pojedyncza */}
         <div className="grid grid-cols-1 gap-8 mb-8">
-          <SingleAnalysis onAnalysisSuccess={loadData} />
+          <SingleAnalysis onAnalysisSuccess={handleAnalysisSuccess} />
         </div>
 
         {/* Grid z opiniami i analizą */}
         <div className="mb-8">
-          <ReviewsGrid reviews={reviews} loading={loading} />
+          <ReviewsGrid refreshKey={reviewsRefreshKey} liveUpdate={liveReviews} />
         </div>
 
 
@@ -1,107 +1,257 @@
 /**
- * Siatka z listą wszystkich opinii i wynikami analizy sentymentu.
+ * Siatka z listą opinii i wynikami analizy sentymentu.
+ * Pobiera z backendu tylko widoczną stronę (paginacja, sortowanie i filtry po stronie serwera).
+ * Nowe opinie z delt /api/events są dopisywane lokalnie, gdy wiadomo, gdzie trafiają.
  */
 
-import React from 'react';
-import type { ReviewItem } from '../types';
+import React, { useEffect, useRef, useState } from 'react';
+import { getReviews } from '../services/api';
+import type { ReviewItem, ReviewsQuery } from '../types';
 
-interface ReviewsGridProps {
+/** Nowe opinie z delty strumienia zdarzeń (key rośnie z każdą deltą). */
+export interface LiveReviewsUpdate {
+  key: number;
   reviews: ReviewItem[];
-  loading: boolean;
+}
+
+interface ReviewsGridProps {
+  /** Zmiana wartości wymusza ponowne pobranie bieżącej strony (np. po nowej analizie). */
+  refreshKey: number;
+  /** Opinie dopisane od ostatniej delty (bez ponownego pobierania strony). */
+  liveUpdate?: LiveReviewsUpdate | null;
 }
 
 const MAX_TEXT_PREVIEW = 120;
+const PAGE_SIZE = 25;
+
+type SortBy = NonNullable<ReviewsQuery['sort_by']>;
+type SortOrder = NonNullable<ReviewsQuery['order']>;
+type SentimentFilter = '' | 'positive' | 'negative';
 
 function truncateText(text: string, maxLen: number): string {
   if (text.length <= maxLen) return text;
   return text.slice(0, maxLen - 3).trim() + '...';
 }
 
-export const ReviewsGrid: React.FC<ReviewsGridProps> = ({ reviews, loading }) => {
-  if (loading) {
-    return (
-      <div className="bg-white rounded-lg shadow-md p-6">
-        <h2 className="text-2xl font-bold mb-4 text-gray-800">
-          Opinie i analiza
-        </h2>
+export const ReviewsGrid: React.FC<ReviewsGridProps> = ({ refreshKey, liveUpdate }) => {
+  const [reviews, setReviews] = useState<ReviewItem[]>([]);
+  const [total, setTotal] = useState(0);
+  const [page, setPage] = useState(0);
+  const [sortBy, setSortBy] = useState<SortBy>('id');
+  const [order, setOrder] = useState<SortOrder>('asc');
+  const [sentiment, setSentiment] = useState<SentimentFilter>('');
+  const [queryInput, setQueryInput] = useState('');
+  const [query, setQuery] = useState('');
+  const [loading, setLoading] = useState(true);
+  const [error, setError] = useState<string | null>(null);
+  const [reloadTick, setReloadTick] = useState(0);
+  const handledLiveKey = useRef(0);
+
+  useEffect(() => {
+    let cancelled = false;
+    const loadPage = async () => {
+      setLoading(true);
+      setError(null);
+      try {
+        const result = await getReviews({
+          offset: page * PAGE_SIZE,
+          limit: PAGE_SIZE,
+          sort_by: sortBy,
+          order,
+          sentiment: sentiment || undefined,
+          q: query || undefined,
+        });
+        if (!cancelled) {
+          setReviews(result.reviews);
+          setTotal(result.total);
+        }
+      } catch (err: any) {
+        if (!cancelled) {
+          setError(err.response?.data?.detail || err.message || 'Błąd podczas ładowania opinii');
+        }
+      } finally {
+        if (!cancelled) setLoading(false);
+      }
+    };
+    loadPage();
+    return () => {
+      cancelled = true;
+    };
+  }, [page, sortBy, order, sentiment, query, refreshKey, reloadTick]);
+
+  useEffect(() => {
+    if (!liveUpdate || liveUpdate.key === handledLiveKey.current) return;
+    handledLiveKey.current = liveUpdate.key;
+
+    if (sentiment || query || sortBy !== 'id' || order !== 'asc') {
+      // Nie wiadomo, czy i gdzie nowe opinie trafiają - pobierz tylko bieżącą stronę
+      setReloadTick((tick) => tick + 1);
+      return;
+    }
+    // Sortowanie po ID rosnąco: nowe opinie trafiają na koniec listy
+    const isLastPage = (page + 1) * PAGE_SIZE >= total;
+    setTotal((t) => t + liveUpdate.reviews.length);
+    if (isLastPage) {
+      setReviews((rows) => [...rows, ...liveUpdate.reviews].slice(0, PAGE_SIZE));
+    }
+  }, [liveUpdate, sentiment, query, sortBy, order, page, total]);
+
+  const pageCount = Math.max(1, Math.ceil(total / PAGE_SIZE));
+
+  const handleSearch = (e: React.FormEvent) => {
+    e.preventDefault();
+    setPage(0);
+    setQuery(queryInput.trim());
+  };
+
+  return (
+    <div className="bg-white rounded-lg shadow-md p-6">
+      <h2 className="text-2xl font-bold mb-4 text-gray-800">
+        Opinie i analiza ({total})
+      </h2>
+
+      {/* Filtry i sortowanie */}
+      <div className="flex flex-wrap items-center gap-3 mb-4 text-sm">
+        <form onSubmit={handleSearch} className="flex gap-2">
+          <input
+            type="text"
+            value={queryInput}
+            onChange={(e) => setQueryInput(e.target.value)}
+            placeholder='Szukaj, np. "waste of money"'
+            className="px-3 py-1.5 border border-gray-300 rounded-lg"
+          />
+          <button
+            type="submit"
+            className="px-3 py-1.5 bg-indigo-600 text-white rounded-lg hover:bg-indigo-700"
+          >
+            Szukaj
+          </button>
+        </form>
+        <select
+          value={sentiment}
+          onChange={(e) => {
+            setPage(0);
+            setSentiment(e.target.value as SentimentFilter);
+          }}
+          className="px-2 py-1.5 border border-gray-300 rounded-lg"
+        >
+          <option value="">Wszystkie</option>
+          <option value="positive">Pozytywne</option>
+          <option value="negative">Negatywne</option>
+        </select>
+        <select
+          value={sortBy}
+          onChange={(e) => {
+            setPage(0);
+            setSortBy(e.target.value as SortBy);
+          }}
+          className="px-2 py-1.5 border border-gray-300 rounded-lg"
+        >
+          <option value="id">Sortuj: ID</option>
+          <option value="polarity">Sortuj: polaryzacja</option>
+          <option value="length">Sortuj: długość</option>
+        </select>
+        <select
+          value={order}
+          onChange={(e) => {
+            setPage(0);
+            setOrder(e.target.value as SortOrder);
+          }}
+          className="px-2 py-1.5 border border-gray-300 rounded-lg"
+        >
+          <option value="asc">Rosnąco</option>
+          <option value="desc">Malejąco</option>
+        </select>
+      </div>
+
+      {error && <div className="mb-4 text-sm text-red-600">{error}</div>}
+
+      {loading && reviews.length === 0 ? (
         <div className="flex items-center justify-center py-12 text-gray-500">
           Ładowanie opinii...
         </div>
-      </div>
-    );
-  }
-
-  if (reviews.length === 0) {
-    return (
-      <div className="bg-white rounded-lg shadow-md p-6">
-        <h2 className="text-2xl font-bold mb-4 text-gray-800">
-          Opinie i analiza
-        </h2>
+      ) : reviews.length === 0 ? (
         <p className="text-gray-500 py-4">
           Brak opinii. Wykonaj analizę pojedynczej opinii lub upewnij się, że
           plik dataset.csv jest załadowany.
         </p>
-      </div>
-    );
-  }
-
-  return (
-    <div className="bg-white rounded-lg shadow-md p-6">
-      <h2 className="text-2xl font-bold mb-4 text-gray-800">
-        Opinie i analiza ({reviews.length})
-      </h2>
-      <div className="overflow-x-auto -mx-6 px-6">
-        <table className="min-w-full border-collapse text-sm">
-          <thead>
-            <tr className="border-b border-gray-200">
-              <th className="text-left py-3 px-2 font-semibold text-gray-700 w-12">
-                Lp.
-              </th>
-              <th className="text-left py-3 px-2 font-semibold text-gray-700 min-w-[200px]">
-                Opinia
-              </th>
-              <th className="text-left py-3 px-2 font-semibold text-gray-700 w-24">
-                Polaryzacja
-              </th>
-              <th className="text-left py-3 px-2 font-semibold text-gray-700 w-28">
-                Sentyment
-              </th>
-              <th className="text-left py-3 px-2 font-semibold text-gray-700 w-20">
-                Słowa
-              </th>
-            </tr>
-          </thead>
-          <tbody className="overflow-y-auto max-h-[500px]">
-            {reviews.map((r) => (
-              <tr
-                key={r.index}
-                className="border-b border-gray-100 hover:bg-gray-50"
-              >
-                <td className="py-2 px-2 text-gray-600">{r.index}</td>
-                <td className="py-2 px-2 text-gray-800" title={r.review_text}>
-                  {truncateText(r.review_text, MAX_TEXT_PREVIEW)}
-                </td>
-                <td className="py-2 px-2 text-gray-700">
-                  {r.polarity.toFixed(3)}
-                </td>
-                <td className="py-2 px-2">
-                  <span
-                    className={
-                      r.sentiment_label === 'positive'
-                        ? 'text-green-600 font-medium'
-                        : 'text-red-600 font-medium'
-                    }
-                  >
-                    {r.sentiment_label === 'positive'
-                      ? 'Pozytywny'
-                      : 'Negatywny'}
-                  </span>
-                </td>
-                <td className="py-2 px-2 text-gray-600">{r.word_count}</td>
+      ) : (
+        <div className="overflow-x-auto -mx-6 px-6">
+          <table className="min-w-full border-collapse text-sm">
+            <thead>
+              <tr className="border-b border-gray-200">
+                <th className="text-left py-3 px-2 font-semibold text-gray-700 w-12">
+                  Lp.
+                </th>
+                <th className="text-left py-3 px-2 font-semibold text-gray-700 min-w-[200px]">
+                  Opinia
+                </th>
+                <th className="text-left py-3 px-2 font-semibold text-gray-700 w-24">
+                  Polaryzacja
+                </th>
+                <th className="text-left py-3 px-2 font-semibold text-gray-700 w-28">
+                  Sentyment
+                </th>
+                <th className="text-left py-3 px-2 font-semibold text-gray-700 w-20">
+                  Słowa
+                </th>
               </tr>
-            ))}
-          </tbody>
-        </table>
+            </thead>
+            <tbody className="overflow-y-auto max-h-[500px]">
+              {reviews.map((r) => (
+                <tr
+                  key={r.index}
+                  className="border-b border-gray-100 hover:bg-gray-50"
+                >
+                  <td className="py-2 px-2 text-gray-600">{r.index}</td>
+                  <td className="py-2 px-2 text-gray-800" title={r.review_text}>
+                    {truncateText(r.review_text, MAX_TEXT_PREVIEW)}
+                  </td>
+                  <td className="py-2 px-2 text-gray-700">
+                    {r.polarity.toFixed(3)}
+                  </td>
+                  <td className="py-2 px-2">
+                    <span
+                      className={
+                        r.sentiment_label === 'positive'
+                          ? 'text-green-600 font-medium'
+                          : 'text-red-600 font-medium'
+                      }
+                    >
+                      {r.sentiment_label === 'positive'
+                        ? 'Pozytywny'
+                        : 'Negatywny'}
+                    </span>
+                  </td>
+                  <td className="py-2 px-2 text-gray-600">{r.word_count}</td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
+        </div>
+      )}
+
+      {/* Paginacja */}
+      <div className="flex items-center justify-between mt-4 text-sm text-gray-600">
+        <button
+          type="button"
+          onClick={() => setPage((p) => Math.max(0, p - 1))}
+          disabled={page === 0 || loading}
+          className="px-3 py-1.5 border border-gray-300 rounded-lg disabled:opacity-50"
+        >
+          Poprzednia
+        </button>
+        <span>
+          Strona {Math.min(page + 1, pageCount)} z {pageCount}
+        </span>
+        <button
+          type="button"
+          onClick={() => setPage((p) => p + 1)}
+          disabled={page + 1 >= pageCount || loading}
+          className="px-3 py-1.5 border border-gray-300 rounded-lg disabled:opacity-50"
+        >
+          Następna
+        </button>
       </div>
     </div>
   );
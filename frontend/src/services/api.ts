@@ -6,7 +6,9 @@
 import axios from 'axios';
 import type {
     AveragePolarity,
-    ReviewItem,
+    DatasetDelta,
+    ReviewsPage,
+    ReviewsQuery,
     SentimentAnalysis,
     Statistics,
     TopWords,
@@ -37,11 +39,13 @@ apiClient.interceptors.response.use(
 );
 
 /**
- * Pobiera listę wszystkich opinii z analizą (do gridu).
+ * Pobiera stronę opinii z analizą (do gridu).
+ * Filtrowanie, sortowanie i paginacja odbywają się po stronie backendu.
+ * @param query - Parametry strony, sortowania i filtrów
  */
-export const getReviews = async (): Promise<ReviewItem[]> => {
-  const response = await apiClient.get<{ reviews: ReviewItem[] }>('/api/reviews');
-  return response.data.reviews;
+export const getReviews = async (query: ReviewsQuery = {}): Promise<ReviewsPage> => {
+  const response = await apiClient.get<ReviewsPage>('/api/reviews', { params: query });
+  return response.data;
 };
 
 /**
@@ -63,9 +67,17 @@ export const getAveragePolarity = async (): Promise<AveragePolarity> => {
 /**
  * Pobiera najczęściej występujące słowa.
  * @param limit - Liczba słów do pobrania (domyślnie 20)
+ * @param approximate - Tryb przybliżony (szkic o stałej pamięci po stronie backendu)
+ * @param filters - Opcjonalne filtry: etykieta sentymentu i ocena (bez trybu przybliżonego)
  */
-export const getTopWords = async (limit: number = 20): Promise<TopWords> => {
-  const response = await apiClient.get<TopWords>(`/api/words/top?limit=${limit}`);
+export const getTopWords = async (
+  limit: number = 20,
+  approximate: boolean = false,
+  filters: { sentiment?: 'positive' | 'negative'; rating?: number } = {},
+): Promise<TopWords> => {
+  const response = await apiClient.get<TopWords>('/api/words/top', {
+    params: { limit, approximate, ...filters },
+  });
   return response.data;
 };
 
@@ -100,3 +112,37 @@ export const getReportPdf = async (): Promise<Blob> => {
   return response.data as Blob;
 };
 
+/** Obsługa zdarzeń strumienia /api/events. */
+export interface DatasetEventHandlers {
+  /** Delta po dopisaniu opinii (nowe wiersze, liczniki, zmienione TOP słowa). */
+  onDelta: (delta: DatasetDelta) => void;
+  /** Pełny stan trzeba pobrać ponownie (przeładowanie danych lub utracone zdarzenia). */
+  onResync: () => void;
+  /** Zmiana stanu połączenia ze strumieniem. */
+  onConnectionChange?: (connected: boolean) => void;
+}
+
+/**
+ * Subskrybuje zmiany danych przez Server-Sent Events.
+ * Przeglądarka sama wznawia połączenie po jego zerwaniu; po wznowieniu
+ * wywoływane jest onResync, bo zdarzenia z przerwy mogły przepaść.
+ * @returns Funkcja zamykająca subskrypcję
+ */
+export const subscribeToDatasetEvents = (handlers: DatasetEventHandlers): (() => void) => {
+  const source = new EventSource('/api/events');
+  let wasConnected = false;
+
+  source.addEventListener('hello', () => {
+    if (wasConnected) handlers.onResync();
+    wasConnected = true;
+    handlers.onConnectionChange?.(true);
+  });
+  source.addEventListener('dataset', (event) => {
+    handlers.onDelta(JSON.parse((event as MessageEvent).data) as DatasetDelta);
+  });
+  source.addEventListener('reload', () => handlers.onResync());
+  source.addEventListener('resync', () => handlers.onResync());
+  source.onerror = () => handlers.onConnectionChange?.(false);
+
+  return () => source.close();
+};
@@ -16,11 +16,15 @@ export interface Statistics {
 export interface WordCount {
   word: string;
   count: number;
+  error?: number | null;
 }
 
 export interface TopWords {
   words: WordCount[];
   total_words_analyzed: number;
+  approximate?: boolean;
+  error_bound?: number | null;
+  memory_budget?: number | null;
 }
 
 export interface SentimentAnalysis {
@@ -43,3 +47,32 @@ export interface ReviewItem {
   review_length?: number;
 }
 
+
+export interface ReviewsPage {
+  reviews: ReviewItem[];
+  total: number;
+  offset: number;
+  limit: number;
+}
+
+export interface ReviewsQuery {
+  offset?: number;
+  limit?: number;
+  sort_by?: 'id' | 'polarity' | 'length';
+  order?: 'asc' | 'desc';
+  sentiment?: 'positive' | 'negative';
+  min_polarity?: number;
+  max_polarity?: number;
+  q?: string;
+}
+
+/** Delta rozgłaszana przez /api/events po dopisaniu opinii. */
+export interface DatasetDelta {
+  version: number;
+  reviews: ReviewItem[];
+  stats: Statistics;
+  top_words: {
+    changed: WordCount[];
+    removed: string[];
+  };
+}